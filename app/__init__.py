@@ -2,6 +2,7 @@
 import os
 import time
 import logging
+import tempfile
 from logging.handlers import RotatingFileHandler
 from dotenv import load_dotenv
 
@@ -30,7 +31,7 @@ limiter = Limiter(key_func=get_remote_address)
 csrf = CSRFProtect()  # Initialize CSRF protection
 
 
-def create_app():
+def create_app(test_config=None):
     app = Flask(__name__, template_folder="../templates", static_folder="../static")
 
     # Configure app
@@ -43,14 +44,16 @@ def create_app():
     port = os.getenv("DB_PORT", "5432")
     database = os.getenv("DB_NAME")
 
-    if not all([user, password, host, port, database]):
-        raise RuntimeError("Database environment variables are not fully set.")
+    # Tests pass their own database URI (e.g. in-memory SQLite)
+    if not (test_config and "SQLALCHEMY_DATABASE_URI" in test_config):
+        if not all([user, password, host, port, database]):
+            raise RuntimeError("Database environment variables are not fully set.")
 
-    # Fix Pylance warning: ensure password is not None before quote_plus
-    encoded_password = quote_plus(password) if password else ""
-    app.config["SQLALCHEMY_DATABASE_URI"] = (
-        f"postgresql://{user}:{encoded_password}@{host}:{port}/{database}"
-    )
+        # Fix Pylance warning: ensure password is not None before quote_plus
+        encoded_password = quote_plus(password) if password else ""
+        app.config["SQLALCHEMY_DATABASE_URI"] = (
+            f"postgresql://{user}:{encoded_password}@{host}:{port}/{database}"
+        )
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["TEMPLATES_AUTO_RELOAD"] = True
     # After setting SQLALCHEMY_DATABASE_URI
@@ -60,24 +63,125 @@ def create_app():
     app.config["SQLALCHEMY_POOL_RECYCLE"] = 1800  # Recycle connections every 30 minutes
     app.config["SQLALCHEMY_ECHO"] = False  # Set to True for debugging SQL queries
 
-    # Initialize extensions
-    db.init_app(app)
-    login_manager.init_app(app)
-    csrf.init_app(app)  # Initialize CSRF protection
-    app.config["WTF_CSRF_TIME_LIMIT"] = 3600  # 1 hour (default is 30 minutes)
-    app.config["WTF_CSRF_SSL_STRICT"] = False  # Important for HTTP in Docker
+    # /api/stats cache lifetime in seconds (0 disables caching)
+    app.config["STATS_CACHE_TTL"] = 30
+
+    # Todo quotas enforced by app.quota (None or 0 = unlimited)
+    app.config["TODO_QUOTA_TOTAL"] = 1000
+    app.config["TODO_QUOTA_PER_USER"] = None
+    app.config["TODO_QUOTA_PER_GROUP"] = None
+
+    # Largest batch accepted by POST /api/todos/bulk
+    app.config["BULK_MAX_BATCH"] = 500
+
+    # Rows per transaction for CSV/NDJSON imports (app.importer)
+    app.config["IMPORT_CHUNK_SIZE"] = 1000
+
+    # current_user snapshot cache (app.user_cache); 0 disables it
+    app.config["USER_CACHE_TTL"] = 30
+    app.config["USER_CACHE_MAX_ENTRIES"] = 10000
+
+    # Active group directory used by registration (app.group_directory)
+    app.config["GROUP_DIRECTORY_TTL"] = 60
+
+    # Upper bound on how long admin user/group listing ETags can miss another
+    # worker's edits (app.conditional; 0 = only this process's edits count)
+    app.config["LISTING_VERSION_TTL"] = 60
+
+    # Seconds a signed login/registration CAPTCHA token stays valid (app.captcha)
+    app.config["CAPTCHA_TOKEN_MAX_AGE"] = 600
+
+    # Rendered template fragment cache caps (app.fragment_cache; 0 disables it)
+    app.config["FRAGMENT_CACHE_MAX_ENTRIES"] = 20000
+    app.config["FRAGMENT_CACHE_MAX_BYTES"] = 16 * 1024 * 1024
+
+    # sanitize_input verdict cache caps (0 disables the cache)
+    app.config["SANITIZE_CACHE_MAX_ENTRIES"] = 4096
+    app.config["SANITIZE_CACHE_MAX_BYTES"] = 8 * 1024 * 1024
+
+    # Password hashing: bcrypt cost factor and hashing pool limits per process
+    app.config["BCRYPT_ROUNDS"] = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    app.config["PASSWORD_HASH_WORKERS"] = 4
+    app.config["PASSWORD_HASH_MAX_PENDING"] = 16  # beyond this, fail fast with 503
+    app.config["PASSWORD_HASH_TIMEOUT"] = 10
 
     # Configure rate limiter using app.config (Flask-Limiter v3+ API)
     app.config["RATELIMIT_DEFAULT"] = (
         "200 per day, 50 per hour"  # Comma-separated string
     )
-    app.config["RATELIMIT_STORAGE_URI"] = "memory://"
-    app.config["RATELIMIT_STRATEGY"] = "fixed-window"
+    # Counters live in a SQLite file shared by every worker on the node
+    # (see app/security/rate_limit_storage.py); "memory://" is per worker
+    app.config["RATELIMIT_STORAGE_URI"] = os.getenv(
+        "RATELIMIT_STORAGE_URI",
+        "sqlite:///" + os.path.join(tempfile.gettempdir(), "todo_ratelimit.db"),
+    )
+    app.config["RATELIMIT_STRATEGY"] = "sliding-window-counter"
     app.config["RATELIMIT_HEADERS_ENABLED"] = True
 
+    # Presence (online/away) store shared by all workers on the node
+    app.config["PRESENCE_DB_PATH"] = os.getenv(
+        "PRESENCE_DB_PATH", os.path.join(tempfile.gettempdir(), "todo_presence.db")
+    )
+    app.config["PRESENCE_RETENTION"] = 3600  # seconds of history kept for "last seen"
+
+    # Heartbeats are buffered and written to users.last_seen in bulk;
+    # the interval is the maximum staleness of last_seen
+    app.config["LAST_SEEN_FLUSH_INTERVAL"] = 30
+    app.config["LAST_SEEN_BACKGROUND_FLUSH"] = True
+
+    # Live updates (/api/events): cross-worker broker and per-process stream limits
+    app.config["EVENTS_BROKER_URI"] = os.getenv(
+        "EVENTS_BROKER_URI",
+        "sqlite:///" + os.path.join(tempfile.gettempdir(), "todo_events.db"),
+    )
+    app.config["EVENTS_MAX_STREAMS"] = 24  # leaves 8 of the 32 gthread threads for requests
+    app.config["EVENTS_KEEPALIVE"] = 20
+    app.config["EVENTS_STREAM_TIMEOUT"] = 300
+
+    # Test overrides are applied last so they win over the defaults above
+    if test_config:
+        app.config.update(test_config)
+
+    # Initialize extensions
+    db.init_app(app)
+    login_manager.init_app(app)
+    csrf.init_app(app)  # Initialize CSRF protection
+    app.config["WTF_CSRF_TIME_LIMIT"] = 3600  # 1 hour (default is 30 minutes)
+    app.config["WTF_CSRF_SSL_STRICT"] = False  # Important for HTTP in Docker
+
     # Initialize the limiter with the app
+    from app.security import rate_limit_storage  # noqa: F401 - registers sqlite://
+
     limiter.init_app(app)
 
+    # Size the sanitizer verdict cache from config
+    from app.security.sanitize_module import configure_verdict_cache
+
+    configure_verdict_cache(
+        max_entries=app.config["SANITIZE_CACHE_MAX_ENTRIES"],
+        max_bytes=app.config["SANITIZE_CACHE_MAX_BYTES"],
+    )
+
+    # Password hashing pool and cost factor from config
+    from app.security.hsh import configure_hasher
+
+    configure_hasher(
+        rounds=app.config["BCRYPT_ROUNDS"],
+        workers=app.config["PASSWORD_HASH_WORKERS"],
+        max_pending=app.config["PASSWORD_HASH_MAX_PENDING"],
+        timeout=app.config["PASSWORD_HASH_TIMEOUT"],
+    )
+
+    # Heartbeat write-coalescing buffer
+    from app import last_seen
+
+    last_seen.buffer.init_app(app)
+
+    # Live update broker
+    from app import events
+
+    events.init_app(app)
+
     # Configure login manager
     login_manager.login_view = "auth.login"  # type: ignore  # Pylance false positive - this is correct Flask-Login usage
     login_manager.login_message = "Please log in to access this page."
@@ -95,7 +199,7 @@ def create_app():
     #####DO NOT DELETE########################
 
     # Setup logging BEFORE any log statements
-    if not app.debug:
+    if not app.debug and not app.testing:
         if not os.path.exists("logs"):
             os.mkdir("logs")
         file_handler = RotatingFileHandler(
@@ -137,10 +241,16 @@ def create_app():
                         "[ERROR] Could not connect to the database."
                     ) from e
 
-    # User loader
-    @login_manager.user_loader
-    def load_user(user_id):
-        return models.User.query.get(int(user_id))
+    # User loader: cached immutable snapshots instead of a users SELECT per request
+    from . import user_cache
+
+    user_cache.init_app(app)
+    login_manager.user_loader(user_cache.load_user)
+
+    # Active groups for registration: name lookups without a query per request
+    from . import group_directory
+
+    group_directory.init_app(app)
 
     # Jinja filters
     from .utils import format_datetime_british, escapejs_filter
@@ -148,6 +258,11 @@ def create_app():
     app.jinja_env.filters["datetime_british"] = format_datetime_british
     app.jinja_env.filters["escapejs"] = escapejs_filter
 
+    # Cached dashboard rows/lists: {% call cache_fragment(...) %}
+    from . import fragment_cache
+
+    fragment_cache.init_app(app)
+
     # ==================== SECURITY MIDDLEWARE ====================
 
     # Request validation middleware
@@ -213,6 +328,14 @@ def create_app():
 
     app.cli.add_command(seeder.seed_command)
 
+    from . import importer
+
+    app.cli.add_command(importer.import_command)
+
+    from . import migrations
+
+    app.cli.add_command(migrations.db_command)
+
     ####################COOKIES#########################
     # Set visitor cookie for anonymous users
     from app.security.rate_limit import set_visitor_cookie_if_needed
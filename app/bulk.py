@@ -0,0 +1,208 @@
+# app/bulk.py
+# Bulk todo operations for POST /api/todos/bulk.
+#
+# However many ids a batch holds (up to BULK_MAX_BATCH), it costs a fixed
+# number of statements: one SELECT to see which ids exist and what they look
+# like now (for quota counters, stats and event audiences), one set-based
+# UPDATE or DELETE ... WHERE id IN (...), and one quota counter update per
+# distinct assignee - all committed in a single transaction. Date shifts are
+# computed in Python from the rows the SELECT already returned and written
+# back as one executemany UPDATE keyed by id, so no precision is lost to the
+# database's date functions (SQLite's strftime stops at milliseconds).
+from collections import Counter
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import joinedload
+
+from app import db, events, quota, stats
+from app.models import Todo, User, UserGroup
+
+DEFAULT_MAX_BATCH = 500
+MAX_SHIFT = timedelta(days=3650)
+
+DELETE = "delete"
+MARK_DONE = "mark_done"
+MARK_UNDONE = "mark_undone"
+REASSIGN = "reassign"
+SHIFT_DATES = "shift_dates"
+OPERATIONS = (DELETE, MARK_DONE, MARK_UNDONE, REASSIGN, SHIFT_DATES)
+
+OK = "ok"
+NOT_FOUND = "not_found"
+
+
+class BulkError(ValueError):
+    """A batch that cannot be applied; `status` is the HTTP status to report"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def parse_ids(raw_ids, max_batch=None):
+    """Validate the id list: non-empty, capped, de-duplicated (order kept)"""
+    max_batch = max_batch or current_app.config.get("BULK_MAX_BATCH", DEFAULT_MAX_BATCH)
+    if not isinstance(raw_ids, list) or not raw_ids:
+        raise BulkError("todo_ids must be a non-empty list")
+    if len(raw_ids) > max_batch:
+        raise BulkError(f"At most {max_batch} todos per request")
+    if not all(isinstance(todo_id, (str, int)) for todo_id in raw_ids):
+        raise BulkError("todo_ids must contain ids")
+    return list(dict.fromkeys(str(todo_id) for todo_id in raw_ids))
+
+
+def parse_shift(params):
+    """timedelta from {"days", "hours", "minutes"}; must be non-zero and bounded"""
+    try:
+        delta = timedelta(
+            days=float(params.get("days", 0)),
+            hours=float(params.get("hours", 0)),
+            minutes=float(params.get("minutes", 0)),
+        )
+    except (TypeError, ValueError):
+        raise BulkError("days/hours/minutes must be numbers")
+    if not delta or abs(delta) > MAX_SHIFT:
+        raise BulkError("Shift must be non-zero and at most 3650 days")
+    return delta
+
+
+def parse_assignee(params):
+    """(user_id, group_id) to assign; a todo has a user OR a group, or neither"""
+    user_id, group_id = params.get("user_id"), params.get("group_id")
+    if user_id and group_id:
+        raise BulkError("Assign to a user or a group, not both")
+    try:
+        user_id = int(user_id) if user_id else None
+        group_id = int(group_id) if group_id else None
+    except (TypeError, ValueError):
+        raise BulkError("user_id/group_id must be integers")
+    if user_id and db.session.get(User, user_id) is None:
+        raise BulkError("Unknown user", status=404)
+    if group_id and db.session.get(UserGroup, group_id) is None:
+        raise BulkError("Unknown group", status=404)
+    return user_id, group_id
+
+
+def _shifted(value, delta):
+    """`value + delta`, full precision (None stays None)"""
+    return None if value is None else value + delta
+
+
+def _existing(todo_ids):
+    """Current state of the requested todos that exist, locked for the update"""
+    stmt = (
+        select(
+            Todo.id,
+            Todo.done,
+            Todo.date_from,
+            Todo.date_to,
+            Todo.assigned_user_id,
+            Todo.assigned_group_id,
+        )
+        .where(Todo.id.in_(todo_ids))
+        .with_for_update()
+    )
+    return db.session.execute(stmt).all()
+
+
+def _release_per_assignee(rows, include_total=True):
+    per_assignee = Counter((row.assigned_user_id, row.assigned_group_id) for row in rows)
+    for (user_id, group_id), amount in per_assignee.items():
+        quota.release(user_id, group_id, amount=amount, include_total=include_total)
+
+
+def apply(operation, todo_ids, params=None):
+    """
+    Run one bulk operation in one transaction.
+    Returns {todo_id: "ok" | "not_found"} in request order. Raises BulkError on
+    invalid input or when a reassignment would exceed a quota (nothing is changed).
+    """
+    params = params or {}
+    if operation not in OPERATIONS:
+        raise BulkError(f"Unknown operation; expected one of {', '.join(OPERATIONS)}")
+    # Validate before touching anything
+    if operation == SHIFT_DATES:
+        delta = parse_shift(params)
+    elif operation == REASSIGN:
+        user_id, group_id = parse_assignee(params)
+
+    rows = _existing(todo_ids)
+    found = {row.id for row in rows}
+    results = {todo_id: OK if todo_id in found else NOT_FOUND for todo_id in todo_ids}
+    if not rows:
+        db.session.rollback()
+        return results
+
+    ids = list(found)
+    changed = Todo.id.in_(ids)
+
+    if operation == DELETE:
+        db.session.execute(
+            delete(Todo).where(changed).execution_options(synchronize_session=False)
+        )
+        _release_per_assignee(rows)
+    elif operation in (MARK_DONE, MARK_UNDONE):
+        db.session.execute(
+            update(Todo)
+            .where(changed)
+            .values(done=operation == MARK_DONE)
+            .execution_options(synchronize_session=False)
+        )
+    elif operation == SHIFT_DATES:
+        try:
+            shifts = [
+                {
+                    "id": row.id,
+                    "date_from": _shifted(row.date_from, delta),
+                    "date_to": _shifted(row.date_to, delta),
+                }
+                for row in rows
+                if row.date_from is not None or row.date_to is not None
+            ]
+        except OverflowError:
+            db.session.rollback()
+            raise BulkError("Shift moves a date out of range")
+        if shifts:
+            db.session.execute(
+                update(Todo).execution_options(synchronize_session=False), shifts
+            )
+    elif operation == REASSIGN:
+        moving = [
+            row for row in rows
+            if (row.assigned_user_id, row.assigned_group_id) != (user_id, group_id)
+        ]
+        if moving:
+            _release_per_assignee(moving, include_total=False)
+            reserved, message = quota.reserve(
+                user_id, group_id, amount=len(moving), include_total=False
+            )
+            if not reserved:
+                db.session.rollback()
+                raise BulkError(message, status=409)
+        db.session.execute(
+            update(Todo)
+            .where(changed)
+            .values(assigned_user_id=user_id, assigned_group_id=group_id)
+            .execution_options(synchronize_session=False)
+        )
+
+    db.session.commit()
+    stats.invalidate()
+
+    if operation == DELETE:
+        events.publish_todos(events.TODO_DELETED, rows)
+    else:
+        updated = (
+            Todo.query.filter(changed)
+            .options(
+                joinedload(Todo.assigned_user),
+                joinedload(Todo.assigned_group),
+                joinedload(Todo.created_by),
+            )
+            .all()
+        )
+        events.publish_todos(events.TODO_UPDATED, updated)
+    return results
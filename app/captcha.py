@@ -1,4 +1,27 @@
+# app/captcha.py
+# Visual CAPTCHA challenges for the login and registration forms.
+#
+# A challenge comes either from the fixed CAPTCHA_CHALLENGES table (indexed by
+# id, answers normalized once at import) or from a registered generator that
+# derives question and answers from an integer seed, so thousands of variants
+# exist without any of them being stored.
+#
+# The form's hidden captcha_id is a signed, timestamped token naming the source
+# and its id/seed ("table:3", "sum:918273"). Validation checks the signature and
+# age, rebuilds the challenge and tests the normalized answer against a
+# frozenset: no server-side state and no scan. A token can be reused until it
+# expires (CAPTCHA_TOKEN_MAX_AGE), the same as the fixed ids it replaces.
 import random
+from functools import lru_cache
+from typing import NamedTuple
+
+from flask import current_app
+from itsdangerous import BadSignature, TimestampSigner
+
+DEFAULT_MAX_AGE = 600  # seconds a challenge token stays valid
+SALT = "visual-captcha"
+TABLE = "table"
+SEED_BITS = 32
 
 # Visual CAPTCHA system - each CAPTCHA has an id, question, and correct answer
 CAPTCHA_CHALLENGES = [
@@ -29,21 +52,149 @@ CAPTCHA_CHALLENGES = [
     },
 ]
 
+NUMBER_WORDS = [
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+]
+
+
+class Challenge(NamedTuple):
+    question: str
+    answers: frozenset  # normalized accepted answers
+
+
+def normalize_answer(text):
+    """Casefolded answer with runs of whitespace collapsed"""
+    return " ".join(text.casefold().split())
+
+
+def accepted_answers(answer, *aliases):
+    """The full answer, each of its words (as before) and any aliases, normalized"""
+    full = normalize_answer(answer)
+    return frozenset([full, *full.split(), *(normalize_answer(alias) for alias in aliases)])
+
+
+def number_answers(n):
+    """Digits, plus the word for small numbers"""
+    return accepted_answers(str(n), *NUMBER_WORDS[n : n + 1])
+
+
+CHALLENGE_TABLE = {
+    challenge['id']: Challenge(challenge['question'], accepted_answers(challenge['answer']))
+    for challenge in CAPTCHA_CHALLENGES
+}
+
+
+# ---- Generators ----
+#
+# A generator takes a random.Random seeded from the token and returns a
+# Challenge; it must be deterministic for a given seed.
+
+GENERATORS = {}
+
+
+def challenge_generator(name):
+    """Register a seed -> Challenge generator under `name`"""
+    if name == TABLE or ":" in name:
+        raise ValueError(f"Invalid generator name: {name!r}")
+
+    def register(func):
+        GENERATORS[name] = func
+        return func
+
+    return register
+
+
+@challenge_generator("count")
+def count_challenge(rng):
+    symbol, plural = rng.choice(
+        [("•", "dots"), ("■", "squares"), ("▲", "triangles"), ("★", "stars"), ("♥", "hearts")]
+    )
+    n = rng.randint(2, 9)
+    filler = rng.choice("○□△☆♡")  # hollow shapes never match the counted symbol
+    cells = [symbol] * n + [filler] * rng.randint(1, 4)
+    rng.shuffle(cells)
+    return Challenge(f"How many {plural} do you count? [{' '.join(cells)}]", number_answers(n))
+
+
+@challenge_generator("sum")
+def sum_challenge(rng):
+    a, b = rng.randint(1, 50), rng.randint(1, 50)
+    return Challenge(f"What is {a} + {b}?", number_answers(a + b))
+
+
+@challenge_generator("sequence")
+def sequence_challenge(rng):
+    start, step = rng.randint(1, 20), rng.randint(2, 9)
+    shown = " ".join(str(start + step * i) for i in range(3))
+    return Challenge(
+        f"Which number comes next? [{shown} ?]", number_answers(start + step * 3)
+    )
+
+
+@lru_cache(maxsize=4096)
+def generated_challenge(name, seed):
+    """Challenge for (generator, seed); recent ones are memoized for validation"""
+    return GENERATORS[name](random.Random(seed))
+
+
+# ---- Tokens ----
+
+
+class CaptchaEngine:
+    """Issues challenges as signed tokens and validates answers against them"""
+
+    def __init__(self, secret_key, max_age=DEFAULT_MAX_AGE):
+        self.signer = TimestampSigner(secret_key, salt=SALT)
+        self.max_age = max_age
+
+    def issue(self, rng=random):
+        """A new challenge as {'id': token, 'question': ...} for the form"""
+        source = rng.choice((TABLE, *GENERATORS))
+        if source == TABLE:
+            key = rng.choice(list(CHALLENGE_TABLE))
+            challenge = CHALLENGE_TABLE[key]
+        else:
+            key = rng.getrandbits(SEED_BITS)
+            challenge = generated_challenge(source, key)
+        token = self.signer.sign(f"{source}:{key}").decode("ascii")
+        return {'id': token, 'question': challenge.question}
+
+    def challenge(self, token):
+        """The Challenge a valid, unexpired token names; None otherwise"""
+        try:
+            source, _, key = (
+                self.signer.unsign(token, max_age=self.max_age).decode("ascii").partition(":")
+            )
+            key = int(key)
+        except (BadSignature, ValueError, TypeError):
+            return None
+        if source == TABLE:
+            return CHALLENGE_TABLE.get(key)
+        if source in GENERATORS:
+            return generated_challenge(source, key)
+        return None
+
+    def validate(self, token, user_answer):
+        challenge = self.challenge(token)
+        return challenge is not None and normalize_answer(user_answer or "") in challenge.answers
+
+
+def get_engine():
+    """The app's engine, created on first use (the secret key may be set late)"""
+    engine = current_app.extensions.get("captcha")
+    if engine is None:
+        engine = current_app.extensions["captcha"] = CaptchaEngine(
+            current_app.secret_key,
+            max_age=current_app.config.get("CAPTCHA_TOKEN_MAX_AGE", DEFAULT_MAX_AGE),
+        )
+    return engine
+
+
 def get_random_visual_captcha():
     """Returns a random visual CAPTCHA challenge"""
-    challenge = random.choice(CAPTCHA_CHALLENGES)
-    return challenge
+    return get_engine().issue()
+
 
 def validate_visual_captcha(captcha_id, user_answer):
-    """Validates the user's CAPTCHA answer"""
-    try:
-        captcha_id = int(captcha_id)
-        challenge = next((c for c in CAPTCHA_CHALLENGES if c['id'] == captcha_id), None)
-        if challenge:
-            # Case-insensitive matching, allow minor typos
-            user_answer_lower = user_answer.lower().strip()
-            expected_lower = challenge['answer'].lower()
-            return user_answer_lower == expected_lower or user_answer_lower in expected_lower.split()
-        return False
-    except (ValueError, TypeError):
-        return False
+    """Validates the user's CAPTCHA answer against its signed challenge token"""
+    return get_engine().validate(captcha_id, user_answer)
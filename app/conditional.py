@@ -0,0 +1,145 @@
+# app/conditional.py
+# HTTP conditional requests (ETag / If-None-Match) for the JSON APIs.
+#
+# Each endpoint derives its ETag from a cheap version marker instead of from
+# the payload: an aggregate like COUNT(*) + MAX(updated_at) for todos, the
+# cached stats values, or COUNT(*) + MAX(id) plus a change counter for the
+# user and group listings. When
+# the client's If-None-Match matches, the route answers 304 before building
+# ORM objects or serializing anything. Responses carry "Cache-Control:
+# no-cache" so browsers keep the body and revalidate on every fetch().
+#
+# Todo.updated_at is only ever written from one clock (the column's utcnow
+# default/onupdate), and renaming a user or group touches the todos whose
+# to_dict() shows that name, so MAX(updated_at) moves whenever a payload does.
+#
+# users and user_groups have no updated_at. Their listing version adds a
+# per-process counter bumped when an ORM change to a listed field commits, and
+# a LISTING_VERSION_TTL time bucket so edits made by another worker (or raw
+# SQL) stop matching old ETags within that many seconds.
+import hashlib
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app, jsonify, request
+from sqlalchemy import event, func, inspect, or_, select
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Todo, User, UserGroup
+
+CACHE_CONTROL = "no-cache"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+DEFAULT_LISTING_TTL = 60  # seconds; 0 drops the time bucket
+
+# Fields shown by the admin user/group listings, per model
+LISTED_FIELDS = {User: ("username", "email", "is_admin"), UserGroup: ("name", "description")}
+STALE_KEY = "conditional_stale_listings"
+
+_changes = {User: 0, UserGroup: 0}
+_changes_lock = threading.Lock()
+
+
+def make_etag(*parts):
+    """Strong ETag value from version-marker parts"""
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def todos_version():
+    """(row count, newest updated_at): changes on every insert, update and delete"""
+    count, last_updated = db.session.execute(
+        select(func.count(Todo.id), func.max(Todo.updated_at))
+    ).one()
+    return count, last_updated
+
+
+def listing_version(model):
+    """(row count, highest id, local change counter, time bucket) for users or groups"""
+    count, last_id = db.session.execute(select(func.count(model.id), func.max(model.id))).one()
+    ttl = current_app.config.get("LISTING_VERSION_TTL", DEFAULT_LISTING_TTL)
+    return count, last_id, _changes[model], int(time.time() // ttl) if ttl else 0
+
+
+def request_variant():
+    """Query arguments that select a different representation (cursor, limit, ...)"""
+    return tuple(sorted(request.args.items(multi=True)))
+
+
+def client_has(etag):
+    """True when the client already holds the representation tagged `etag`"""
+    return request.if_none_match.contains(etag)
+
+
+def conditional_response(etag, build, private=True):
+    """
+    304 if the client's If-None-Match matches `etag`, otherwise the response
+    from build() (a Response, or data to jsonify). Both carry the ETag.
+    """
+    if client_has(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = build()
+        if not isinstance(response, current_app.response_class):
+            response = jsonify(response)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = PRIVATE_CACHE_CONTROL if private else CACHE_CONTROL
+    return response
+
+
+def counts_against_limit(response):
+    """Flask-Limiter deduct_when hook: 304 revalidations do not use up the limit"""
+    return response.status_code != 304
+
+
+@event.listens_for(Session, "after_flush")
+def _touch_renamed(session, flush_context):
+    """A username or group name shown in Todo.to_dict changed: bump those todos"""
+    user_ids, group_ids = [], []
+    for obj in session.dirty:
+        if isinstance(obj, User) and inspect(obj).attrs.username.history.has_changes():
+            user_ids.append(obj.id)
+        elif isinstance(obj, UserGroup) and inspect(obj).attrs.name.history.has_changes():
+            group_ids.append(obj.id)
+    if not user_ids and not group_ids:
+        return
+    todos = Todo.__table__
+    session.connection().execute(
+        todos.update()
+        .where(
+            or_(
+                todos.c.assigned_user_id.in_(user_ids),
+                todos.c.created_by_id.in_(user_ids),
+                todos.c.assigned_group_id.in_(group_ids),
+            )
+        )
+        .values(updated_at=datetime.utcnow())
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_listing_changes(session, flush_context):
+    """Remember which listings a flush changed (counters bumped after commit)"""
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        model = type(obj)
+        fields = LISTED_FIELDS.get(model)
+        if fields is None:
+            continue
+        if obj in session.new or obj in session.deleted or any(
+            inspect(obj).attrs[field].history.has_changes() for field in fields
+        ):
+            session.info.setdefault(STALE_KEY, set()).add(model)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_listing_versions(session):
+    stale = session.info.pop(STALE_KEY, None)
+    if stale:
+        with _changes_lock:
+            for model in stale:
+                _changes[model] += 1
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_listing_changes(session):
+    session.info.pop(STALE_KEY, None)
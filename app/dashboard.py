@@ -0,0 +1,63 @@
+from sqlalchemy import exists, or_, select
+
+from app.models import (
+    Deadline,
+    deadline_user_assignments,
+    deadline_group_assignments,
+    user_group_members,
+)
+from app.queries import user_todos_query, deadlines_query
+
+# Number of upcoming deadlines shown on the user dashboard
+DASHBOARD_DEADLINE_LIMIT = 3
+
+
+def get_user_todos(user_id):
+    """All todos visible to the user (direct + group), in a single query"""
+    return user_todos_query(user_id).all()
+
+
+def user_deadlines_query(user_id, current_time):
+    """
+    Active, upcoming deadlines assigned to the user either directly or
+    through one of their groups, soonest first.
+    """
+    assigned_directly = exists().where(
+        deadline_user_assignments.c.deadline_id == Deadline.id,
+        deadline_user_assignments.c.user_id == user_id,
+    )
+    assigned_via_group = exists().where(
+        deadline_group_assignments.c.deadline_id == Deadline.id,
+        deadline_group_assignments.c.group_id.in_(
+            select(user_group_members.c.user_group_id).where(
+                user_group_members.c.user_id == user_id
+            )
+        ),
+    )
+    return (
+        deadlines_query()
+        .filter(
+            Deadline.is_active == True,  # noqa: E712 - must match the partial index predicate
+            Deadline.deadline_date >= current_time,
+            or_(assigned_directly, assigned_via_group),
+        )
+        .order_by(Deadline.deadline_date.asc(), Deadline.id.asc())
+    )
+
+
+def get_user_deadlines(user_id, current_time, limit=DASHBOARD_DEADLINE_LIMIT):
+    """Get the next `limit` deadlines for a user with template helper attributes set"""
+    deadlines = user_deadlines_query(user_id, current_time).limit(limit).all()
+
+    # Add helper properties for template
+    for deadline in deadlines:
+        time_diff = deadline.deadline_date - current_time
+        deadline.days_remaining = time_diff.days
+        deadline.is_urgent = 0 <= time_diff.days <= 3
+
+    return deadlines
+
+
+def get_dashboard_data(user_id, current_time):
+    """Everything the user dashboard renders: (todos, deadlines)"""
+    return get_user_todos(user_id), get_user_deadlines(user_id, current_time)
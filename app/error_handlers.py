@@ -28,6 +28,15 @@ def request_header_fields_too_large(error):
     current_app.logger.warning(f"Header too large from {request.remote_addr}")
     return render_template("errors/431.html"), 431
 
+def service_unavailable(error):
+    """Handle 503 (e.g. password hashing pool saturated)"""
+    current_app.logger.warning(f"503 Service unavailable: {request.url} - {str(error)}")
+    response = Response(
+        render_template("errors/503.html", error=error), status=503
+    )
+    response.headers["Retry-After"] = "5"
+    return response
+
 def internal_error(error):
     try:
         db.session.rollback()
@@ -54,6 +63,7 @@ def register_handlers(app):
     app.register_error_handler(429, too_many_requests)
     app.register_error_handler(431, request_header_fields_too_large)
     app.register_error_handler(500, internal_error)
+    app.register_error_handler(503, service_unavailable)
     # Handle specific client disconnect scenarios
     app.register_error_handler(ConnectionResetError, handle_client_disconnect)
     app.register_error_handler(BrokenPipeError, handle_client_disconnect)
\ No newline at end of file
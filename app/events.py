@@ -0,0 +1,312 @@
+# app/events.py
+# Server-sent events: todo and presence changes pushed to open dashboards.
+#
+# Routes publish small events after they commit. Each worker process fans
+# events out to its own SSE subscribers through an in-process EventBus. The
+# broker behind publish() decides how events reach the other workers:
+#   memory://            - this process only (tests, single worker)
+#   sqlite:////path.db   - a shared SQLite file on the node; every worker with
+#                          subscribers tails it with a light poller thread
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from werkzeug.exceptions import ServiceUnavailable
+
+DEFAULT_MAX_STREAMS = 50  # concurrent SSE streams per process
+DEFAULT_KEEPALIVE = 20  # seconds between keep-alive comments
+DEFAULT_STREAM_TIMEOUT = 300  # streams end after this; EventSource reconnects
+SUBSCRIBER_QUEUE_SIZE = 256
+POLL_INTERVAL = 0.5
+EVENT_RETENTION = 120  # seconds events stay in the SQLite broker
+BUSY_TIMEOUT_MS = 2000
+
+TODO_CREATED = "todo.created"
+TODO_UPDATED = "todo.updated"
+TODO_DELETED = "todo.deleted"
+PRESENCE = "presence"
+
+logger = logging.getLogger("app.events")
+
+
+class EventStreamsBusy(ServiceUnavailable):
+    """Raised when this process already serves the maximum number of streams"""
+
+    description = "Too many open live-update connections. Please try again shortly."
+
+
+class Subscription:
+    """One SSE client: a bounded queue plus who the client is (for filtering)"""
+
+    def __init__(self, user_id, group_ids=(), is_admin=False):
+        self.user_id = user_id
+        self.group_ids = set(group_ids)
+        self.is_admin = is_admin
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def wants(self, event):
+        audience = event.get("audience") or {}
+        if self.is_admin and audience.get("admins", True):
+            return True
+        if self.user_id in audience.get("user_ids", ()):
+            return True
+        return bool(self.group_ids.intersection(audience.get("group_ids", ())))
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # A stalled client must not hold back the others; it resyncs instead
+            self.overflowed = True
+
+
+class EventBus:
+    """In-process fan-out to the SSE subscriptions of this worker"""
+
+    def __init__(self, max_streams=DEFAULT_MAX_STREAMS):
+        self.max_streams = max_streams
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id, group_ids=(), is_admin=False):
+        subscription = Subscription(user_id, group_ids, is_admin)
+        with self._lock:
+            if len(self._subscriptions) >= self.max_streams:
+                raise EventStreamsBusy()
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscriptions)
+
+    def dispatch(self, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if subscription.wants(event):
+                subscription.offer(event)
+
+
+class MemoryBroker:
+    """Delivers events to this process only"""
+
+    def __init__(self, bus):
+        self.bus = bus
+
+    def publish(self, event):
+        self.bus.dispatch(event)
+
+    def publish_many(self, events):
+        for event in events:
+            self.bus.dispatch(event)
+
+    def start(self):
+        pass
+
+
+class SQLiteBroker:
+    """Relays events between the workers on a node through a shared SQLite file"""
+
+    def __init__(self, bus, path):
+        self.bus = bus
+        self.path = path
+        self._local = threading.local()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._last_id = 0
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, created_at REAL NOT NULL, payload TEXT NOT NULL)"
+        )
+
+    def _connection(self):
+        """One connection per thread, reopened after a fork"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def publish(self, event):
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT INTO events (created_at, payload) VALUES (?, ?)",
+            (now, json.dumps(event, default=str)),
+        )
+        conn.execute("DELETE FROM events WHERE created_at < ?", (now - EVENT_RETENTION,))
+
+    def publish_many(self, events):
+        """Insert a batch of events in one transaction"""
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO events (created_at, payload) VALUES (?, ?)",
+                [(now, json.dumps(event, default=str)) for event in events],
+            )
+            conn.execute("DELETE FROM events WHERE created_at < ?", (now - EVENT_RETENTION,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def start(self):
+        """Start tailing the event table (lazily, once per process)"""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            row = self._connection().execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()
+            self._last_id = row[0]
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="event-broker", daemon=True)
+            self._thread.start()
+
+    def poll(self):
+        """Dispatch events published since the last poll; returns how many"""
+        rows = self._connection().execute(
+            "SELECT id, payload FROM events WHERE id > ? ORDER BY id", (self._last_id,)
+        ).fetchall()
+        for event_id, payload in rows:
+            self._last_id = event_id
+            event = json.loads(payload)
+            event["id"] = event_id
+            self.bus.dispatch(event)
+        return len(rows)
+
+    def _run(self):
+        while True:
+            time.sleep(POLL_INTERVAL)
+            if not self.bus.subscriber_count():
+                continue
+            try:
+                self.poll()
+            except sqlite3.Error:
+                logger.exception("Polling the event broker failed")
+
+
+bus = EventBus()
+broker = MemoryBroker(bus)
+
+
+def init_app(app):
+    """Configure the stream cap and broker from app config"""
+    global broker
+    bus.max_streams = app.config.get("EVENTS_MAX_STREAMS", DEFAULT_MAX_STREAMS)
+    uri = app.config.get("EVENTS_BROKER_URI", "memory://")
+    if uri.startswith("sqlite:///"):
+        broker = SQLiteBroker(bus, uri[len("sqlite:///"):])
+    elif uri == "memory://":
+        broker = MemoryBroker(bus)
+    else:
+        raise RuntimeError(f"Unsupported EVENTS_BROKER_URI: {uri}")
+
+
+def publish(event_type, data, audience=None):
+    """Publish an event; failures are logged and never break the calling request"""
+    event = {"type": event_type, "data": data, "audience": audience or {"admins": True}}
+    try:
+        broker.publish(event)
+    except Exception:
+        logger.exception(f"Publishing {event_type} failed")
+
+
+def todo_audience(todo):
+    """Admins, the assigned user and the members of the assigned group"""
+    return {
+        "admins": True,
+        "user_ids": [todo.assigned_user_id] if todo.assigned_user_id else [],
+        "group_ids": [todo.assigned_group_id] if todo.assigned_group_id else [],
+    }
+
+
+def publish_todo(event_type, todo):
+    """Publish a todo change (call after the commit)"""
+    data = {"id": todo.id} if event_type == TODO_DELETED else todo.to_dict()
+    publish(event_type, data, todo_audience(todo))
+
+
+def publish_todos(event_type, todos):
+    """Publish one event per todo in a single broker write (bulk operations)"""
+    batch = [
+        {
+            "type": event_type,
+            "data": {"id": todo.id} if event_type == TODO_DELETED else todo.to_dict(),
+            "audience": todo_audience(todo),
+        }
+        for todo in todos
+    ]
+    if not batch:
+        return
+    try:
+        broker.publish_many(batch)
+    except Exception:
+        logger.exception(f"Publishing {len(batch)} {event_type} events failed")
+
+
+def publish_presence(user_id, status):
+    """Publish a presence change; only admins see presence"""
+    publish(PRESENCE, {"user_id": user_id, "status": status}, {"admins": True})
+
+
+def subscribe(user_id, group_ids=(), is_admin=False):
+    subscription = bus.subscribe(user_id, group_ids, is_admin)
+    broker.start()
+    return subscription
+
+
+def format_sse(event):
+    """Serialize an event in text/event-stream format"""
+    lines = []
+    if event.get("id") is not None:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['type']}")
+    lines.append("data: " + json.dumps(event["data"], default=str))
+    return "\n".join(lines) + "\n\n"
+
+
+def stream(
+    subscription,
+    keepalive=DEFAULT_KEEPALIVE,
+    timeout=DEFAULT_STREAM_TIMEOUT,
+    on_keepalive=None,
+):
+    """Generator for the SSE response body; always unsubscribes when it ends"""
+    deadline = time.monotonic() + timeout
+    try:
+        yield "retry: 5000\n\n"
+        while time.monotonic() < deadline:
+            if subscription.overflowed:
+                yield "event: resync\ndata: {}\n\n"
+                return
+            try:
+                event = subscription.queue.get(timeout=keepalive)
+            except queue.Empty:
+                if on_keepalive is not None:
+                    on_keepalive()
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        bus.unsubscribe(subscription)
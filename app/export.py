@@ -0,0 +1,181 @@
+# app/export.py
+# Streaming exports of todos and deadlines for reporting.
+#
+# Rows come from a single SELECT with the assignee/creator names joined in (no
+# ORM objects, no per-row lazy loads), read through a server-side cursor in
+# batches of STREAM_BATCH_SIZE. Each batch is serialized and yielded as one
+# chunk, optionally through an incremental gzip compressor, so memory stays
+# constant whatever the table size. Field names and value formats are those of
+# Todo.to_dict / Deadline.to_dict.
+#
+# Formats:
+#   csv       header line + one line per row
+#   ndjson    one JSON object per line
+#   columnar  Parquet-style row groups as NDJSON: a schema line, then one line
+#             per batch holding each field's values as an array
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
+
+from app import db
+from app.models import (
+    Deadline,
+    Todo,
+    User,
+    UserGroup,
+    deadline_group_assignments,
+    deadline_user_assignments,
+)
+from app.pagination import STREAM_BATCH_SIZE
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "columnar": ("application/x-ndjson", "columnar.ndjson"),
+}
+GZIP = "gzip"
+
+
+def todo_columns():
+    """Export columns of a todo, keyed like Todo.to_dict"""
+    assignee = aliased(User)
+    creator = aliased(User)
+    columns = {
+        "id": Todo.id,
+        "task": Todo.task,
+        "done": Todo.done,
+        "created_at": Todo.created_at,
+        "updated_at": Todo.updated_at,
+        "date_from": Todo.date_from,
+        "date_to": Todo.date_to,
+        "assigned_user": assignee.username,
+        "assigned_group": UserGroup.name,
+        "created_by": creator.username,
+    }
+    joins = (
+        (assignee, assignee.id == Todo.assigned_user_id),
+        (UserGroup, UserGroup.id == Todo.assigned_group_id),
+        (creator, creator.id == Todo.created_by_id),
+    )
+    return columns, joins
+
+
+def deadline_columns():
+    """Export columns of a deadline, keyed like Deadline.to_dict"""
+    creator = aliased(User)
+    users_count = (
+        select(func.count())
+        .where(deadline_user_assignments.c.deadline_id == Deadline.id)
+        .scalar_subquery()
+    )
+    groups_count = (
+        select(func.count())
+        .where(deadline_group_assignments.c.deadline_id == Deadline.id)
+        .scalar_subquery()
+    )
+    columns = {
+        "id": Deadline.id,
+        "title": Deadline.title,
+        "description": Deadline.description,
+        "deadline_date": Deadline.deadline_date,
+        "is_active": Deadline.is_active,
+        "created_at": Deadline.created_at,
+        "updated_at": Deadline.updated_at,
+        "created_by": creator.username,
+        "assigned_users_count": users_count,
+        "assigned_groups_count": groups_count,
+    }
+    joins = ((creator, creator.id == Deadline.created_by_id),)
+    return columns, joins
+
+
+SOURCES = {
+    "todos": (Todo, todo_columns),
+    "deadlines": (Deadline, deadline_columns),
+}
+
+
+def export_statement(kind):
+    """(field names, SELECT) for an export kind, oldest first"""
+    model, build = SOURCES[kind]
+    columns, joins = build()
+    stmt = select(*(column.label(name) for name, column in columns.items())).select_from(model)
+    for target, onclause in joins:
+        stmt = stmt.outerjoin(target, onclause)
+    return list(columns), stmt.order_by(model.created_at, model.id)
+
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def iter_batches(stmt, batch_size=STREAM_BATCH_SIZE):
+    """Row batches from a server-side cursor (stream_results + yield_per)"""
+    result = db.session.execute(stmt.execution_options(yield_per=batch_size))
+    for batch in result.partitions():
+        yield [tuple(_value(value) for value in row) for row in batch]
+
+
+def csv_chunks(fields, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def ndjson_chunks(fields, batches):
+    for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(fields, row)), separators=(",", ":")) + "\n" for row in batch
+        )
+
+
+def columnar_chunks(fields, batches):
+    yield json.dumps({"schema": fields}, separators=(",", ":")) + "\n"
+    for batch in batches:
+        columns = dict(zip(fields, (list(values) for values in zip(*batch))))
+        yield json.dumps({"rows": len(batch), "columns": columns}, separators=(",", ":")) + "\n"
+
+
+WRITERS = {"csv": csv_chunks, "ndjson": ndjson_chunks, "columnar": columnar_chunks}
+
+
+def gzip_chunks(chunks):
+    """Compress a stream of text chunks on the fly into one gzip member"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(kind, fmt, compression=None, batch_size=STREAM_BATCH_SIZE):
+    """Generator of response chunks (str, or bytes when compressed)"""
+    if kind not in SOURCES:
+        raise ValueError(f"Unknown export {kind!r}")
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported format {fmt!r}; expected one of {', '.join(WRITERS)}")
+    fields, stmt = export_statement(kind)
+    chunks = WRITERS[fmt](fields, iter_batches(stmt, batch_size))
+    return gzip_chunks(chunks) if compression == GZIP else chunks
+
+
+def download_name(kind, fmt, compression=None):
+    name = f"{kind}-{datetime.now():%Y%m%d-%H%M%S}.{FORMATS[fmt][1]}"
+    return name + ".gz" if compression == GZIP else name
+
+
+def mimetype(fmt, compression=None):
+    return "application/gzip" if compression == GZIP else FORMATS[fmt][0]
@@ -0,0 +1,159 @@
+# app/fragment_cache.py
+# Rendered-HTML cache for template fragments (dashboard rows and whole lists).
+#
+#   {% call cache_fragment("dashboard-row", todo.id, todo.updated_at) %}
+#       ... row markup ...
+#   {% endcall %}
+#
+# The key parts are hashed into a digest and the block body is rendered only on
+# a miss. Row keys include the todo's updated_at, so a changed todo simply
+# misses and is re-rendered; list keys use fragment_version(todos), a digest of
+# every (id, updated_at) on the list, so an unchanged list is one lookup.
+# Entries are evicted least-recently-used beyond FRAGMENT_CACHE_MAX_ENTRIES or
+# FRAGMENT_CACHE_MAX_BYTES.
+#
+# Cached HTML is shared between users, so it must not contain per-session data.
+# Forms inside a cached block put {{ csrf_slot }} where the token goes; the
+# outermost cached block swaps in the current request's token on the way out.
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+from flask import g
+from flask_wtf.csrf import generate_csrf
+from markupsafe import Markup
+
+DEFAULT_MAX_ENTRIES = 20000
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+ENTRY_OVERHEAD = 150  # key digest, tuple and OrderedDict node per entry
+CSRF_SLOT = "__csrf_slot__"
+
+
+def make_key(parts):
+    """128-bit digest of the fragment's key parts"""
+    raw = "\x1f".join(repr(part) for part in parts)
+    return hashlib.blake2b(raw.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def fragment_version(items):
+    """Version of a list fragment: changes when any item is added, removed or updated"""
+    digest = hashlib.blake2b(digest_size=16)
+    for item in items:
+        digest.update(f"{item.id}\x1f{item.updated_at}\x1e".encode())
+    return digest.hexdigest()
+
+
+class FragmentCache:
+    """Thread-safe LRU of rendered HTML capped by entry count and approximate bytes"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return bool(self.max_entries) and bool(self.max_bytes)
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, html):
+        if not self.enabled:
+            return
+        size = sys.getsizeof(html) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (html, size)
+            self._bytes += size
+            self._shrink()
+
+    def _shrink(self):
+        """Evict least-recently-used entries until both caps hold (lock held)"""
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def configure(self, max_entries=None, max_bytes=None):
+        """Change the caps (0 disables the cache) and drop entries that no longer fit"""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if self.enabled:
+                self._shrink()
+        if not self.enabled:
+            self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+CACHE = FragmentCache()
+
+
+def cache_fragment(*key_parts, caller):
+    """Jinja {% call %} helper: cached HTML of the block for these key parts"""
+    key = make_key(key_parts)
+    depth = g.get("_fragment_depth", 0)
+    html = CACHE.get(key)
+    if html is None:
+        g._fragment_depth = depth + 1
+        try:
+            html = str(caller())
+        finally:
+            g._fragment_depth = depth
+        CACHE.put(key, html)
+    if depth:
+        return Markup(html)  # the enclosing fragment fills in the token
+    return Markup(html.replace(CSRF_SLOT, generate_csrf()))
+
+
+def init_app(app):
+    """Size the cache from config and expose the template helpers"""
+    CACHE.configure(
+        max_entries=app.config.get("FRAGMENT_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+        max_bytes=app.config.get("FRAGMENT_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES),
+    )
+    app.jinja_env.globals.update(
+        cache_fragment=cache_fragment,
+        fragment_version=fragment_version,
+        csrf_slot=CSRF_SLOT,
+    )
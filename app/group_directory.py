@@ -0,0 +1,144 @@
+# app/group_directory.py
+# In-process directory of the active user groups.
+#
+# Registration used to hit user_groups up to five times per POST (two debug
+# listings, then exact, lowercase and ILIKE lookups) and the group picker
+# queried it on every page load. The directory loads every active group with
+# one SELECT and keeps a name -> id map plus a case-insensitive index, so
+# resolving the group a visitor picked is a dictionary lookup.
+#
+# Group inserts, deletes and changes to name, description or is_active made
+# through the ORM drop the directory as soon as they commit; the next lookup
+# reloads it. Changes made by another worker, or by raw SQL, are picked up
+# when GROUP_DIRECTORY_TTL expires.
+import hashlib
+import threading
+import time
+from typing import NamedTuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import UserGroup
+
+DEFAULT_TTL = 60  # seconds; 0 reloads on every lookup
+DIRECTORY_FIELDS = ("name", "description", "is_active")
+STALE_KEY = "group_directory_stale"
+
+
+class GroupEntry(NamedTuple):
+    id: int
+    name: str
+    description: str
+
+
+class Directory(NamedTuple):
+    """One loaded generation of the directory (never mutated once built)"""
+
+    loaded_at: float
+    entries: tuple
+    by_name: dict
+    by_folded: dict
+    version: str
+
+
+def load_directory():
+    """Every active group with one SELECT, indexed by exact and casefolded name"""
+    rows = db.session.execute(
+        select(UserGroup.id, UserGroup.name, UserGroup.description)
+        .filter_by(is_active=True)
+        .order_by(UserGroup.id)
+    ).all()
+    entries = tuple(GroupEntry(*row) for row in rows)
+    by_name = {entry.name: entry for entry in entries}
+    by_folded = {}
+    for entry in entries:
+        by_folded.setdefault(entry.name.casefold(), entry)  # lowest id wins a case clash
+    version = hashlib.blake2b(repr(entries).encode("utf-8"), digest_size=16).hexdigest()
+    return Directory(time.monotonic(), entries, by_name, by_folded, version)
+
+
+class GroupDirectory:
+    """Per-process holder of the current Directory, reloaded when stale"""
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._current = None
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def current(self):
+        directory = self._current
+        if directory is not None and time.monotonic() - directory.loaded_at < self.ttl:
+            return directory
+        with self._lock:
+            directory = self._current
+            if directory is None or time.monotonic() - directory.loaded_at >= self.ttl:
+                directory = self._current = load_directory()
+                self.loads += 1
+        return directory
+
+    def invalidate(self):
+        self._current = None
+
+    def resolve(self, name):
+        """Active group entry for `name` (exact, then case-insensitive); None if unknown"""
+        if not name:
+            return None
+        directory = self.current()
+        return directory.by_name.get(name) or directory.by_folded.get(name.casefold())
+
+    def __contains__(self, name):
+        return self.resolve(name) is not None
+
+    def entries(self):
+        return self.current().entries
+
+    @property
+    def version(self):
+        return self.current().version
+
+
+def init_app(app):
+    app.extensions["group_directory"] = GroupDirectory(
+        ttl=app.config.get("GROUP_DIRECTORY_TTL", DEFAULT_TTL)
+    )
+
+
+def get_directory():
+    return current_app.extensions["group_directory"]
+
+
+def invalidate():
+    if has_app_context() and "group_directory" in current_app.extensions:
+        current_app.extensions["group_directory"].invalidate()
+
+
+# ---- Invalidation on commit ----
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_stale(session, flush_context):
+    """Flag the directory stale when a flush touched what it holds"""
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, UserGroup):
+            continue
+        state = inspect(obj)
+        if obj in session.new or obj in session.deleted or any(
+            state.attrs[field].history.has_changes() for field in DIRECTORY_FIELDS
+        ):
+            session.info[STALE_KEY] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_stale(session):
+    if session.info.pop(STALE_KEY, False):
+        invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stale(session):
+    session.info.pop(STALE_KEY, None)
@@ -0,0 +1,292 @@
+# app/importer.py
+# Bulk import of todos from CSV or NDJSON (admin endpoint and `flask import-todos`).
+#
+# The input is read as a stream and handled in chunks of IMPORT_CHUNK_SIZE rows,
+# so memory stays bounded whatever the file size. Each row goes through
+# sanitize_input and validate_todo_input like a form submission; assignees are
+# resolved through username/group-name maps loaded once per import (an exact
+# match first, then a case-insensitive one; a name that differs only in case
+# from two or more users or groups is rejected as ambiguous). A chunk
+# costs one quota reservation per distinct assignee and a single multi-row
+# insert: COPY ... FROM STDIN on PostgreSQL, executemany elsewhere. Every chunk
+# is committed on its own; a chunk refused by the quota stops the import.
+#
+# Columns / keys: task (required), done, date_from, date_to, assigned_user
+# (username), assigned_group (group name).
+import csv
+import io
+import itertools
+import json
+import uuid
+from collections import Counter
+from datetime import datetime
+
+import click
+from flask import current_app
+from sqlalchemy import select
+
+from app import db, events, quota, stats
+from app.models import Todo, User, UserGroup
+from app.security.sanitize_module import sanitize_input
+from app.security.validation import validate_todo_input
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+FORMATS = ("csv", "ndjson")
+TRUE_VALUES = {"1", "true", "yes", "y", "on", "done"}
+
+COLUMNS = (
+    "id",
+    "task",
+    "done",
+    "created_at",
+    "updated_at",
+    "date_from",
+    "date_to",
+    "assigned_user_id",
+    "assigned_group_id",
+    "created_by_id",
+)
+
+
+class ImportReport:
+    """Counts plus the first MAX_REPORTED_ERRORS rejected lines"""
+
+    def __init__(self):
+        self.imported = 0
+        self.rejected = 0
+        self.errors = []
+        self.stopped = None
+
+    def reject(self, line, messages):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "errors": messages})
+
+    def to_dict(self):
+        return {
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "stopped": self.stopped,
+        }
+
+
+def detect_format(filename=None, content_type=None):
+    """csv or ndjson from a file name or MIME type (csv when unsure)"""
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in (content_type or ""):
+        return "ndjson"
+    return "csv"
+
+
+def iter_records(stream, fmt):
+    """Yield (line_number, dict) from a text stream"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "ndjson":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield line_number, record if isinstance(record, dict) else None
+    else:
+        raise ValueError(f"Unsupported format {fmt!r}; expected one of {', '.join(FORMATS)}")
+
+
+def _as_text(value):
+    if value is None:
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+
+def _as_bool(value):
+    if isinstance(value, bool):
+        return value
+    return _as_text(value).strip().lower() in TRUE_VALUES
+
+
+class NameIndex:
+    """Name -> id, exact first, then case-insensitive when only one name matches"""
+
+    def __init__(self, rows):
+        self.by_name = {}
+        self.by_folded = {}
+        for row_id, name in rows:
+            self.by_name[name] = row_id
+            self.by_folded.setdefault(name.casefold(), set()).add(row_id)
+
+    def resolve(self, name, kind, errors):
+        """Id for `name` (None when blank); appends to `errors` when unresolved"""
+        if not name:
+            return None
+        if name in self.by_name:
+            return self.by_name[name]
+        matches = self.by_folded.get(name.casefold(), ())
+        if len(matches) == 1:
+            return next(iter(matches))
+        errors.append(f"{'Ambiguous' if matches else 'Unknown'} {kind} '{name}'")
+        return None
+
+
+class TodoImporter:
+    """Validates and inserts todo records chunk by chunk"""
+
+    def __init__(self, creator_id=None, chunk_size=None):
+        self.creator_id = creator_id
+        self.chunk_size = chunk_size or current_app.config.get(
+            "IMPORT_CHUNK_SIZE", DEFAULT_CHUNK_SIZE
+        )
+        # One lookup per import instead of one per row
+        self.users = NameIndex(db.session.execute(select(User.id, User.username)))
+        self.groups = NameIndex(db.session.execute(select(UserGroup.id, UserGroup.name)))
+        self.report = ImportReport()
+
+    def build_row(self, line, record):
+        """Validated column values for one record, or None (rejection recorded)"""
+        if record is None:
+            self.report.reject(line, ["Not a JSON object"])
+            return None
+
+        task, score, _ = sanitize_input(_as_text(record.get("task")))
+        if score >= 5:
+            self.report.reject(line, ["Blocked: suspicious content detected"])
+            return None
+
+        date_from = _as_text(record.get("date_from")).strip() or None
+        date_to = _as_text(record.get("date_to")).strip() or None
+        errors, date_from, date_to = validate_todo_input(task, date_from, date_to)
+
+        username = _as_text(record.get("assigned_user")).strip()
+        group_name = _as_text(record.get("assigned_group")).strip()
+        user_id = self.users.resolve(username, "user", errors)
+        group_id = self.groups.resolve(group_name, "group", errors)
+        if user_id and group_id:
+            errors.append("Assign to a user or a group, not both")
+
+        if errors:
+            self.report.reject(line, errors)
+            return None
+
+        now = datetime.utcnow()  # same clock as the Todo column defaults
+        return {
+            "id": str(uuid.uuid4()),
+            "task": task.strip(),
+            "done": _as_bool(record.get("done")),
+            "created_at": now,
+            "updated_at": now,
+            "date_from": date_from,
+            "date_to": date_to,
+            "assigned_user_id": user_id,
+            "assigned_group_id": group_id,
+            "created_by_id": self.creator_id,
+        }
+
+    def _reserve(self, rows):
+        """Reserve quota for a chunk; (True, None) or (False, message)"""
+        reserved, message = quota.reserve(amount=len(rows))
+        if not reserved:
+            return reserved, message
+        per_assignee = Counter((row["assigned_user_id"], row["assigned_group_id"]) for row in rows)
+        for (user_id, group_id), amount in per_assignee.items():
+            if not user_id and not group_id:
+                continue
+            reserved, message = quota.reserve(
+                user_id, group_id, amount=amount, include_total=False
+            )
+            if not reserved:
+                return reserved, message
+        return True, None
+
+    def insert_chunk(self, rows):
+        """Insert one validated chunk in its own transaction; False if the quota refused it"""
+        reserved, message = self._reserve(rows)
+        if not reserved:
+            db.session.rollback()
+            self.report.stopped = message
+            return False
+        if db.session.get_bind().dialect.name == "postgresql":
+            _copy_rows(rows)
+        else:
+            db.session.execute(Todo.__table__.insert(), rows)  # Core executemany
+        db.session.commit()
+        self.report.imported += len(rows)
+        events.publish(
+            events.TODO_CREATED,
+            {"imported": len(rows)},
+            {
+                "admins": True,
+                "user_ids": sorted({r["assigned_user_id"] for r in rows if r["assigned_user_id"]}),
+                "group_ids": sorted({r["assigned_group_id"] for r in rows if r["assigned_group_id"]}),
+            },
+        )
+        return True
+
+    def run(self, records):
+        """Import an iterable of (line, record); returns the ImportReport"""
+        records = iter(records)
+        try:
+            while True:
+                chunk = list(itertools.islice(records, self.chunk_size))
+                if not chunk:
+                    break
+                rows = [row for row in (self.build_row(*item) for item in chunk) if row]
+                if rows and not self.insert_chunk(rows):
+                    break
+        finally:
+            if self.report.imported:
+                stats.invalidate()
+        return self.report
+
+
+def _copy_rows(rows):
+    """Stream a chunk into PostgreSQL with COPY (psycopg2), far faster than INSERTs"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row[column] for column in COLUMNS)  # None -> empty -> NULL
+    buffer.seek(0)
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY todos ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    finally:
+        cursor.close()
+
+
+def import_stream(stream, fmt, creator_id=None, chunk_size=None):
+    """Import todos from a text stream; returns the ImportReport"""
+    importer = TodoImporter(creator_id=creator_id, chunk_size=chunk_size)
+    return importer.run(iter_records(stream, fmt))
+
+
+@click.command("import-todos")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(FORMATS), help="Default: from the file extension.")
+@click.option("--chunk-size", type=int, default=None, help="Rows per transaction. Default: 1000")
+@click.option("--creator", default=None, help="Username recorded as creator. Default: first admin.")
+def import_command(path, fmt, chunk_size, creator):
+    """Import todos from a CSV or NDJSON file."""
+    fmt = fmt or detect_format(path)
+    creator_query = User.query.filter_by(username=creator) if creator else User.query.filter_by(is_admin=True)
+    creator_user = creator_query.first()
+    if creator and not creator_user:
+        click.echo(f"❌ Unknown user '{creator}'.")
+        return
+
+    with open(path, newline="", encoding="utf-8") as stream:
+        report = import_stream(
+            stream, fmt, creator_id=creator_user.id if creator_user else None, chunk_size=chunk_size
+        )
+
+    click.echo(f"✅ Imported {report.imported} todos, rejected {report.rejected}.")
+    for error in report.errors:
+        click.echo(f"   line {error['line']}: {'; '.join(error['errors'])}")
+    if report.stopped:
+        click.echo(f"🚫 Stopped early: {report.stopped}")
@@ -0,0 +1,134 @@
+# app/last_seen.py
+# Write-coalescing for users.last_seen.
+#
+# Heartbeats only record "user X was seen at T" in an in-process dict; a
+# background thread flushes the dict every LAST_SEEN_FLUSH_INTERVAL seconds
+# with one bulk UPDATE ... FROM (VALUES ...) per chunk of users. The heartbeat
+# request itself never touches the database, however many tabs are open, and
+# users.last_seen lags reality by at most the flush interval.
+import atexit
+import logging
+import os
+import threading
+from datetime import datetime
+
+from sqlalchemy import bindparam, text
+
+from app import db
+
+DEFAULT_FLUSH_INTERVAL = 30  # seconds; upper bound on last_seen staleness
+FLUSH_CHUNK_SIZE = 500
+
+logger = logging.getLogger("app.last_seen")
+
+
+def bulk_update_last_seen(seen):
+    """UPDATE users.last_seen for {user_id: datetime} with one statement per chunk"""
+    items = sorted(seen.items())
+    for start in range(0, len(items), FLUSH_CHUNK_SIZE):
+        chunk = items[start : start + FLUSH_CHUNK_SIZE]
+        rows = ", ".join(f"(:id{i}, :ts{i})" for i in range(len(chunk)))
+        params = {}
+        binds = []
+        for i, (user_id, seen_at) in enumerate(chunk):
+            params[f"id{i}"] = user_id
+            params[f"ts{i}"] = seen_at
+            binds.append(bindparam(f"ts{i}", type_=db.DateTime))
+        stmt = text(
+            f"WITH seen (id, ts) AS (VALUES {rows}) "
+            "UPDATE users SET last_seen = seen.ts FROM seen WHERE users.id = seen.id"
+        ).bindparams(*binds)
+        db.session.execute(stmt, params)
+    db.session.commit()
+
+
+class LastSeenBuffer:
+    """Per-process buffer of heartbeat timestamps with a periodic background flush"""
+
+    def __init__(self):
+        self.app = None
+        self.interval = DEFAULT_FLUSH_INTERVAL
+        self.background = True
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stopping = threading.Event()
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get("LAST_SEEN_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)
+        self.background = app.config.get("LAST_SEEN_BACKGROUND_FLUSH", True)
+
+    def record(self, user_id, seen_at=None):
+        """Remember that a user was seen; no database access"""
+        seen_at = seen_at or datetime.utcnow()
+        with self._lock:
+            if seen_at > self._pending.get(user_id, datetime.min):
+                self._pending[user_id] = seen_at
+        if self.background:
+            self._ensure_running()
+
+    def pending(self):
+        with self._lock:
+            return dict(self._pending)
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of users updated"""
+        with self._lock:
+            seen, self._pending = self._pending, {}
+        if not seen:
+            return 0
+        try:
+            bulk_update_last_seen(seen)
+        except Exception:
+            db.session.rollback()
+            # Put the timestamps back (unless newer ones arrived) and retry next time
+            with self._lock:
+                for user_id, seen_at in seen.items():
+                    if seen_at > self._pending.get(user_id, datetime.min):
+                        self._pending[user_id] = seen_at
+            raise
+        return len(seen)
+
+    def _ensure_running(self):
+        """Start the flush thread lazily; restart it in a forked child"""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="last-seen-flush", daemon=True)
+            self._thread.start()
+
+    def _flush_in_app_context(self):
+        if self.app is None:
+            return
+        with self.app.app_context():
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing users.last_seen failed")
+            finally:
+                db.session.remove()
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            self._flush_in_app_context()
+
+    def stop(self):
+        """Stop the thread and write out what is still buffered"""
+        self._stopping.set()
+        if self._pid == os.getpid() and self.pending():
+            self._flush_in_app_context()
+
+
+buffer = LastSeenBuffer()
+atexit.register(buffer.stop)
+
+
+def record(user_id):
+    """Buffer a heartbeat for `user_id`"""
+    buffer.record(user_id)
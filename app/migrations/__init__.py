@@ -0,0 +1,114 @@
+# app/migrations/__init__.py
+# Minimal schema-migration runner.
+# Revisions live in revisions.py as (revision_id, description, upgrade_fn) and are
+# applied in order; applied ids are recorded in the schema_migrations table.
+import logging
+from datetime import datetime
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import text
+
+from app import db
+
+logger = logging.getLogger("app.migrations")
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+
+def ensure_version_table(conn):
+    """Create the table that records applied revisions"""
+    conn.execute(
+        text(
+            f"""
+            CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+                revision_id VARCHAR(32) PRIMARY KEY,
+                description VARCHAR(200) NOT NULL,
+                applied_at TIMESTAMP NOT NULL
+            )
+            """
+        )
+    )
+
+
+def applied_revisions(conn):
+    """Return the set of revision ids already applied"""
+    ensure_version_table(conn)
+    rows = conn.execute(text(f"SELECT revision_id FROM {MIGRATIONS_TABLE}"))
+    return {row[0] for row in rows}
+
+
+def pending_revisions():
+    """Revisions not yet applied to the database, in order"""
+    from .revisions import REVISIONS
+
+    with db.engine.begin() as conn:
+        applied = applied_revisions(conn)
+    return [rev for rev in REVISIONS if rev[0] not in applied]
+
+
+def upgrade():
+    """Apply every pending revision, each in its own transaction. Returns applied ids"""
+    done = []
+    for revision_id, description, upgrade_fn in pending_revisions():
+        with db.engine.begin() as conn:
+            upgrade_fn(conn)
+            conn.execute(
+                text(
+                    f"INSERT INTO {MIGRATIONS_TABLE} (revision_id, description, applied_at) "
+                    "VALUES (:revision_id, :description, :applied_at)"
+                ),
+                {
+                    "revision_id": revision_id,
+                    "description": description,
+                    "applied_at": datetime.utcnow(),
+                },
+            )
+        logger.info(f"[MIGRATE] Applied {revision_id}: {description}")
+        done.append(revision_id)
+    return done
+
+
+# ==================== CLI ====================
+
+
+db_command = AppGroup("db", help="Database schema migrations.")
+
+
+@db_command.command("upgrade")
+def upgrade_command():
+    """Apply all pending schema revisions."""
+    applied = upgrade()
+    if not applied:
+        click.echo("✅ Database schema is up to date.")
+        return
+    for revision_id in applied:
+        click.echo(f"✅ Applied revision {revision_id}")
+
+
+@db_command.command("status")
+def status_command():
+    """Show applied and pending schema revisions."""
+    from .revisions import REVISIONS
+
+    with db.engine.begin() as conn:
+        applied = applied_revisions(conn)
+    for revision_id, description, _ in REVISIONS:
+        mark = "applied" if revision_id in applied else "pending"
+        click.echo(f"{revision_id}  [{mark}]  {description}")
+
+
+@db_command.command("check-indexes")
+def check_indexes_command():
+    """EXPLAIN the dashboard queries and verify they use the hot-path indexes."""
+    from .explain import check_dashboard_indexes
+
+    failures = 0
+    for name, uses_index, plan in check_dashboard_indexes():
+        if uses_index:
+            click.echo(f"✅ {name}")
+        else:
+            failures += 1
+            click.echo(f"❌ {name} does not use an index:\n{plan}")
+    if failures:
+        raise SystemExit(1)
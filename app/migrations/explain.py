@@ -0,0 +1,70 @@
+# app/migrations/explain.py
+# EXPLAIN-based check that the dashboard query shapes are served by the
+# hot-path indexes from revision 0002.
+from datetime import datetime
+
+from app import db
+
+
+def dashboard_queries(now=None):
+    """(name, query, acceptable index names) for every hot dashboard query"""
+    from app.models import Todo, User
+    from app.queries import all_todos_query, todos_query, user_todos_query
+    from app.dashboard import user_deadlines_query
+
+    now = now or datetime.now()
+    todo_indexes = {
+        "ix_todos_created_at_id",
+        "ix_todos_assigned_user_created",
+        "ix_todos_assigned_group_created",
+    }
+    return [
+        ("admin dashboard todos", all_todos_query().limit(50), {"ix_todos_created_at_id"}),
+        ("user dashboard todos", user_todos_query(1), todo_indexes),
+        (
+            "user dashboard deadlines",
+            user_deadlines_query(1, now).limit(3),
+            {"ix_deadlines_active_date", "ix_deadline_user_assignments_user"},
+        ),
+        (
+            "overdue stats",
+            todos_query().filter(Todo.date_to < now, Todo.done == False),  # noqa: E712
+            {"ix_todos_open_date_to"},
+        ),
+        (
+            "non-admin users",
+            User.query.filter_by(is_admin=False).order_by(User.id),
+            {"ix_users_is_admin_id"},
+        ),
+    ]
+
+
+def explain(conn, query):
+    """Return the query plan as one string for the current dialect"""
+    compiled = query.statement.compile(dialect=conn.dialect)
+    params = (
+        tuple(compiled.params[name] for name in compiled.positiontup)
+        if compiled.positional
+        else compiled.params
+    )
+
+    if conn.dialect.name == "postgresql":
+        # Tiny tables always seq-scan; disable it to see whether an index is usable
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        rows = conn.exec_driver_sql(f"EXPLAIN {compiled.string}", params)
+        return "\n".join(row[0] for row in rows)
+
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled.string}", params)
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def check_dashboard_indexes(now=None):
+    """Return (name, uses_index, plan) for every dashboard query"""
+    results = []
+    with db.engine.connect() as conn:
+        for name, query, index_names in dashboard_queries(now):
+            with conn.begin():
+                plan = explain(conn, query)
+            uses_index = any(index_name in plan for index_name in index_names)
+            results.append((name, uses_index, plan))
+    return results
@@ -0,0 +1,164 @@
+# app/migrations/revisions.py
+# Ordered schema revisions: (revision_id, description, upgrade_fn(conn)).
+# Never edit an applied revision - add a new one instead.
+import sqlalchemy as sa
+
+
+def _baseline(conn):
+    """
+    Tables as they stood before migrations existed (replaces the old
+    create_deadline_table.py script). Frozen copy: never derive it from the models.
+    """
+    metadata = sa.MetaData()
+    sa.Table(
+        "users",
+        metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("username", sa.String(80), unique=True, nullable=False),
+        sa.Column("email", sa.String(120), unique=True, nullable=False),
+        sa.Column("password", sa.String(120), nullable=False),
+        sa.Column("is_admin", sa.Boolean, nullable=False),
+        sa.Column("last_seen", sa.DateTime),
+    )
+    sa.Table(
+        "user_groups",
+        metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String(50), unique=True, nullable=False),
+        sa.Column("description", sa.String(200)),
+        sa.Column("is_active", sa.Boolean, nullable=False),
+    )
+    sa.Table(
+        "user_group_members",
+        metadata,
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column(
+            "user_group_id", sa.Integer, sa.ForeignKey("user_groups.id"), primary_key=True
+        ),
+    )
+    sa.Table(
+        "todos",
+        metadata,
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("task", sa.String(500), nullable=False),
+        sa.Column("done", sa.Boolean, nullable=False),
+        sa.Column("created_at", sa.DateTime, nullable=False),
+        sa.Column("updated_at", sa.DateTime),
+        sa.Column("date_from", sa.DateTime),
+        sa.Column("date_to", sa.DateTime),
+        sa.Column("assigned_user_id", sa.Integer, sa.ForeignKey("users.id")),
+        sa.Column("assigned_group_id", sa.Integer, sa.ForeignKey("user_groups.id")),
+        sa.Column("created_by_id", sa.Integer, sa.ForeignKey("users.id")),
+    )
+    sa.Table(
+        "deadlines",
+        metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("title", sa.String(100), nullable=False),
+        sa.Column("description", sa.Text),
+        sa.Column("deadline_date", sa.DateTime, nullable=False),
+        sa.Column("is_active", sa.Boolean, nullable=False),
+        sa.Column("created_at", sa.DateTime, nullable=False),
+        sa.Column("updated_at", sa.DateTime),
+        sa.Column("created_by_id", sa.Integer, sa.ForeignKey("users.id")),
+    )
+    sa.Table(
+        "deadline_user_assignments",
+        metadata,
+        sa.Column("deadline_id", sa.Integer, sa.ForeignKey("deadlines.id"), primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("assigned_at", sa.DateTime),
+    )
+    sa.Table(
+        "deadline_group_assignments",
+        metadata,
+        sa.Column("deadline_id", sa.Integer, sa.ForeignKey("deadlines.id"), primary_key=True),
+        sa.Column("group_id", sa.Integer, sa.ForeignKey("user_groups.id"), primary_key=True),
+        sa.Column("assigned_at", sa.DateTime),
+    )
+    metadata.create_all(conn, checkfirst=True)
+
+
+def _frozen_table(metadata, name, *columns):
+    """Stand-in table with just the columns a revision indexes (never created)"""
+    return sa.Table(name, metadata, *(sa.Column(column, sa.Integer) for column in columns))
+
+
+def _hot_path_indexes(conn):
+    """Composite and partial indexes for dashboard, listing and stats filters"""
+    metadata = sa.MetaData()
+    users = _frozen_table(metadata, "users", "id", "is_admin")
+    todos = _frozen_table(
+        metadata, "todos", "id", "created_at", "date_to", "assigned_user_id", "assigned_group_id"
+    )
+    deadlines = _frozen_table(metadata, "deadlines", "deadline_date")
+    user_assignments = _frozen_table(metadata, "deadline_user_assignments", "user_id")
+    group_assignments = _frozen_table(metadata, "deadline_group_assignments", "group_id")
+    members = _frozen_table(metadata, "user_group_members", "user_group_id")
+
+    indexes = [
+        sa.Index("ix_users_is_admin_id", users.c.is_admin, users.c.id),
+        sa.Index("ix_todos_created_at_id", todos.c.created_at, todos.c.id),
+        sa.Index("ix_todos_assigned_user_created", todos.c.assigned_user_id, todos.c.created_at),
+        sa.Index("ix_todos_assigned_group_created", todos.c.assigned_group_id, todos.c.created_at),
+        sa.Index(
+            "ix_todos_open_date_to",
+            todos.c.date_to,
+            postgresql_where=sa.text("done = false"),
+            sqlite_where=sa.text("done = 0"),
+        ),
+        sa.Index(
+            "ix_deadlines_active_date",
+            deadlines.c.deadline_date,
+            postgresql_where=sa.text("is_active = true"),
+            sqlite_where=sa.text("is_active = 1"),
+        ),
+        sa.Index("ix_deadline_user_assignments_user", user_assignments.c.user_id),
+        sa.Index("ix_deadline_group_assignments_group", group_assignments.c.group_id),
+        sa.Index("ix_user_group_members_group", members.c.user_group_id),
+    ]
+    for index in indexes:
+        index.create(conn, checkfirst=True)
+    # Refresh planner statistics so the new indexes are considered straight away
+    if conn.dialect.name == "postgresql":
+        for table_name in sorted(metadata.tables):
+            conn.exec_driver_sql(f"ANALYZE {table_name}")
+
+
+def _todo_quota_counters(conn):
+    """Counter table for app.quota, backfilled from the current todos"""
+    counters = sa.Table(
+        "todo_quota_counters",
+        sa.MetaData(),
+        sa.Column("scope", sa.String(10), primary_key=True),
+        sa.Column("scope_id", sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column("count", sa.Integer, nullable=False),
+    )
+    counters.create(conn, checkfirst=True)
+    conn.exec_driver_sql("DELETE FROM todo_quota_counters")
+    conn.exec_driver_sql(
+        """
+        INSERT INTO todo_quota_counters (scope, scope_id, count)
+        SELECT 'total', 0, COUNT(*) FROM todos
+        UNION ALL
+        SELECT 'user', assigned_user_id, COUNT(*) FROM todos
+        WHERE assigned_user_id IS NOT NULL GROUP BY assigned_user_id
+        UNION ALL
+        SELECT 'group', assigned_group_id, COUNT(*) FROM todos
+        WHERE assigned_group_id IS NOT NULL GROUP BY assigned_group_id
+        """
+    )
+
+
+def _todo_version_index(conn):
+    """Index behind the MAX(updated_at) version marker used for /api/todos ETags"""
+    todos = _frozen_table(sa.MetaData(), "todos", "updated_at")
+    sa.Index("ix_todos_updated_at", todos.c.updated_at).create(conn, checkfirst=True)
+
+
+REVISIONS = [
+    ("0001", "Baseline schema", _baseline),
+    ("0002", "Hot-path composite and partial indexes", _hot_path_indexes),
+    ("0003", "Todo quota counters", _todo_quota_counters),
+    ("0004", "Todo updated_at index for ETags", _todo_version_index),
+]
@@ -1,6 +1,6 @@
 from datetime import datetime
 import uuid
-from app import db, LoginManager
+from app import db
 from flask_login import UserMixin
 
 # Association table for many-to-many: User <-> UserGroup
@@ -10,10 +10,10 @@ user_group_members = db.Table(
     db.Column(
         "user_group_id", db.Integer, db.ForeignKey("user_groups.id"), primary_key=True
     ),
+    # PK leads with user_id; this serves "members of group X"
+    db.Index("ix_user_group_members_group", "user_group_id"),
 )
 
-login_manager = LoginManager()
-
 # ==================== ASSOCIATION TABLES ====================
 #
 deadline_user_assignments = db.Table(
@@ -23,6 +23,8 @@ deadline_user_assignments = db.Table(
     ),
     db.Column("user_id", db.Integer, db.ForeignKey("users.id"), primary_key=True),
     db.Column("assigned_at", db.DateTime, default=datetime.utcnow),
+    # PK leads with deadline_id; this serves "deadlines for user X"
+    db.Index("ix_deadline_user_assignments_user", "user_id"),
 )
 
 deadline_group_assignments = db.Table(
@@ -34,6 +36,8 @@ deadline_group_assignments = db.Table(
         "group_id", db.Integer, db.ForeignKey("user_groups.id"), primary_key=True
     ),
     db.Column("assigned_at", db.DateTime, default=datetime.utcnow),
+    # PK leads with deadline_id; this serves "deadlines for group X"
+    db.Index("ix_deadline_group_assignments_group", "group_id"),
 )
 #
 # ==================== END ASSOCIATION TABLES ====================
@@ -41,6 +45,10 @@ deadline_group_assignments = db.Table(
 
 class User(UserMixin, db.Model):
     __tablename__ = "users"
+    __table_args__ = (
+        # Admin/non-admin listings: filter_by(is_admin=...) and ORDER BY is_admin, id
+        db.Index("ix_users_is_admin_id", "is_admin", "id"),
+    )
 
     def __init__(self, username=None, email=None, password=None, **kwargs):
         super().__init__(**kwargs)
@@ -117,6 +125,22 @@ class UserGroup(db.Model):
 
 class Todo(db.Model):
     __tablename__ = "todos"
+    __table_args__ = (
+        # Listings are ordered newest first with id as keyset tie-breaker
+        db.Index("ix_todos_created_at_id", "created_at", "id"),
+        # User dashboard: direct and group assignments, newest first
+        db.Index("ix_todos_assigned_user_created", "assigned_user_id", "created_at"),
+        db.Index("ix_todos_assigned_group_created", "assigned_group_id", "created_at"),
+        # MAX(updated_at) is the /api/todos ETag version marker
+        db.Index("ix_todos_updated_at", "updated_at"),
+        # Overdue stats only ever look at open todos with a due date
+        db.Index(
+            "ix_todos_open_date_to",
+            "date_to",
+            postgresql_where=db.text("done = false"),
+            sqlite_where=db.text("done = 0"),
+        ),
+    )
 
     def __init__(self, task=None, done=None, created_at=None, date_from=None, date_to=None, created_by_id=None, **kwargs):
         super().__init__(**kwargs)
@@ -205,9 +229,32 @@ class Todo(db.Model):
         return f"<Todo {self.task[:30]} -> {self.assignee_name}>"
 
 
+class TodoQuotaCounter(db.Model):
+    """Running todo counts used by app.quota instead of COUNT(*) on every insert"""
+
+    __tablename__ = "todo_quota_counters"
+
+    # scope is "total" (scope_id 0), "user" or "group" (scope_id = assignee id)
+    scope = db.Column(db.String(10), primary_key=True)
+    scope_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TodoQuotaCounter {self.scope}:{self.scope_id} = {self.count}>"
+
+
 # In app/models.py - update your Deadline model
 class Deadline(db.Model):
     __tablename__ = "deadlines"
+    __table_args__ = (
+        # Dashboards only show active deadlines, soonest first
+        db.Index(
+            "ix_deadlines_active_date",
+            "deadline_date",
+            postgresql_where=db.text("is_active = true"),
+            sqlite_where=db.text("is_active = 1"),
+        ),
+    )
 
     def __init__(self, title=None, description=None, deadline_date=None, is_active=None, created_by_id=None, **kwargs):
         super().__init__(**kwargs)
@@ -270,8 +317,3 @@ class Deadline(db.Model):
         status = "ACTIVE" if self.is_active else "INACTIVE"
         return f"<Deadline {self.title} - {status}>"
 
-
-# Now this will work
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
@@ -0,0 +1,72 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import tuple_
+
+# Page size limits for keyset-paginated API endpoints
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Rows fetched per round trip when streaming through a server-side cursor
+STREAM_BATCH_SIZE = 500
+
+
+def encode_cursor(created_at, row_id):
+    """Encode the (created_at, id) of the last row into an opaque token"""
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """Decode a cursor token back into (created_at, id). Raises ValueError if invalid"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(payload, list):
+            raise ValueError("cursor payload is not a list")
+        created_at, row_id = payload
+        if not isinstance(row_id, str):
+            raise ValueError("cursor id is not a string")
+        return datetime.fromisoformat(created_at), row_id
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def parse_page_size(raw_value):
+    """Clamp the requested page size into [1, MAX_PAGE_SIZE]"""
+    try:
+        size = int(raw_value)
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def keyset_page(query, model, after=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Return (rows, next_cursor) for a query ordered by (created_at, id) descending.
+    `after` is a decoded cursor; the page starts strictly after that row, so no
+    OFFSET scan is needed.
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if after:
+        created_at, row_id = after
+        query = query.filter(tuple_(model.created_at, model.id) < (created_at, row_id))
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
+
+
+def stream_ndjson(query, serialize, batch_size=STREAM_BATCH_SIZE):
+    """
+    Yield one JSON line per row. yield_per makes the driver use a server-side
+    cursor, so only batch_size rows are held in memory at any time.
+    """
+    for row in query.yield_per(batch_size):
+        yield json.dumps(serialize(row), separators=(",", ":")) + "\n"
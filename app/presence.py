@@ -0,0 +1,193 @@
+# app/presence.py
+# Who is online, shared by every gunicorn worker on the node.
+#
+# Login, logout and heartbeats record a last-activity timestamp per user in a
+# small WAL-mode SQLite file (PRESENCE_DB_PATH). The table is indexed on
+# last_active, so "who was active in the last N seconds" is a range scan over
+# recent rows instead of a Python loop over every user, and every worker sees
+# the same answer. Entries older than PRESENCE_RETENTION are purged.
+import os
+import sqlite3
+import threading
+import time
+
+from flask import current_app
+
+from app import events
+
+ONLINE_WINDOW = 60  # seconds since last activity to count as online
+AWAY_WINDOW = 300  # ... and as away; older is offline
+DEFAULT_RETENTION = 3600
+BUSY_TIMEOUT_MS = 2000
+PURGE_EVERY = 500  # purge stale rows every N touches (per process)
+
+ONLINE = "online"
+AWAY = "away"
+OFFLINE = "offline"
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS user_presence (
+        user_id INTEGER PRIMARY KEY,
+        last_active REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_user_presence_last_active ON user_presence (last_active)",
+]
+
+
+class PresenceStore:
+    """Last-activity timestamps in a SQLite file shared across worker processes"""
+
+    def __init__(self, path, retention=DEFAULT_RETENTION):
+        self.path = path
+        self.retention = retention
+        self._local = threading.local()
+        self._touches = 0
+        conn = self._connection()
+        for statement in SCHEMA:
+            conn.execute(statement)
+
+    def _connection(self):
+        """One connection per thread, reopened after a fork"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def touch(self, user_id, now=None):
+        """Record activity for a user; returns True if they were not online before"""
+        now = now or time.time()
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT last_active FROM user_presence WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        conn.execute(
+            "INSERT INTO user_presence (user_id, last_active) VALUES (?, ?) "
+            "ON CONFLICT (user_id) DO UPDATE SET last_active = excluded.last_active",
+            (user_id, now),
+        )
+        self._touches += 1
+        if self._touches % PURGE_EVERY == 0:
+            self.purge(now=now)
+        return row is None or now - row[0] > ONLINE_WINDOW
+
+    def remove(self, user_id):
+        """Forget a user (logout)"""
+        self._connection().execute("DELETE FROM user_presence WHERE user_id = ?", (user_id,))
+
+    def purge(self, older_than=None, now=None):
+        """Drop entries older than `older_than` seconds (default: the retention)"""
+        now = now or time.time()
+        cutoff = now - (older_than if older_than is not None else self.retention)
+        return self._connection().execute(
+            "DELETE FROM user_presence WHERE last_active < ?", (cutoff,)
+        ).rowcount
+
+    def active_since(self, seconds, now=None):
+        """{user_id: last_active} for users active within the last `seconds` (index range scan)"""
+        now = now or time.time()
+        rows = self._connection().execute(
+            "SELECT user_id, last_active FROM user_presence WHERE last_active >= ?",
+            (now - seconds,),
+        )
+        return dict(rows.fetchall())
+
+    def bucket_ids(self, status, now=None):
+        """User ids currently in the online or away bucket (index range scan)"""
+        now = now or time.time()
+        if status == ONLINE:
+            low, high = now - ONLINE_WINDOW, None
+        elif status == AWAY:
+            low, high = now - AWAY_WINDOW, now - ONLINE_WINDOW
+        else:
+            raise ValueError(f"Only online/away buckets are stored, not {status!r}")
+        sql = "SELECT user_id FROM user_presence WHERE last_active >= ?"
+        params = [low]
+        if high is not None:
+            sql += " AND last_active < ?"
+            params.append(high)
+        return [row[0] for row in self._connection().execute(sql, params)]
+
+    def last_activity(self, user_ids=None, now=None):
+        """{user_id: last_active} for the given users (all retained entries if None)"""
+        if user_ids is None:
+            return self.active_since(self.retention, now=now)
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        result = {}
+        conn = self._connection()
+        for start in range(0, len(user_ids), 500):  # SQLite parameter limit
+            chunk = user_ids[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            result.update(
+                conn.execute(
+                    f"SELECT user_id, last_active FROM user_presence WHERE user_id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+            )
+        return result
+
+    def counts(self, now=None):
+        """Number of online and away users, from one range query"""
+        now = now or time.time()
+        online, away = self._connection().execute(
+            "SELECT COALESCE(SUM(last_active >= :online), 0), "
+            "COALESCE(SUM(last_active < :online), 0) "
+            "FROM user_presence WHERE last_active >= :away",
+            {"online": now - ONLINE_WINDOW, "away": now - AWAY_WINDOW},
+        ).fetchone()
+        return {ONLINE: online, AWAY: away}
+
+    def clear(self):
+        self._connection().execute("DELETE FROM user_presence")
+
+
+def status_for(last_active, now=None):
+    """online / away / offline for a last-activity timestamp (None = never seen)"""
+    if last_active is None:
+        return OFFLINE
+    elapsed = (now or time.time()) - last_active
+    if elapsed <= ONLINE_WINDOW:
+        return ONLINE
+    if elapsed <= AWAY_WINDOW:
+        return AWAY
+    return OFFLINE
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store():
+    """The presence store for the current app's PRESENCE_DB_PATH"""
+    path = current_app.config["PRESENCE_DB_PATH"]
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                store = PresenceStore(
+                    path, retention=current_app.config.get("PRESENCE_RETENTION", DEFAULT_RETENTION)
+                )
+                _stores[path] = store
+    return store
+
+
+def touch(user_id):
+    """Record activity; live admin pages are told when a user comes online"""
+    if get_store().touch(user_id):
+        events.publish_presence(user_id, ONLINE)
+
+
+def remove(user_id):
+    get_store().remove(user_id)
+    events.publish_presence(user_id, OFFLINE)
@@ -0,0 +1,55 @@
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
+
+from app.models import Todo, Deadline, user_group_members
+
+# Shared query builders for listing routes.
+# Every listing goes through here so the relationships used by Todo.to_dict,
+# Todo.assignee_name and the dashboard templates are loaded in the same
+# SELECT instead of one lazy SELECT per row (N+1).
+
+
+def todo_listing_options():
+    """Loader options for everything a rendered/serialized todo row touches"""
+    return (
+        joinedload(Todo.assigned_user),
+        joinedload(Todo.assigned_group),
+        joinedload(Todo.created_by),
+    )
+
+
+def todos_query():
+    """Base query for todo listings with assignee and creator eager-loaded"""
+    return Todo.query.options(*todo_listing_options())
+
+
+def all_todos_query():
+    """All todos, newest first (admin dashboard)"""
+    return todos_query().order_by(Todo.created_at.desc(), Todo.id.desc())
+
+
+def user_todos_query(user_id):
+    """
+    Todos assigned to the user directly or to one of their groups, newest first.
+    Group membership is resolved with a join, so the user's groups are never loaded.
+    """
+    membership = and_(
+        user_group_members.c.user_group_id == Todo.assigned_group_id,
+        user_group_members.c.user_id == user_id,
+    )
+    return (
+        todos_query()
+        .outerjoin(user_group_members, membership)
+        .filter(
+            or_(
+                Todo.assigned_user_id == user_id,
+                user_group_members.c.user_id.isnot(None),
+            )
+        )
+        .order_by(Todo.created_at.desc(), Todo.id.desc())
+    )
+
+
+def deadlines_query():
+    """Base query for deadline listings with the creator eager-loaded"""
+    return Deadline.query.options(joinedload(Deadline.created_by))
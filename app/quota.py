@@ -0,0 +1,145 @@
+# app/quota.py
+# Todo quotas backed by the todo_quota_counters table.
+# A slot is reserved with one conditional UPDATE on the counter's primary key
+# (count = count + 1 WHERE count < limit) inside the same transaction as the
+# INSERT. The row lock taken by the UPDATE serialises concurrent workers, so
+# the limit cannot be overshot, and a rollback releases the slot automatically.
+from flask import current_app
+from sqlalchemy import func, update, select
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import Todo, TodoQuotaCounter
+
+TOTAL_SCOPE = "total"
+USER_SCOPE = "user"
+GROUP_SCOPE = "group"
+
+QUOTA_MESSAGES = {
+    TOTAL_SCOPE: "Maximum number of todos reached",
+    USER_SCOPE: "This user has reached their maximum number of todos",
+    GROUP_SCOPE: "This group has reached its maximum number of todos",
+}
+
+
+def _limit_for(scope):
+    """Configured limit for a scope; None or 0 means unlimited"""
+    key = {
+        TOTAL_SCOPE: "TODO_QUOTA_TOTAL",
+        USER_SCOPE: "TODO_QUOTA_PER_USER",
+        GROUP_SCOPE: "TODO_QUOTA_PER_GROUP",
+    }[scope]
+    return current_app.config.get(key) or None
+
+
+def _scopes(assigned_user_id=None, assigned_group_id=None, include_total=True):
+    scopes = [(TOTAL_SCOPE, 0)] if include_total else []
+    if assigned_user_id:
+        scopes.append((USER_SCOPE, int(assigned_user_id)))
+    if assigned_group_id:
+        scopes.append((GROUP_SCOPE, int(assigned_group_id)))
+    return scopes
+
+
+def _current_count(scope, scope_id):
+    """COUNT(*) for one scope - only used to backfill a missing counter row"""
+    query = db.session.query(func.count(Todo.id))
+    if scope == USER_SCOPE:
+        query = query.filter(Todo.assigned_user_id == scope_id)
+    elif scope == GROUP_SCOPE:
+        query = query.filter(Todo.assigned_group_id == scope_id)
+    return query.scalar()
+
+
+def _counter_exists(scope, scope_id):
+    return (
+        db.session.execute(
+            select(TodoQuotaCounter.count).where(
+                TodoQuotaCounter.scope == scope, TodoQuotaCounter.scope_id == scope_id
+            )
+        ).first()
+        is not None
+    )
+
+
+def _create_counter(scope, scope_id):
+    """Backfill a counter row; a nested transaction absorbs a concurrent insert"""
+    try:
+        with db.session.begin_nested():
+            db.session.add(
+                TodoQuotaCounter(
+                    scope=scope, scope_id=scope_id, count=_current_count(scope, scope_id)
+                )
+            )
+    except IntegrityError:
+        pass  # another worker created it first
+
+
+def _adjust(scope, scope_id, delta, limit=None):
+    stmt = update(TodoQuotaCounter).where(
+        TodoQuotaCounter.scope == scope, TodoQuotaCounter.scope_id == scope_id
+    )
+    if delta > 0 and limit:
+        stmt = stmt.where(TodoQuotaCounter.count + delta <= limit)
+    if delta < 0:
+        stmt = stmt.where(TodoQuotaCounter.count + delta >= 0)
+    stmt = stmt.values(count=TodoQuotaCounter.count + delta).execution_options(
+        synchronize_session=False
+    )
+    return db.session.execute(stmt).rowcount == 1
+
+
+def reserve(assigned_user_id=None, assigned_group_id=None, amount=1, include_total=True):
+    """
+    Reserve `amount` todo slots in the current transaction.
+    Returns (True, None) or (False, message). The caller must roll back on failure
+    and commit together with the new todo(s) on success.
+    Reassignments pass include_total=False: the overall number of todos is unchanged.
+    """
+    for scope, scope_id in _scopes(assigned_user_id, assigned_group_id, include_total):
+        limit = _limit_for(scope)
+        if _adjust(scope, scope_id, amount, limit):
+            continue
+        if not _counter_exists(scope, scope_id):
+            _create_counter(scope, scope_id)
+            if _adjust(scope, scope_id, amount, limit):
+                continue
+        return False, QUOTA_MESSAGES[scope]
+    return True, None
+
+
+def release(assigned_user_id=None, assigned_group_id=None, amount=1, include_total=True):
+    """Give back `amount` slots in the current transaction (e.g. after a delete)"""
+    for scope, scope_id in _scopes(assigned_user_id, assigned_group_id, include_total):
+        _adjust(scope, scope_id, -amount)
+
+
+def rebuild_counters():
+    """Recompute every counter from the todos table (after seeding or bulk imports)"""
+    TodoQuotaCounter.query.delete()
+    total = db.session.query(func.count(Todo.id)).scalar()
+    counters = [TodoQuotaCounter(scope=TOTAL_SCOPE, scope_id=0, count=total)]
+
+    per_user = (
+        db.session.query(Todo.assigned_user_id, func.count(Todo.id))
+        .filter(Todo.assigned_user_id.isnot(None))
+        .group_by(Todo.assigned_user_id)
+    )
+    counters += [
+        TodoQuotaCounter(scope=USER_SCOPE, scope_id=user_id, count=count)
+        for user_id, count in per_user
+    ]
+
+    per_group = (
+        db.session.query(Todo.assigned_group_id, func.count(Todo.id))
+        .filter(Todo.assigned_group_id.isnot(None))
+        .group_by(Todo.assigned_group_id)
+    )
+    counters += [
+        TodoQuotaCounter(scope=GROUP_SCOPE, scope_id=group_id, count=count)
+        for group_id, count in per_group
+    ]
+
+    db.session.add_all(counters)
+    db.session.commit()
+    return len(counters)
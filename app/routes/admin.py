@@ -1,4 +1,5 @@
 # routes/admin.py
+import io
 import time
 from flask import (
     Blueprint,
@@ -8,29 +9,27 @@ from flask import (
     url_for,
     flash,
     jsonify,
+    Response,
+    stream_with_context,
 )
 from flask_login import (
     login_required,
     current_user,
 )
 from functools import wraps
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
 from app.models import User, Todo, UserGroup, Deadline
 from app.security.validation import validate_todo_input
 from app.security.sanitize_module import sanitize_input
 from app.security.rate_limit import get_smart_visitor_id
+from app.queries import all_todos_query
+from app import stats, quota, events, importer, export, conditional
 from flask_wtf.csrf import generate_csrf  # Import this
 from datetime import datetime
 from app import db, limiter
 import logging
-from app.routes.auth import (
-    active_user_sessions,
-    cleanup_expired_sessions,
-    user_last_activity,
-)
-
-# Configuration
-MAX_TODOS = 1000
+from app import presence
 
 # Logger setup
 logger = logging.getLogger("AdminRoutes")
@@ -44,6 +43,9 @@ if not logger.hasHandlers():
     logger.addHandler(console_handler)
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 
+USERS_PER_PAGE = 50
+USER_STATUS_FILTERS = ("all", presence.ONLINE, presence.AWAY, presence.OFFLINE)
+
 
 # Admin required decorator
 def admin_required(f):
@@ -99,7 +101,7 @@ def inject_helpers():
 @admin_required
 def dashboard():
     # Admin sees ALL tasks
-    todos = Todo.query.order_by(Todo.created_at.desc()).all()
+    todos = all_todos_query().all()
     return render_template(
         "admin/admin_dashboard.html",
         todos=todos,
@@ -112,73 +114,66 @@ def dashboard():
 @login_required
 @admin_required
 def show_all_users():
-    import time
+    status_filter = request.args.get("status", "all")
+    if status_filter not in USER_STATUS_FILTERS:
+        status_filter = "all"
+    page = request.args.get("page", 1, type=int)
+    per_page = min(max(request.args.get("per_page", USERS_PER_PAGE, type=int), 1), 200)
+    current_time = time.time()
 
-    # Clean up very old entries (1 hour+)
-    cleanup_expired_sessions(timeout_seconds=3600)
+    # Status buckets come from the presence store's last_active index, so only
+    # recently active users are read - never the whole users table
+    store = presence.get_store()
+    counts = store.counts(now=current_time)
 
     # Sort users: admins first, then by ID
-    users = User.query.order_by(User.is_admin.desc(), User.id.asc()).all()
-    total_users = len(users)
-    current_time = time.time()
+    query = User.query.options(selectinload(User.groups)).order_by(
+        User.is_admin.desc(), User.id.asc()
+    )
+    if status_filter in (presence.ONLINE, presence.AWAY):
+        query = query.filter(User.id.in_(store.bucket_ids(status_filter, now=current_time)))
+    elif status_filter == presence.OFFLINE:
+        recent_ids = list(store.active_since(presence.AWAY_WINDOW, now=current_time))
+        if recent_ids:
+            query = query.filter(User.id.notin_(recent_ids))
+
+    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    users = pagination.items
+    total_users = (
+        pagination.total
+        if status_filter == "all"
+        else db.session.query(func.count(User.id)).scalar()
+    )
 
+    # Statuses only for the users on this page
+    last_activity = store.last_activity([user.id for user in users], now=current_time)
     user_statuses = {}
     user_last_seen = {}
-
-    # Clean active_user_sessions - remove users inactive for 1+ minutes
-    users_to_remove_from_active = []
-    for user_id in list(active_user_sessions):
-        if user_id in user_last_activity:
-            time_diff = current_time - user_last_activity[user_id]
-            if time_diff > 60:  # 1 minute - remove from active sessions
-                users_to_remove_from_active.append(user_id)
-
-    for user_id in users_to_remove_from_active:
-        active_user_sessions.discard(user_id)
-
-    # Calculate statuses with production timeouts
     for user in users:
-        user_id = user.id
-
-        if user_id in user_last_activity:
-            time_diff = current_time - user_last_activity[user_id]
-            is_currently_active = user_id in active_user_sessions
-
-            if is_currently_active and time_diff <= 60:
-                # Currently sending heartbeats (within 1 minute) - Online
-                user_statuses[user_id] = "online"
-                user_last_seen[user_id] = "now"
-            elif time_diff <= 60:
-                # Very recent activity (within 1 minute) - Online
-                user_statuses[user_id] = "online"
-                user_last_seen[user_id] = "now"
-            elif time_diff <= 300:  # 5 minutes
-                # Recent but not current (1-5 minutes) - Away
-                user_statuses[user_id] = "away"
-                user_last_seen[user_id] = format_time_ago(time_diff)
-            else:
-                # Longer ago (5+ minutes) - Offline
-                user_statuses[user_id] = "offline"
-                user_last_seen[user_id] = format_time_ago(time_diff)
+        last_active = last_activity.get(user.id)
+        user_statuses[user.id] = presence.status_for(last_active, current_time)
+        if last_active is None:
+            user_last_seen[user.id] = "never"
+        elif user_statuses[user.id] == presence.ONLINE:
+            user_last_seen[user.id] = "now"
         else:
-            # Never active
-            user_statuses[user_id] = "offline"
-            user_last_seen[user_id] = "never"
-
-    # Calculate counts
-    currently_online = sum(1 for status in user_statuses.values() if status == "online")
-    currently_away = sum(1 for status in user_statuses.values() if status == "away")
-    currently_offline = sum(
-        1 for status in user_statuses.values() if status == "offline"
-    )
+            user_last_seen[user.id] = format_time_ago(current_time - last_active)
+
+    currently_online = counts[presence.ONLINE]
+    currently_away = counts[presence.AWAY]
+    currently_offline = max(total_users - currently_online - currently_away, 0)
 
     return render_template(
         "admin/users_all.html",
         users=users,
+        pagination=pagination,
+        status_filter=status_filter,
+        status_filters=USER_STATUS_FILTERS,
+        per_page=per_page,
         user_statuses=user_statuses,
         user_last_seen=user_last_seen,
         active_users_count=currently_online,
-        away_users_count=currently_away,  # Add this if you want to show away count
+        away_users_count=currently_away,
         logged_out_users_count=currently_offline,
         total_users=total_users,
     )
@@ -402,10 +397,6 @@ def delete_deadline(deadline_id):
 def add_todo():
     """Add a new todo (admin version)"""
     try:
-        if Todo.query.count() >= MAX_TODOS:
-            flash("Maximum number of todos reached", "error")
-            return redirect(url_for("admin.dashboard"))
-
         if request.method == "GET":
             # Render the add todo form
             users = User.query.all()
@@ -486,8 +477,20 @@ def add_todo():
                 if assigned_group:
                     new_todo.assigned_group = assigned_group
 
+            # Reserve quota slots in the same transaction as the insert
+            reserved, quota_message = quota.reserve(
+                new_todo.assigned_user.id if new_todo.assigned_user else None,
+                new_todo.assigned_group.id if new_todo.assigned_group else None,
+            )
+            if not reserved:
+                db.session.rollback()
+                flash(quota_message, "error")
+                return redirect(url_for("admin.dashboard"))
+
             db.session.add(new_todo)
             db.session.commit()
+            stats.todo_added(new_todo)
+            events.publish_todo(events.TODO_CREATED, new_todo)
             flash("Task added successfully", "success")
             return redirect(url_for("admin.dashboard"))
 
@@ -517,28 +520,110 @@ def add_todo():
 # deadline user-select api points for retrieving real-time data from database
 # all users and user_groups
 @admin_bp.route("/api/users", methods=["GET"])
-@limiter.limit("20 per hour", key_func=get_smart_visitor_id)
+@limiter.limit(
+    "20 per hour", key_func=get_smart_visitor_id, deduct_when=conditional.counts_against_limit
+)
 @login_required
 @admin_required
 def get_users_api():
-    users = User.query.filter_by(is_admin=False).all()
-    return jsonify(
-        [
-            {"id": user.id, "username": user.username, "email": user.email}
-            for user in users
+    def build():
+        rows = db.session.execute(
+            select(User.id, User.username, User.email)
+            .filter_by(is_admin=False)
+            .order_by(User.id)
+        ).all()
+        return [
+            {"id": user_id, "username": username, "email": email}
+            for user_id, username, email in rows
         ]
+
+    return conditional.conditional_response(
+        conditional.make_etag("admin-users", conditional.listing_version(User)), build
     )
 
 
 @admin_bp.route("/api/groups", methods=["GET"])
-@limiter.limit("20 per hour", key_func=get_smart_visitor_id)
+@limiter.limit(
+    "20 per hour", key_func=get_smart_visitor_id, deduct_when=conditional.counts_against_limit
+)
 @login_required
 @admin_required
 def get_groups_api():
-    groups = UserGroup.query.all()
-    return jsonify(
-        [
-            {"id": group.id, "name": group.name, "description": group.description}
-            for group in groups
+    def build():
+        rows = db.session.execute(
+            select(UserGroup.id, UserGroup.name, UserGroup.description).order_by(UserGroup.id)
+        ).all()
+        return [
+            {"id": group_id, "name": name, "description": description}
+            for group_id, name, description in rows
         ]
+
+    return conditional.conditional_response(
+        conditional.make_etag("admin-groups", conditional.listing_version(UserGroup)), build
+    )
+
+
+@admin_bp.route("/api/import-todos", methods=["POST"])
+@limiter.limit("10 per hour", key_func=get_smart_visitor_id)
+@login_required
+@admin_required
+def import_todos_api():
+    """
+    Import todos from an uploaded CSV/NDJSON file (multipart field "file") or from
+    the raw request body. ?format=csv|ndjson overrides detection.
+    """
+    upload = request.files.get("file")
+    if upload is not None:
+        binary = upload.stream
+        fmt = request.args.get("format") or importer.detect_format(
+            upload.filename, upload.mimetype
+        )
+    else:
+        binary = io.BufferedReader(request.stream)
+        fmt = request.args.get("format") or importer.detect_format(
+            content_type=request.mimetype
+        )
+    if fmt not in importer.FORMATS:
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+
+    try:
+        stream = io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+        report = importer.import_stream(stream, fmt, creator_id=current_user.id)
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({"error": "File must be UTF-8 encoded"}), 400
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Database error importing todos: {e}")
+        return jsonify({"error": "Error importing todos"}), 500
+
+    return jsonify(report.to_dict())
+
+
+@admin_bp.route("/api/export/<kind>", methods=["GET"])
+@limiter.limit("30 per hour", key_func=get_smart_visitor_id)
+@login_required
+@admin_required
+def export_api(kind):
+    """
+    Stream all todos or deadlines for reporting.
+    ?format=csv|ndjson|columnar (default csv), ?compress=gzip to compress on the fly.
+    """
+    fmt = request.args.get("format", "csv")
+    compression = request.args.get("compress")
+    if compression not in (None, export.GZIP):
+        return jsonify({"error": "compress must be gzip"}), 400
+    try:
+        chunks = export.stream_export(kind, fmt, compression)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    filename = export.download_name(kind, fmt, compression)
+    return Response(
+        stream_with_context(chunks),
+        mimetype=export.mimetype(fmt, compression),
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Accel-Buffering": "no",
+        },
     )
@@ -3,9 +3,9 @@ from flask.typing import ResponseReturnValue
 from flask_login import login_user, logout_user, login_required, current_user
 from app.models import User
 from app.security.validation import validate_todo_input
-from app.security.hsh import verify_password
-from app.security.sanitize_module import sanitize_input
-from app import limiter
+from app.security.hsh import verify_password, hash_password, needs_rehash, PasswordHasherBusy
+from app.security.sanitize_module import sanitize_fields
+from app import limiter, db
 from app.security.rate_limit import get_smart_visitor_id
 from flask_wtf.csrf import generate_csrf  # Import this
 import logging
@@ -13,12 +13,7 @@ from datetime import datetime
 import time
 from sqlalchemy.exc import OperationalError, TimeoutError
 from app.captcha import get_random_visual_captcha, validate_visual_captcha
-
-##auth_session_timer
-
-from collections import defaultdict
-
-##auth_session_timer
+from app import presence, last_seen, user_cache
 
 # Create auth-specific logger
 auth_logger = logging.getLogger("app.auth")
@@ -36,8 +31,6 @@ if not auth_logger.handlers:
 
 # Create blueprint
 bp = Blueprint("auth", __name__)
-active_user_sessions = set()  # In production, use Redis or database
-user_last_activity = defaultdict(float)
 
 
 # ---------------- LOGIN / LOGOUT ----------------
@@ -65,10 +58,20 @@ def login() -> ResponseReturnValue:
     captcha_id = request.form.get("captcha_id", "")
     captcha_answer = request.form.get("captcha_answer", "").strip()
 
-    # Sanitize inputs
-    safe_username, username_score, username_matches = sanitize_input(raw_username)
-    safe_password, password_score, password_matches = sanitize_input(raw_password)
-    safe_captcha, captcha_score, captcha_matches = sanitize_input(captcha_answer)
+    # Sanitize inputs in one pass (single consolidated log line)
+    form_check = sanitize_fields(
+        {
+            "username": raw_username,
+            "password": raw_password,
+            "captcha": captcha_answer,
+        },
+        context={"route": "login", "ip": request.remote_addr},
+    )
+    safe_username = form_check["fields"]["username"][0]
+    safe_password = form_check["fields"]["password"][0]
+    safe_captcha = form_check["fields"]["captcha"][0]
+    username_score = form_check["scores"]["username"]
+    password_score = form_check["scores"]["password"]
 
     # Log and block suspicious attempts
     if username_score >= 5 or password_score >= 5:
@@ -124,11 +127,17 @@ def login() -> ResponseReturnValue:
 
     # Authenticate user
     if user and verify_password(safe_password, user.password):
+        # Upgrade hashes made with an older (lower) cost factor
+        if needs_rehash(user.password):
+            try:
+                user.password = hash_password(safe_password)
+                db.session.commit()
+                auth_logger.info(f"Password hash upgraded for user ID {user.id}")
+            except PasswordHasherBusy:
+                db.session.rollback()  # try again on a later login
+
         login_user(user)
-        print(f"ADDING USER {user.id} TO ACTIVE SESSIONS")  # Debug line
-        active_user_sessions.add(user.id)
-        user_last_activity[user.id] = time.time()
-        print(f"Active sessions now: {active_user_sessions}")  # Debug line
+        presence.touch(user.id)
 
         # Log successful login
         auth_logger.info(
@@ -158,9 +167,8 @@ def login() -> ResponseReturnValue:
 @bp.route("/logout")
 @login_required
 def logout():
-    # Remove user from active sessions
-    active_user_sessions.discard(current_user.id)
-    user_last_activity.pop(current_user.id, None)  # Clean up timestamp
+    # Remove user from the shared presence store
+    presence.remove(current_user.id)
 
     # Log logout before logging out
     auth_logger.info(
@@ -168,45 +176,22 @@ def logout():
         f"IP: {request.remote_addr}"
     )
 
+    user_cache.invalidate(current_user.id)  # next login starts from a fresh snapshot
     logout_user()
     flash("Logged out successfully.", "success")
     return redirect(url_for("routes.index"))
 
 
-###Session cleaner.
-def cleanup_expired_sessions(timeout_seconds=600):
-    """Remove users who haven't been active for timeout_seconds"""
-    import time
-
-    current_time = time.time()
-    expired_users = []
-
-    # Only remove very old entries from user_last_activity
-    for user_id, last_activity in list(user_last_activity.items()):
-        if current_time - last_activity > timeout_seconds:
-            expired_users.append(user_id)
-
-    # Remove expired sessions
-    for user_id in expired_users:
-        active_user_sessions.discard(user_id)
-        user_last_activity.pop(user_id, None)
-
-    return len(expired_users)
-
-
 ## Flask route to handle heartbeats (for js script)
 @bp.route("/api/heartbeat", methods=["POST"])
 @limiter.limit(
     "20 per minute", key_func=get_smart_visitor_id
 )  # API endpoint protection
 def heartbeat():
-    import time
-
     if not current_user.is_authenticated:
         return "", 401
 
-    current_user.update_last_seen()  # Permanent record
-    user_last_activity[current_user.id] = time.time()
-    active_user_sessions.add(current_user.id)
+    last_seen.record(current_user.id)  # Buffered, flushed in bulk to users.last_seen
+    presence.touch(current_user.id)
 
     return "", 204
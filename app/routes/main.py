@@ -6,6 +6,9 @@ from flask import (
     url_for,
     flash,
     jsonify,
+    Response,
+    stream_with_context,
+    current_app,
 )
 from flask_login import (
     login_user,
@@ -14,11 +17,17 @@ from flask_login import (
     current_user,
 )
 from sqlalchemy import func
-from app.models import User, Todo, UserGroup
+from sqlalchemy.exc import IntegrityError
+from werkzeug.exceptions import HTTPException
+from app.models import User, Todo, user_group_members
 from app.security.validation import validate_todo_input
 from app.security.hsh import hash_password, verify_password
 from app.security.rate_limit import get_smart_visitor_id
-from app.security.sanitize_module import sanitize_input
+from app.security.sanitize_module import sanitize_input, sanitize_fields
+from app.pagination import decode_cursor, keyset_page, parse_page_size, stream_ndjson
+from app.queries import todos_query
+from app.dashboard import get_dashboard_data
+from app import stats, quota, events, presence, last_seen, bulk, conditional, group_directory
 from flask_wtf.csrf import generate_csrf  # Import this
 from datetime import datetime
 from app import db, limiter
@@ -45,10 +54,6 @@ if not logger.hasHandlers():
 
 bp = Blueprint("routes", __name__)
 
-# Configuration
-MAX_TODOS = 1000
-
-
 def get_current_user_id():
     """Helper function to get current user ID for created_by_id"""
     if current_user.is_authenticated:
@@ -64,6 +69,39 @@ def get_current_user_id():
     return any_user.id if any_user else None
 
 
+def wants_json():
+    """True when the caller (fetch/AJAX) asked for JSON instead of a redirect"""
+    if request.is_json:
+        return True
+    best = request.accept_mimetypes.best_match(["text/html", "application/json"])
+    return best == "application/json"
+
+
+def mutation_data():
+    """Request payload of a todo mutation: JSON body or form fields"""
+    if request.is_json:
+        return request.get_json(silent=True) or {}
+    return request.form
+
+
+def todo_result(message, category="success", todo=None, status=200, **extra):
+    """JSON with just the changed row for AJAX callers, flash + redirect otherwise"""
+    if wants_json():
+        body = {"message": message, **extra}
+        if todo is not None:
+            body["todo"] = todo.to_dict()
+        if category == "error":
+            body["error"] = message
+        return jsonify(body), status
+    flash(message, category)
+    return redirect(url_for("routes.dashboard"))
+
+
+def error_status(exc):
+    """HTTP status for an exception caught by a todo route"""
+    return exc.code if isinstance(exc, HTTPException) else 500
+
+
 def get_group_display_name(group_name):
     GROUP_DISPLAY_NAMES = {
         "frontend": "Front-End",
@@ -105,23 +143,9 @@ def dashboard():
             # If admin somehow gets here, redirect to admin dashboard
             return redirect(url_for("admin.dashboard"))
 
-        # Get user's direct tasks
-        user_todos = Todo.query.filter_by(assigned_user_id=current_user.id)
-
-        # Get tasks from user's groups
-        group_todos = Todo.query.filter(
-            Todo.assigned_group_id.in_([group.id for group in current_user.groups])
-        )
-
-        # Combine and order all tasks
-        todos = user_todos.union(group_todos).order_by(Todo.created_at.desc()).all()
-
-        # Get user's deadlines
-
+        # Direct + group tasks and the next few assigned deadlines
         now = datetime.now()
-
-        # Get deadlines assigned to this user (you'll need to implement this based on your assignment logic)
-        user_deadlines = get_user_deadlines(current_user, now)
+        todos, user_deadlines = get_dashboard_data(current_user.id, now)
 
         return render_template(
             "dashboard.html",
@@ -142,30 +166,6 @@ def dashboard():
         )
 
 
-def get_user_deadlines(user, current_time):
-    """Get deadlines assigned to a user - temporary test version"""
-    try:
-        from app.models import Deadline
-        from datetime import timedelta
-
-        # For testing - get all active deadlines
-        # Later you'll filter by user assignments
-        active_deadlines = Deadline.query.filter_by(is_active=True).all()
-
-        # Add helper properties for template
-        for deadline in active_deadlines:
-            if hasattr(deadline.deadline_date, "date"):
-                time_diff = deadline.deadline_date - current_time
-                deadline.days_remaining = time_diff.days
-                deadline.is_urgent = time_diff.days <= 3 and time_diff.days >= 0
-
-        return active_deadlines[:3]  # Show first 3 for testing
-
-    except Exception as e:
-        logger.error(f"Error fetching user deadlines: {e}")
-        return []
-
-
 # ---------------- REGISTER ----------------
 LAME_CAPTCHA_QUESTIONS = {"1+1": "2"}
 
@@ -177,18 +177,23 @@ def get_random_captcha():
 
 
 @bp.route("/api/registration/groups")
-@limiter.limit("50 per hour", key_func=get_smart_visitor_id)
+@limiter.limit(
+    "50 per hour", key_func=get_smart_visitor_id, deduct_when=conditional.counts_against_limit
+)
 def get_registration_groups():
     try:
-        # Only get active groups
-        groups = UserGroup.query.filter_by(is_active=True).all()
-        result = [
-            {"id": group.id, "name": group.name, "description": group.description}
-            for group in groups
-        ]
-        return jsonify(result)
+        # Active groups come from the in-process directory; its version is the ETag
+        groups = group_directory.get_directory().current()
+        return conditional.conditional_response(
+            conditional.make_etag("registration-groups", groups.version),
+            lambda: [
+                {"id": group.id, "name": group.name, "description": group.description}
+                for group in groups.entries
+            ],
+            private=False,
+        )
     except Exception as e:
-        print(f"Error fetching groups: {e}")
+        logger.error(f"Database error fetching registration groups: {e}")
         return jsonify([]), 500
 
 
@@ -202,15 +207,6 @@ def register():
             visual_captcha=visual_captcha,
         )
 
-    print(f"🚨 DEBUG REGISTRATION:")
-    print(f"   Form data: {dict(request.form)}")
-    group_from_form = request.form.get("group", "")
-    print(f"   Group from form: '{group_from_form}'")
-    print(f"   All DB groups: {[g.name for g in UserGroup.query.all()]}")
-
-    # Check if group exists
-    found_group = UserGroup.query.filter_by(name=group_from_form).first()
-    print(f"   Group lookup result: {found_group}")
     # Get form data
     username = request.form.get("username", "").strip()
     email = request.form.get("email", "").strip()
@@ -219,49 +215,28 @@ def register():
     captcha_id = request.form.get("captcha_id", "")
     user_answer = request.form.get("captcha_answer", "").strip()
 
-    # Sanitize ALL inputs
-    safe_username, username_score, username_matches = sanitize_input(username)
-    safe_email, email_score, email_matches = sanitize_input(email)
-    safe_password, password_score, password_matches = sanitize_input(password)
-    safe_group, group_score, group_matches = sanitize_input(group_name)
-    safe_captcha, captcha_score, captcha_matches = sanitize_input(user_answer)
-
-    # Check sanitization scores
-    if (
-        username_score >= 5
-        or email_score >= 5
-        or password_score >= 5
-        or group_score >= 5
-        or captcha_score >= 5
-    ):
+    # Sanitize ALL inputs in one pass (single consolidated log line)
+    form_check = sanitize_fields(
+        {
+            "username": username,
+            "email": email,
+            "password": password,
+            "group": group_name,
+            "captcha": user_answer,
+        },
+        context={"route": "register", "ip": request.remote_addr},
+    )
+    safe_username = form_check["fields"]["username"][0]
+    safe_email = form_check["fields"]["email"][0]
+    safe_password = form_check["fields"]["password"][0]
+    safe_group = form_check["fields"]["group"][0]
+    safe_captcha = form_check["fields"]["captcha"][0]
+
+    # Check sanitization scores (already logged by sanitize_fields)
+    if form_check["blocked"]:
         flash("_blocked: suspicious content detected_", "error")
-        logger.warning(
-            f"Suspicious registration attempt blocked | User: {username} | Scores: U:{username_score} E:{email_score} P:{password_score} G:{group_score} C:{captcha_score}"
-        )
         return redirect(url_for("routes.register"))
 
-    # Log flagged but not blocked content
-    if username_score >= 3:
-        logger.warning(
-            f"Flagged username input | Score={username_score} | Matches={username_matches} | User={username}"
-        )
-    if email_score >= 3:
-        logger.warning(
-            f"Flagged email input | Score={email_score} | Matches={email_matches} | Email={email}"
-        )
-    if password_score >= 3:
-        logger.warning(
-            f"Flagged password input | Score={password_score} | Matches={password_matches} | User={username}"
-        )
-    if group_score >= 3:
-        logger.warning(
-            f"Flagged group input | Score={group_score} | Matches={group_matches} | Group={group_name}"
-        )
-    if captcha_score >= 3:
-        logger.warning(
-            f"Flagged captcha input | Score={captcha_score} | Matches={captcha_matches} | Answer={user_answer}"
-        )
-
     # Validate inputs
     is_valid, message = validate_username(safe_username)
     if not is_valid:
@@ -290,7 +265,8 @@ def register():
             visual_captcha=visual_captcha,
         )
 
-    is_valid, message = validate_group(safe_group)
+    groups = group_directory.get_directory()
+    is_valid, message = validate_group(safe_group, groups)
     if not is_valid:
         flash(f"⚠️ {message}", "error")
         visual_captcha = get_random_visual_captcha()
@@ -325,32 +301,9 @@ def register():
             visual_captcha=visual_captcha,
         )
 
-    # Find group - EMERGENCY DEBUG
-    print(f"🔍 FORM SENT: '{group_name}'")
-    print(f"🔍 DB HAS: {[g.name for g in UserGroup.query.all()]}")
-
-    user_group = None
-
-    # Try EVERYTHING
-    print(f"🔍 FORM SENT: '{group_name}'")
-    print(f"🔍 DB HAS: {[g.name for g in UserGroup.query.all()]}")
-
-    # Try 1: Exact match
-    if group_name:
-        user_group = UserGroup.query.filter_by(name=group_name).first()
-        print(f"🔍 Exact match: {user_group}")
-
-    # Try 2: Lowercase
-    if not user_group and group_name:
-        user_group = UserGroup.query.filter_by(name=group_name.lower()).first()
-        print(f"🔍 Lowercase match: {user_group}")
-
-    # Try 3: Case insensitive
-    if not user_group and group_name:
-        user_group = UserGroup.query.filter(UserGroup.name.ilike(group_name)).first()
-        print(f"🔍 Case insensitive match: {user_group}")
-
-    if not user_group:
+    # Group was resolved from the directory (exact name, then case-insensitive)
+    user_group = groups.resolve(safe_group)
+    if user_group is None:
         flash("⚠️ Invalid group selected.", "error")
         visual_captcha = get_random_visual_captcha()
         return render_template(
@@ -358,13 +311,28 @@ def register():
             visual_captcha=visual_captcha,
         )
 
-    # Create user
+    # Create user; the membership row is written directly, without loading the group
     hashed_password = hash_password(safe_password)
     new_user = User(username=safe_username, email=safe_email, password=hashed_password)
-    new_user.groups.append(user_group)
-
-    db.session.add(new_user)
-    db.session.commit()
+    try:
+        db.session.add(new_user)
+        db.session.flush()
+        db.session.execute(
+            user_group_members.insert().values(
+                user_id=new_user.id, user_group_id=user_group.id
+            )
+        )
+        db.session.commit()
+    except IntegrityError:
+        # The group was deleted after the directory was loaded
+        db.session.rollback()
+        groups.invalidate()
+        flash("⚠️ Invalid group selected.", "error")
+        visual_captcha = get_random_visual_captcha()
+        return render_template(
+            "register.html",
+            visual_captcha=visual_captcha,
+        )
 
     flash("✅ Registration successful. You can log in now.", "success")
     return redirect(url_for("auth.login"))
@@ -377,10 +345,6 @@ def register():
 def add():
     """Add a new todo"""
     try:
-        if Todo.query.count() >= MAX_TODOS:
-            flash("Maximum number of todos reached", "error")
-            return redirect(url_for("routes.dashboard"))
-
         # Get and validate input
         todo_input = request.form.get("todo")
         if not todo_input:
@@ -426,6 +390,13 @@ def add():
             flash("Error: No user found to create todo", "error")
             return redirect(url_for("routes.dashboard"))
 
+        # Reserve a quota slot in the same transaction as the insert
+        reserved, quota_message = quota.reserve()
+        if not reserved:
+            db.session.rollback()
+            flash(quota_message, "error")
+            return redirect(url_for("routes.dashboard"))
+
         new_todo = Todo(
             task=safe_text,
             done=False,
@@ -437,6 +408,8 @@ def add():
 
         db.session.add(new_todo)
         db.session.commit()
+        stats.todo_added(new_todo)
+        events.publish_todo(events.TODO_CREATED, new_todo)
         flash("Task added successfully", "success")
         return redirect(url_for("routes.dashboard"))
 
@@ -451,82 +424,91 @@ def add():
 @limiter.limit("50 per hour", key_func=get_smart_visitor_id)
 @login_required
 def edit(todo_id):
-    """Edit an existing todo"""
+    """Edit an existing todo (JSON callers get the updated row back)"""
     try:
         todo = Todo.query.get_or_404(todo_id)
 
         if request.method == "POST":
+            data = mutation_data()
+
             # Get and validate input
-            todo_input = request.form.get("todo")
+            todo_input = data.get("todo")
             if not todo_input:
+                if wants_json():
+                    return jsonify({"error": "Todo text is required"}), 400
                 flash("Todo text is required", "error")
                 return render_template("edit.html", todo=todo, todo_id=todo_id)
 
             new_task, score, matches = sanitize_input(todo_input)
 
             if score >= 5:
-                flash("Blocked: suspicious content detected", "error")
-                return redirect(url_for("routes.dashboard"))
+                return todo_result("Blocked: suspicious content detected", "error", status=400)
             elif score >= 3:
                 logger.warning(
                     f"Flagged TODO input | Score={score} | Matches={matches}"
                 )
 
-            has_date_range = request.form.get("has_date_range") == "on"
-            date_from = request.form.get("date_from") if has_date_range else None
-            date_to = request.form.get("date_to") if has_date_range else None
+            has_date_range = data.get("has_date_range") in ("on", True)
+            date_from = data.get("date_from") if has_date_range else None
+            date_to = data.get("date_to") if has_date_range else None
 
             errors, parsed_date_from, parsed_date_to = validate_todo_input(
                 new_task, date_from, date_to
             )
 
             if errors:
+                if wants_json():
+                    return jsonify({"error": errors[0], "errors": errors}), 400
                 for error in errors:
                     flash(error, "error")
                 return render_template("edit.html", todo=todo, todo_id=todo_id)
 
             # Update todo fields
             todo.task = new_task
-            todo.updated_at = datetime.now()
             todo.date_from = parsed_date_from
             todo.date_to = parsed_date_to
 
             db.session.commit()
-            flash("Task updated successfully", "success")
-            return redirect(url_for("routes.dashboard"))
+            stats.invalidate()  # date_to may have moved in/out of overdue
+            events.publish_todo(events.TODO_UPDATED, todo)
+            return todo_result("Task updated successfully", todo=todo)
 
         return render_template("edit.html", todo=todo, todo_id=todo_id)
 
     except Exception as e:
         db.session.rollback()
         logger.error(f"Database error editing todo {todo_id}: {e}")
-        flash("Error updating task", "error")
-        return redirect(url_for("routes.dashboard"))
+        return todo_result("Error updating task", "error", status=error_status(e))
 
 
 @bp.route("/toggle/<todo_id>", methods=["POST"])
 @limiter.limit("100 per hour", key_func=get_smart_visitor_id)
 @login_required
 def toggle_todo(todo_id):
-    """Toggle todo completion status"""
+    """
+    Toggle todo completion status.
+    JSON callers may send {"done": true|false} to set the state explicitly.
+    """
     try:
         todo = Todo.query.get_or_404(todo_id)
 
-        todo.done = not todo.done
-        todo.updated_at = datetime.now()
+        requested = mutation_data().get("done")
+        done = requested if isinstance(requested, bool) else not todo.done
 
-        db.session.commit()
+        # An explicit state equal to the current one is a no-op (idempotent)
+        if done != todo.done:
+            todo.done = done
+            db.session.commit()
+            stats.todo_toggled(todo)
+            events.publish_todo(events.TODO_UPDATED, todo)
 
         status = "completed" if todo.done else "reopened"
-        flash(f"Task {status}", "success")
-
-        return redirect(url_for("routes.dashboard"))
+        return todo_result(f"Task {status}", todo=todo)
 
     except Exception as e:
         db.session.rollback()
         logger.error(f"Database error toggling todo {todo_id}: {e}")
-        flash("Error updating task status", "error")
-        return redirect(url_for("routes.dashboard"))
+        return todo_result("Error updating task status", "error", status=error_status(e))
 
 
 @bp.route("/delete/<todo_id>", methods=["POST"])
@@ -536,18 +518,20 @@ def delete(todo_id):
     """Delete a todo"""
     try:
         todo = Todo.query.get_or_404(todo_id)
+        done, date_to = todo.done, todo.date_to
 
         db.session.delete(todo)
+        quota.release(todo.assigned_user_id, todo.assigned_group_id)
         db.session.commit()
+        stats.todo_deleted(done, date_to)
+        events.publish_todo(events.TODO_DELETED, todo)
 
-        flash("Task deleted successfully", "success")
-        return redirect(url_for("routes.dashboard"))
+        return todo_result("Task deleted successfully", deleted=todo.id)
 
     except Exception as e:
         db.session.rollback()
         logger.error(f"Database error deleting todo {todo_id}: {e}")
-        flash("Error deleting task", "error")
-        return redirect(url_for("routes.dashboard"))
+        return todo_result("Error deleting task", "error", status=error_status(e))
 
 
 @bp.route("/inspect/<todo_id>")
@@ -585,71 +569,128 @@ def inspect(todo_id):
 
 
 @bp.route("/api/todos")
-@limiter.limit("50 per hour", key_func=get_smart_visitor_id)
+@limiter.limit(
+    "50 per hour", key_func=get_smart_visitor_id, deduct_when=conditional.counts_against_limit
+)
 @login_required
 def api_todos():
-    """API endpoint to get todos as JSON"""
+    """
+    API endpoint to get todos as JSON, newest first.
+    Paginated by ?cursor=<next_cursor>&limit=N, or streamed as NDJSON with ?format=ndjson.
+    Supports If-None-Match: unchanged todos answer 304 without loading any rows.
+    """
+    cursor = request.args.get("cursor")
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+
     try:
-        todos = Todo.query.order_by(Todo.created_at.desc()).all()
-        todos_list = [todo.to_dict() for todo in todos]
-        return jsonify(todos_list)
+        etag = conditional.make_etag(
+            "todos", conditional.todos_version(), conditional.request_variant()
+        )
+        if request.args.get("format") == "ndjson":
+            query = todos_query().order_by(Todo.created_at.desc(), Todo.id.desc())
+            return conditional.conditional_response(
+                etag,
+                lambda: Response(
+                    stream_with_context(stream_ndjson(query, Todo.to_dict)),
+                    mimetype="application/x-ndjson",
+                ),
+            )
+
+        def build():
+            limit = parse_page_size(request.args.get("limit"))
+            todos, next_cursor = keyset_page(todos_query(), Todo, after=after, limit=limit)
+            return {"todos": [todo.to_dict() for todo in todos], "next_cursor": next_cursor}
+
+        return conditional.conditional_response(etag, build)
 
     except Exception as e:
         logger.error(f"Database error in API endpoint: {e}")
         return jsonify({"error": "Error fetching todos"}), 500
 
 
+@bp.route("/api/events")
+@limiter.limit("30 per minute", key_func=get_smart_visitor_id)
+@login_required
+def api_events():
+    """
+    Server-sent events stream of todo changes (and presence changes for admins).
+    An open stream also counts as activity, so pages with a live stream do not
+    need to send heartbeats.
+    """
+    user_id = current_user.id
+    subscription = events.subscribe(
+        user_id,
+        group_ids=[group.id for group in current_user.groups],
+        is_admin=current_user.is_admin,
+    )
+    presence.touch(user_id)
+
+    def still_here():
+        presence.touch(user_id)
+        last_seen.record(user_id)
+
+    body = events.stream(
+        subscription,
+        keepalive=current_app.config["EVENTS_KEEPALIVE"],
+        timeout=current_app.config["EVENTS_STREAM_TIMEOUT"],
+        on_keepalive=still_here,
+    )
+    return Response(
+        stream_with_context(body),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @bp.route("/api/stats")
-@limiter.limit("50 per hour", key_func=get_smart_visitor_id)
+@limiter.limit(
+    "50 per hour", key_func=get_smart_visitor_id, deduct_when=conditional.counts_against_limit
+)
 @login_required
 def api_stats():
-    """API endpoint to get todo statistics"""
+    """API endpoint to get todo statistics (ETag from the counter values)"""
     try:
-        total_todos = Todo.query.count()
-        completed_todos = Todo.query.filter_by(done=True).count()
-        pending_todos = total_todos - completed_todos
-
-        # Get overdue todos count
-        now = datetime.now()
-        overdue_todos = Todo.query.filter(
-            Todo.date_to < now, Todo.done == False
-        ).count()
-
-        stats = {
-            "total": total_todos,
-            "completed": completed_todos,
-            "pending": pending_todos,
-            "overdue": overdue_todos,
-        }
-
-        return jsonify(stats)
+        todo_stats = stats.get_todo_stats()
+        return conditional.conditional_response(
+            conditional.make_etag("stats", sorted(todo_stats.items())), lambda: todo_stats
+        )
 
     except Exception as e:
         logger.error(f"Database error getting stats: {e}")
         return jsonify({"error": "Error fetching statistics"}), 500
 
-    # @bp.route("/bulk-delete", methods=["POST"])
-    # @limiter.limit("10 per hour", key_func=get_smart_visitor_id)
-    # def bulk_delete():
-    #     """Delete multiple todos at once"""
-    #     try:
-    #         todo_ids = request.json.get("todo_ids", [])
-
-    #         if not todo_ids:
-    #             return jsonify({"error": "No todo IDs provided"}), 400
-
-    #         deleted_count = Todo.query.filter(Todo.id.in_(todo_ids)).delete(
-    #             synchronize_session=False
-    #         )
-    #         db.session.commit()
-
-    #         return jsonify(
-    #             {
-    #                 "message": f"Successfully deleted {deleted_count} todos",
-    #                 "deleted_count": deleted_count,
-    #             }
-    #         )
-    # except Exception as e:
-    #     db.session.rollback()
-    #     logger.error(f"Database error in bulk delete: {e}")
-    #     return jsonify({"error": "Error deleting todos"}), 500
+
+@bp.route("/api/todos/bulk", methods=["POST"])
+@limiter.limit("10 per minute", key_func=get_smart_visitor_id)
+@login_required
+def bulk_todos():
+    """
+    Apply one operation to many todos in a single transaction (admins only).
+    Body: {"operation": ..., "todo_ids": [...], "params": {...}}; see app.bulk.
+    """
+    if not current_user.is_admin:
+        return jsonify({"error": "Admins only"}), 403
+    try:
+        data = request.get_json(silent=True) or {}
+        todo_ids = bulk.parse_ids(data.get("todo_ids"))
+        results = bulk.apply(data.get("operation"), todo_ids, data.get("params"))
+        succeeded = sum(1 for status in results.values() if status == bulk.OK)
+        return jsonify(
+            {
+                "operation": data.get("operation"),
+                "results": [{"id": todo_id, "status": status} for todo_id, status in results.items()],
+                "succeeded": succeeded,
+                "failed": len(results) - succeeded,
+            }
+        )
+
+    except bulk.BulkError as e:
+        db.session.rollback()
+        return jsonify({"error": e.message}), e.status
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Database error in bulk operation: {e}")
+        return jsonify({"error": "Error applying bulk operation"}), 500
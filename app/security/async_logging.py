@@ -0,0 +1,176 @@
+# async_logging.py
+# Non-blocking logging pipeline for the suspicious-input log.
+#
+# Request threads only put records on a bounded in-memory queue
+# (DroppingQueueHandler). A background thread (AsyncLogListener) drains the
+# queue in batches and writes each batch with a single write + flush through a
+# size-rotated file handler. When the queue is full, records are dropped and
+# counted instead of blocking the worker, so a flood of hostile input cannot
+# stall request handling on disk I/O.
+
+import atexit
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, RotatingFileHandler
+
+DEFAULT_QUEUE_SIZE = 10_000
+DEFAULT_BATCH_SIZE = 200
+FLUSH_INTERVAL = 0.5  # seconds the listener waits for a first record
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: records are dropped (and counted) when full"""
+
+    def __init__(self, log_queue, listener=None):
+        super().__init__(log_queue)
+        self.listener = listener
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def enqueue(self, record):
+        if self.listener is not None:
+            self.listener.ensure_running()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def take_dropped(self):
+        """Return and reset the number of records dropped since the last call"""
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class BatchRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that can write a whole batch with one write and one flush"""
+
+    def emit_batch(self, records):
+        records = [record for record in records if record.levelno >= self.level]
+        if not records:
+            return
+        try:
+            data = "".join(self.format(record) + self.terminator for record in records)
+            self.acquire()
+            try:
+                if self.stream is None:
+                    self.stream = self._open()
+                if self.maxBytes > 0:
+                    self.stream.seek(0, 2)
+                    if self.stream.tell() + len(data.encode(self.encoding or "utf-8")) >= self.maxBytes:
+                        self.doRollover()
+                self.stream.write(data)
+                self.stream.flush()
+            finally:
+                self.release()
+        except Exception:
+            self.handleError(records[-1])
+
+
+class AsyncLogListener:
+    """Background thread that drains a log queue in batches into its handlers"""
+
+    def __init__(self, log_queue, handlers, batch_size=DEFAULT_BATCH_SIZE):
+        self.queue = log_queue
+        self.handlers = list(handlers)
+        self.batch_size = batch_size
+        self.queue_handler = None  # set by create_async_handler, used for drop reports
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def ensure_running(self):
+        """Start the thread lazily; restart it in a forked child (e.g. gunicorn --preload)"""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="suspicious-input-log", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Write out everything still queued and stop the thread"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._stopping.set()
+        self._thread.join(timeout=5)
+
+    def _next_batch(self):
+        try:
+            first = self.queue.get(timeout=FLUSH_INTERVAL)
+        except queue.Empty:
+            return []
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _drop_report(self):
+        if self.queue_handler is None:
+            return None
+        dropped = self.queue_handler.take_dropped()
+        if not dropped:
+            return None
+        return logging.makeLogRecord(
+            {
+                "name": "InputSanitizer",
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"Log queue full - dropped {dropped} suspicious-input records",
+            }
+        )
+
+    def _write(self, batch):
+        report = self._drop_report()
+        if report is not None:
+            batch.append(report)
+        if not batch:
+            return
+        for handler in self.handlers:
+            if hasattr(handler, "emit_batch"):
+                handler.emit_batch(batch)
+            else:
+                for record in batch:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._write(self._next_batch())
+        # Drain whatever is left on shutdown
+        while True:
+            batch = self._next_batch_nowait()
+            if not batch:
+                break
+            self._write(batch)
+
+    def _next_batch_nowait(self):
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+
+def create_async_handler(handlers, queue_size=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE):
+    """Build a (DroppingQueueHandler, AsyncLogListener) pair writing to `handlers`"""
+    log_queue = queue.Queue(maxsize=queue_size)
+    listener = AsyncLogListener(log_queue, handlers, batch_size=batch_size)
+    queue_handler = DroppingQueueHandler(log_queue, listener)
+    listener.queue_handler = queue_handler
+    atexit.register(listener.stop)
+    return queue_handler, listener
@@ -1,12 +1,134 @@
 # utils/security.py
+# Password hashing service.
+#
+# bcrypt runs on a small, fixed thread pool (bcrypt releases the GIL, so the
+# hashes really run in parallel) behind a concurrency cap. When the cap is
+# reached new hash/verify calls fail fast with a 503 instead of piling up
+# behind each other and tying up every worker during a login burst.
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
 import bcrypt
+from werkzeug.exceptions import ServiceUnavailable
+
+DEFAULT_ROUNDS = 12
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_PENDING = 16  # running + queued hash operations per process
+DEFAULT_TIMEOUT = 10  # seconds to wait for a queued hash
+
+
+class PasswordHasherBusy(ServiceUnavailable):
+    """Raised when the hashing pool is saturated; Flask turns it into a 503"""
+
+    description = "The server is busy verifying passwords. Please try again shortly."
+
+
+class PasswordHasher:
+    """Bounded thread pool running bcrypt with a configurable cost factor"""
+
+    def __init__(
+        self,
+        rounds=DEFAULT_ROUNDS,
+        workers=DEFAULT_WORKERS,
+        max_pending=DEFAULT_MAX_PENDING,
+        timeout=DEFAULT_TIMEOUT,
+    ):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def configure(self, rounds=None, workers=None, max_pending=None, timeout=None):
+        """Apply settings from app config; the pool is rebuilt lazily"""
+        with self._lock:
+            if rounds is not None:
+                self.rounds = rounds
+            if timeout is not None:
+                self.timeout = timeout
+            if workers is not None and workers != self.workers:
+                self.workers = workers
+                self._shutdown_executor()
+            if max_pending is not None and max_pending != self.max_pending:
+                self.max_pending = max_pending
+                self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _shutdown_executor(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt"
+                )
+            return self._executor
+
+    def _run(self, func, *args):
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            self._reject()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except Exception:
+            slots.release()
+            raise
+        # The slot is held until bcrypt finishes, even if the caller stops waiting
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self._reject()
+
+    def _reject(self):
+        # Called from many request threads; += on an attribute is not atomic
+        with self._lock:
+            self.rejected += 1
+        raise PasswordHasherBusy()
+
+    def hash(self, password):
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return self._run(bcrypt.hashpw, password.encode("utf-8"), salt).decode("utf-8")
+
+    def verify(self, password, hashed):
+        return self._run(bcrypt.checkpw, password.encode("utf-8"), hashed.encode("utf-8"))
+
+    def needs_rehash(self, hashed):
+        """True when the stored hash was made with a lower cost than the current one"""
+        return get_rounds(hashed) < self.rounds
+
+
+def get_rounds(hashed):
+    """Cost factor of a bcrypt hash ("$2b$12$..." -> 12); 0 if it cannot be parsed"""
+    try:
+        return int(hashed.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return 0
+
+
+HASHER = PasswordHasher()
+
+
+def configure_hasher(rounds=None, workers=None, max_pending=None, timeout=None):
+    """Set cost factor and pool limits (called from create_app)"""
+    HASHER.configure(rounds=rounds, workers=workers, max_pending=max_pending, timeout=timeout)
 
 
 def hash_password(password):
     """Hash password using bcrypt"""
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    return HASHER.hash(password)
 
 
 def verify_password(password, hashed):
     """Verify password against hash"""
-    return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+    return HASHER.verify(password, hashed)
+
+
+def needs_rehash(hashed):
+    """Check whether a stored hash should be upgraded to the current cost factor"""
+    return HASHER.needs_rehash(hashed)
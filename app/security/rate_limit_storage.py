@@ -0,0 +1,189 @@
+# app/security/rate_limit_storage.py
+# Node-wide rate limit storage for Flask-Limiter.
+#
+# The default "memory://" storage keeps counters inside each gunicorn worker,
+# so every worker enforces its own copy of the limit and a restart forgets
+# everything. SQLiteStorage keeps the counters in one WAL-mode SQLite file
+# that every worker on the node opens, and supports the fixed-window and
+# sliding-window-counter strategies.
+#
+# Importing this module registers the "sqlite" scheme with the limits
+# library, e.g. RATELIMIT_STORAGE_URI = "sqlite:////tmp/todo_ratelimit.db".
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from limits.storage.base import (
+    SlidingWindowCounterSupport,
+    Storage,
+    TimestampedSlidingWindow,
+)
+
+BUSY_TIMEOUT_MS = 2000
+PURGE_EVERY = 1000  # delete expired rows every N increments (per process)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limits (
+    key TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+INCR_SQL = """
+INSERT INTO rate_limits (key, count, expires_at) VALUES (:key, :amount, :expires_at)
+ON CONFLICT (key) DO UPDATE SET
+    count = CASE WHEN rate_limits.expires_at <= :now
+                 THEN excluded.count ELSE rate_limits.count + excluded.count END,
+    expires_at = CASE WHEN rate_limits.expires_at <= :now
+                      THEN excluded.expires_at ELSE rate_limits.expires_at END
+RETURNING count
+"""
+
+
+def _path_from_uri(uri):
+    """sqlite:////abs/path.db -> /abs/path.db, sqlite:///rel.db -> rel.db"""
+    prefix = "sqlite:///"
+    if not uri or not uri.startswith(prefix) or uri == prefix:
+        raise ValueError(f"Invalid SQLite rate limit storage URI: {uri!r}")
+    return uri[len(prefix):]
+
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """Rate limit counters in a SQLite file shared by all workers on the node"""
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri=None, wrap_exceptions=False, **options):
+        self.path = _path_from_uri(uri)
+        self._local = threading.local()
+        self._incr_calls = 0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self._connection().execute(SCHEMA)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        """One connection per thread, reopened after a fork"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _incr(self, conn, key, expiry, amount, now):
+        return conn.execute(
+            INCR_SQL,
+            {"key": key, "amount": amount, "expires_at": now + expiry, "now": now},
+        ).fetchone()[0]
+
+    def _get(self, conn, key, now):
+        row = conn.execute(
+            "SELECT count FROM rate_limits WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _maybe_purge(self, conn, now):
+        self._incr_calls += 1
+        if self._incr_calls % PURGE_EVERY == 0:
+            conn.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+
+    # --- Storage (fixed window) ---
+
+    def incr(self, key, expiry, amount=1):
+        conn = self._connection()
+        now = time.time()
+        count = self._incr(conn, key, expiry, amount, now)
+        self._maybe_purge(conn, now)
+        return count
+
+    def get(self, key):
+        return self._get(self._connection(), key, time.time())
+
+    def get_expiry(self, key):
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT expires_at FROM rate_limits WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else now
+
+    def check(self):
+        try:
+            self._connection().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        return self._connection().execute("DELETE FROM rate_limits").rowcount
+
+    def clear(self, key):
+        self._connection().execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+    # --- Sliding window counter ---
+
+    def _window_info(self, conn, previous_key, current_key, expiry, now):
+        rows = dict(
+            conn.execute(
+                "SELECT key, count FROM rate_limits WHERE key IN (?, ?) AND expires_at > ?",
+                (previous_key, current_key, now),
+            ).fetchall()
+        )
+        previous_count = rows.get(previous_key, 0)
+        current_count = rows.get(current_key, 0)
+        if previous_count == 0:
+            previous_ttl = 0.0
+        else:
+            previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        conn = self._connection()
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        # BEGIN IMMEDIATE takes the write lock up front, so the read-check-increment
+        # is atomic across workers (no over-admission under concurrency)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            previous_count, previous_ttl, current_count, _ = self._window_info(
+                conn, previous_key, current_key, expiry, now
+            )
+            weighted = previous_count * previous_ttl / expiry + current_count
+            if math.floor(weighted) + amount > limit:
+                conn.execute("COMMIT")
+                return False
+            # The current window's counter must outlive the next window
+            self._incr(conn, current_key, 2 * expiry, amount, now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._maybe_purge(conn, now)
+        return True
+
+    def get_sliding_window(self, key, expiry):
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        return self._window_info(self._connection(), previous_key, current_key, expiry, now)
+
+    def clear_sliding_window(self, key, expiry):
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        self._connection().execute(
+            "DELETE FROM rate_limits WHERE key IN (?, ?)", (previous_key, current_key)
+        )
@@ -8,6 +8,13 @@ import html
 from html import unescape
 from urllib.parse import unquote_plus
 
+from app.security.async_logging import (
+    BatchRotatingFileHandler,
+    DroppingQueueHandler,
+    create_async_handler,
+)
+from app.security.verdict_cache import VerdictCache, make_key
+
 # === Logging Setup ===
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 LOG_FILE_PATH = os.path.join(SCRIPT_DIR, "..", "suspicious_input.log")
@@ -15,8 +22,21 @@ LOG_FILE_PATH = os.path.join(SCRIPT_DIR, "..", "suspicious_input.log")
 logger = logging.getLogger("InputSanitizer")
 logger.setLevel(logging.WARNING)
 
+# Request threads only enqueue records; a background listener writes them in
+# batches to a rotating file (see async_logging.py)
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+LOG_QUEUE_SIZE = 10_000
+
 if not logger.handlers:
-    file_handler = logging.FileHandler(LOG_FILE_PATH, mode="a", encoding="utf-8")
+    file_handler = BatchRotatingFileHandler(
+        LOG_FILE_PATH,
+        mode="a",
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+        encoding="utf-8",
+        delay=True,
+    )
     file_handler.setLevel(logging.WARNING)
 
     console_handler = logging.StreamHandler()
@@ -26,12 +46,24 @@ if not logger.handlers:
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
 
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    queue_handler, log_listener = create_async_handler(
+        [file_handler, console_handler], queue_size=LOG_QUEUE_SIZE
+    )
+    queue_handler.setLevel(logging.WARNING)
+
+    logger.addHandler(queue_handler)
     logger.propagate = False
     logger.warning("Logger initialized - log file location: " + LOG_FILE_PATH)
 
 
+def get_log_queue_stats() -> dict:
+    """Queue depth and dropped-record count of the async suspicious-input log"""
+    for handler in logger.handlers:
+        if isinstance(handler, DroppingQueueHandler):
+            return {"queued": handler.queue.qsize(), "dropped": handler.dropped}
+    return {"queued": 0, "dropped": 0}
+
+
 # === Suspicious Patterns: (regex, severity, description) ===
 SUSPICIOUS_PATTERNS = [
     # === SQL Injection ===
@@ -75,6 +107,67 @@ def normalize_payload(text: str) -> str:
     return text
 
 
+# === Prefilters: characters a pattern cannot match without ===
+# A pattern whose guard characters are all absent from the text is skipped
+# without running its regex. Patterns without a guard always run.
+PATTERN_GUARDS = {
+    "Classic SQLi tautology": "=",
+    "Stacked query + dangerous command": ";",
+    "SQL comment": "-#/",
+    "Script tag": "<",
+    "JavaScript URI": ":",
+    "HTML event handler": "=",
+    "Malicious iframe/img": "<",
+    "VBScript URI": ":",
+    "Command injection": ";",
+    "Suspicious command with flags": "-/",
+    "Path traversal": ".",
+}
+
+
+class PatternScanner:
+    """
+    Precompiled scanner for SUSPICIOUS_PATTERNS.
+
+    Every regex is compiled once at import time, and a cheap character guard
+    skips patterns that cannot match, so long clean input only runs the few
+    unguarded patterns.
+    """
+
+    FLAGS = re.DOTALL | re.IGNORECASE
+
+    def __init__(self, patterns, guards=None):
+        guards = guards or {}
+        self._compiled = [
+            (re.compile(pattern, self.FLAGS), guards.get(desc), (pattern, severity, desc))
+            for pattern, severity, desc in patterns
+        ]
+
+    def scan(self, text):
+        """Return the matching (pattern, severity, description) tuples in severity order"""
+        matched = []
+        for compiled, guard, entry in self._compiled:
+            if guard and not any(char in text for char in guard):
+                continue
+            if compiled.search(text):
+                matched.append(entry)
+        return matched
+
+
+SCANNER = PatternScanner(SUSPICIOUS_PATTERNS, PATTERN_GUARDS)
+
+# Contextual boost: SQL keyword combined with a comment sequence
+CONTEXT_SQL_KEYWORD_RE = re.compile(r"\b(update|drop|select|insert|delete)\b", re.I)
+CONTEXT_COMMENT_RE = re.compile(r"--|#|/\*")
+
+# Precompiled helpers used on every call
+CYRILLIC_RE = re.compile(r"[\u0400-\u04FF]")
+OTHER_SCRIPTS_RE = re.compile(r"[\u0370-\u03FF\u0530-\u058F\u0600-\u06FF]")
+LATIN_RE = re.compile(r"[a-zA-Z]")
+CONTROL_CHARS_RE = re.compile(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
 def calculate_total_score(text: str) -> tuple[int, list[tuple[str, int, str]]]:
     """
     Analyze text for suspicious patterns and return total score and matches.
@@ -85,18 +178,11 @@ def calculate_total_score(text: str) -> tuple[int, list[tuple[str, int, str]]]:
     # Normalize payload before scoring
     normalized = normalize_payload(text)
 
-    matched = []
-    score = 0
-
-    for pattern, severity, desc in SUSPICIOUS_PATTERNS:
-        if re.search(pattern, normalized, re.DOTALL | re.IGNORECASE):
-            score += severity
-            matched.append((pattern, severity, desc))
+    matched = SCANNER.scan(normalized)
+    score = sum(severity for _, severity, _ in matched)
 
-    # Contextual boost: SQL keyword + comment
-    has_sql_kw = any(re.search(p, normalized, re.I) for p in [r"\b(update|drop|select|insert|delete)\b"])
-    has_comment = bool(re.search(r"--|#|/\*", normalized))
-    if has_sql_kw and has_comment:
+    # Contextual boost: SQL keyword + comment (comment check first, it is cheaper)
+    if CONTEXT_COMMENT_RE.search(normalized) and CONTEXT_SQL_KEYWORD_RE.search(normalized):
         score += 2
         matched.append(("contextual_boost", 2, "-- + SQL keyword boost"))
 
@@ -108,18 +194,39 @@ def detect_script_mix(text: str) -> bool:
     Detect mixed scripts (e.g., Latin + Cyrillic) – possible homoglyph attack.
     Allows Latin with diacritics (e.g., Lithuanian: ąčęėįšųū).
     """
-    cyrillic = re.compile(r"[\u0400-\u04FF]")
-    other_scripts = re.compile(r"[\u0370-\u03FF\u0530-\u058F\u0600-\u06FF]")
+    has_cyrillic = bool(CYRILLIC_RE.search(text))
+    has_other_script = bool(OTHER_SCRIPTS_RE.search(text))
 
-    has_cyrillic = bool(cyrillic.search(text))
-    has_other_script = bool(other_scripts.search(text))
-
-    if (has_cyrillic or has_other_script) and re.search(r"[a-zA-Z]", text):
+    if (has_cyrillic or has_other_script) and LATIN_RE.search(text):
         return True
 
     return False
 
 
+# Verdicts of recent inputs; caps are set from app config by configure_verdict_cache()
+VERDICT_CACHE = VerdictCache()
+
+
+def configure_verdict_cache(max_entries: int = None, max_bytes: int = None) -> None:
+    """Resize the sanitize_input verdict cache (0 disables it)"""
+    VERDICT_CACHE.configure(max_entries=max_entries, max_bytes=max_bytes)
+
+
+def get_verdict_cache_stats() -> dict:
+    """Hit/miss/eviction counters and size of the sanitize_input verdict cache"""
+    return VERDICT_CACHE.stats()
+
+
+def _escape_for_log(text: str) -> str:
+    """repr() the text and double-escape line breaks so one input stays on one log line"""
+    return (
+        repr(text)
+        .replace("\\n", "\\\\n")
+        .replace("\\r", "\\\\r")
+        .replace("\\t", "\\\\t")
+    )
+
+
 def sanitize_input(
     text: str,
     *,
@@ -130,6 +237,7 @@ def sanitize_input(
     log_suspicious: bool = True,
     max_length: int = 5000,  # Prevent DoS
     context: dict = None,  # Optional metadata (e.g., IP, user)
+    use_cache: bool = True,  # False for secrets: never stored in VERDICT_CACHE
 ) -> tuple[str, int, list[tuple[str, int, str]]]:
     """
     Enhanced input sanitizer with scoring, normalization, and logging.
@@ -146,6 +254,51 @@ def sanitize_input(
     if not original_text:
         return "", 0, []
 
+    # Repeated payloads are answered from the cache; logging still happens per call
+    verdict = cache_key = None
+    if use_cache:
+        cache_key = make_key(
+            original_text, (allow_unicode, escape_html, compress_whitespace, remove_specials)
+        )
+        verdict = VERDICT_CACHE.get(cache_key)
+    if verdict is None:
+        normalized_text, verdict = _analyze_and_clean(
+            original_text,
+            allow_unicode=allow_unicode,
+            escape_html=escape_html,
+            compress_whitespace=compress_whitespace,
+            remove_specials=remove_specials,
+        )
+        if use_cache:
+            VERDICT_CACHE.put(cache_key, verdict)
+    else:
+        normalized_text = None
+    text, total_score, matched_patterns = verdict
+
+    # === 4. Log Suspicious Input ===
+    if log_suspicious and total_score > 0:
+        if normalized_text is None:
+            normalized_text = normalize_payload(original_text)
+        safe_log_text = _escape_for_log(normalized_text)
+        log_msg = f"Suspicious input detected: {safe_log_text} | Score={total_score} | Matches={[desc for _, _, desc in matched_patterns]}"
+        if context:
+            log_msg += f" | Context={context}"
+        logger.warning(log_msg)
+
+    return text, total_score, matched_patterns
+
+
+def _analyze_and_clean(
+    original_text: str,
+    *,
+    allow_unicode: bool,
+    escape_html: bool,
+    compress_whitespace: bool,
+    remove_specials: str,
+) -> tuple[str, tuple[str, int, list[tuple[str, int, str]]]]:
+    """
+    Score and clean stripped input; returns (normalized_text, (text, score, matches)).
+    """
     # === 1. Normalize Payload ===
     normalized_text = normalize_payload(original_text)
 
@@ -157,21 +310,6 @@ def sanitize_input(
         total_score += 3
         matched_patterns.append(("mixed_script", 3, "Possible homoglyph attack (mixed scripts)"))
 
-    # === 4. Log Suspicious Input ===
-    if log_suspicious and total_score > 0:
-        safe_log_text = (
-            repr(normalized_text)
-            .replace("\\n", "\\\\n")
-            .replace("\\r", "\\\\r")
-            .replace("\\t", "\\\\t")
-        )
-        log_msg = f"Suspicious input detected: {safe_log_text} | Score={total_score} | Matches={[desc for _, _, desc in matched_patterns]}"
-        if context:
-            log_msg += f" | Context={context}"
-        logger.warning(log_msg)
-        for handler in logger.handlers:
-            handler.flush()
-
     # === 5. Sanitization Pipeline ===
     text = original_text
 
@@ -187,10 +325,10 @@ def sanitize_input(
         text = unicodedata.normalize("NFC", text)
 
     # Remove control characters
-    text = re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]", "", text)
+    text = CONTROL_CHARS_RE.sub("", text)
 
     if compress_whitespace:
-        text = re.sub(r"\s+", " ", text).strip()
+        text = WHITESPACE_RE.sub(" ", text).strip()
 
     # Remove special characters based on policy
     if remove_specials == "strict":
@@ -205,4 +343,65 @@ def sanitize_input(
     if escape_html:
         text = html.escape(text)
 
-    return text, total_score, matched_patterns
\ No newline at end of file
+    return normalized_text, (text, total_score, matched_patterns)
+
+
+def sanitize_fields(
+    fields: dict,
+    *,
+    block_threshold: int = 5,
+    flag_threshold: int = 3,
+    redact: tuple = ("password",),
+    context: dict = None,
+    **options,
+) -> dict:
+    """
+    Sanitize every field of a form in one call.
+
+    Returns {"fields": {name: (text, score, matches)}, "scores": {name: score},
+    "max_score", "blocked", "flagged"}. Suspicious fields are reported in a
+    single consolidated log line instead of one line per field; values of
+    fields listed in `redact` are never written to the log or kept in the
+    verdict cache.
+    """
+    max_length = options.get("max_length", 5000)
+    results = {}
+    suspicious = []
+
+    for name, value in fields.items():
+        result = sanitize_input(
+            value, log_suspicious=False, use_cache=name not in redact, **options
+        )
+        results[name] = result
+        if result[1] > 0:
+            suspicious.append(name)
+
+    scores = {name: result[1] for name, result in results.items()}
+    max_score = max(scores.values(), default=0)
+    blocked = max_score >= block_threshold
+    flagged = [name for name, score in scores.items() if score >= flag_threshold]
+
+    if suspicious:
+        parts = []
+        for name in suspicious:
+            text, score, matches = results[name]
+            if name in redact:
+                shown = "<redacted>"
+            else:
+                shown = _escape_for_log(normalize_payload(fields[name][:max_length].strip()))
+            parts.append(
+                f"{name}={shown} Score={score} Matches={[desc for _, _, desc in matches]}"
+            )
+        verdict = "BLOCKED" if blocked else "FLAGGED" if flagged else "suspicious"
+        log_msg = f"Suspicious form input ({verdict}): " + " ; ".join(parts)
+        if context:
+            log_msg += f" | Context={context}"
+        logger.warning(log_msg)
+
+    return {
+        "fields": results,
+        "scores": scores,
+        "max_score": max_score,
+        "blocked": blocked,
+        "flagged": flagged,
+    }
@@ -29,12 +29,14 @@ def validate_password(password):
         return False, "Password must be at least 8 characters"
     return True, "Valid"
 
-def validate_group(group_name):
-    """Validate group selection"""
-    valid_groups = ['qa', 'frontend', 'backend', 'fullstack', 'devops', 'vibecoders']
+def validate_group(group_name, groups=None):
+    """Validate group selection against the active groups (case-insensitive)"""
+    if groups is None:
+        from app.group_directory import get_directory
+        groups = get_directory()
     if not group_name:
         return False, "Group is required"
-    if group_name not in valid_groups:
+    if group_name not in groups:
         return False, "Invalid group selection"
     return True, "Valid"
 
@@ -0,0 +1,117 @@
+# verdict_cache.py
+# Bounded LRU cache of sanitize_input verdicts.
+#
+# Attack bursts and form resubmissions send the same payloads over and over;
+# a cached verdict turns the decode + regex scan + normalisation pipeline into
+# one dictionary lookup. Entries are keyed on a digest of the input plus the
+# option tuple, and evicted least-recently-used once either the entry count or
+# the approximate memory cap is exceeded.
+
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+ENTRY_OVERHEAD = 200  # key digest, tuples and OrderedDict node per entry
+
+
+def make_key(text: str, options: tuple) -> tuple:
+    """Cache key: 128-bit digest of the input plus the sanitizer options"""
+    digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    return digest, options
+
+
+def _entry_size(verdict) -> int:
+    text, _, matches = verdict
+    return sys.getsizeof(text) + ENTRY_OVERHEAD + 64 * len(matches)
+
+
+class VerdictCache:
+    """Thread-safe LRU of (text, score, matches) verdicts with hit/miss counters"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_entries) and bool(self.max_bytes)
+
+    def get(self, key):
+        """Return the cached verdict (matches as a fresh list) or None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        text, score, matches = entry[0]
+        return text, score, list(matches)
+
+    def put(self, key, verdict):
+        if not self.enabled:
+            return
+        text, score, matches = verdict
+        stored = (text, score, tuple(matches))
+        size = _entry_size(stored)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (stored, size)
+            self._bytes += size
+            self._shrink()
+
+    def _shrink(self):
+        """Evict least-recently-used entries until both caps hold (lock held)"""
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def configure(self, max_entries=None, max_bytes=None):
+        """Change the caps (0 disables the cache) and drop entries that no longer fit"""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+        if not self.enabled:
+            self.clear()
+            return
+        with self._lock:
+            self._shrink()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -2,7 +2,7 @@ import random
 from datetime import timedelta, datetime
 import click
 from faker import Faker
-from app import db
+from app import db, quota
 from app.models import Todo, User, UserGroup, Deadline
 from app.security.hsh import hash_password
 
@@ -22,6 +22,7 @@ def seed_command(count, clear, clean):
         # Also clear deadlines
         Deadline.query.delete()
         db.session.commit()
+        quota.rebuild_counters()
         click.echo(f"🗑️  Cleared {deleted} existing todos and all deadlines.")
     elif clean:
         confirm = input("⚠️  This deletes ALL data permanently. Continue? (y/N): ")
@@ -31,6 +32,7 @@ def seed_command(count, clear, clean):
         Todo.query.delete()
         Deadline.query.delete()
         db.session.commit()
+        quota.rebuild_counters()
         click.echo("🔥 All todos and deadlines deleted permanently.")
         return
 
@@ -295,6 +297,7 @@ def seed_command(count, clear, clean):
             added += 1
 
         db.session.commit()
+        quota.rebuild_counters()  # seeding bypasses quota.reserve()
         final_total = Todo.query.count()
         click.echo(f"✅ Added {added} new todos.")
         click.echo(f"📊 Total todos: {final_total}/1000")
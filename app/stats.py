@@ -0,0 +1,98 @@
+# app/stats.py
+# Todo statistics for /api/stats.
+# One aggregate query computes every counter; an optional in-process cache keeps
+# the result and is adjusted incrementally by the add/toggle/delete routes, with
+# a short TTL as a fallback (e.g. todos becoming overdue as time passes, or
+# changes made by another worker).
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import func
+
+from app import db
+from app.models import Todo
+
+DEFAULT_STATS_CACHE_TTL = 30  # seconds; 0 disables the cache
+
+_lock = threading.Lock()
+_cache = {"stats": None, "loaded_at": 0.0}
+
+
+def compute_todo_stats(now=None):
+    """Compute total/completed/pending/overdue in a single COUNT(*) FILTER query"""
+    now = now or datetime.now()
+    total, completed, overdue = db.session.query(
+        func.count(),
+        func.count().filter(Todo.done == True),  # noqa: E712
+        func.count().filter(Todo.done == False, Todo.date_to < now),  # noqa: E712
+    ).select_from(Todo).one()
+
+    return {
+        "total": total,
+        "completed": completed,
+        "pending": total - completed,
+        "overdue": overdue,
+    }
+
+
+def _cache_ttl():
+    return current_app.config.get("STATS_CACHE_TTL", DEFAULT_STATS_CACHE_TTL)
+
+
+def get_todo_stats():
+    """Return cached stats while fresh, otherwise recompute and cache them"""
+    ttl = _cache_ttl()
+    if ttl <= 0:
+        return compute_todo_stats()
+
+    with _lock:
+        if _cache["stats"] is not None and time.monotonic() - _cache["loaded_at"] < ttl:
+            return dict(_cache["stats"])
+
+    stats = compute_todo_stats()
+    with _lock:
+        _cache["stats"] = stats
+        _cache["loaded_at"] = time.monotonic()
+    return dict(stats)
+
+
+def invalidate():
+    """Drop the cached stats so the next read recomputes them"""
+    with _lock:
+        _cache["stats"] = None
+
+
+def _adjust(total=0, completed=0, overdue=0):
+    with _lock:
+        stats = _cache["stats"]
+        if stats is None:
+            return
+        stats["total"] += total
+        stats["completed"] += completed
+        stats["pending"] = stats["total"] - stats["completed"]
+        stats["overdue"] += overdue
+
+
+def _is_overdue(date_to, now):
+    return date_to is not None and date_to < now
+
+
+def todo_added(todo):
+    """Account for a newly committed todo"""
+    overdue = not todo.done and _is_overdue(todo.date_to, datetime.now())
+    _adjust(total=1, completed=1 if todo.done else 0, overdue=1 if overdue else 0)
+
+
+def todo_toggled(todo):
+    """Account for a todo whose done flag was just flipped"""
+    sign = 1 if todo.done else -1
+    overdue = -sign if _is_overdue(todo.date_to, datetime.now()) else 0
+    _adjust(completed=sign, overdue=overdue)
+
+
+def todo_deleted(done, date_to):
+    """Account for a deleted todo (pass its values captured before deletion)"""
+    overdue = not done and _is_overdue(date_to, datetime.now())
+    _adjust(total=-1, completed=-1 if done else 0, overdue=-1 if overdue else 0)
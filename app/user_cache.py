@@ -0,0 +1,200 @@
+# app/user_cache.py
+# Snapshot cache behind Flask-Login's user_loader.
+#
+# Every authenticated request used to run SELECT users ... by primary key, and
+# pages then lazy-loaded current_user.groups as well. The loader now returns
+# an immutable UserSnapshot (id, username, email, is_admin, groups) built with
+# one joined SELECT and kept per process for USER_CACHE_TTL seconds, so most
+# requests do no identity query at all.
+#
+# Changes made through the ORM invalidate the affected snapshots as soon as they
+# commit: user fields, group membership (from either side), group renames and
+# deletions. Changes made by another worker, or by raw SQL, are picked up when
+# the TTL expires.
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import NamedTuple
+
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import User, UserGroup, user_group_members
+
+DEFAULT_TTL = 30  # seconds; 0 disables the cache
+DEFAULT_MAX_ENTRIES = 10000
+
+SNAPSHOT_FIELDS = ("username", "email", "is_admin", "groups")
+STALE_KEY = "user_cache_stale"
+ALL = "*"
+
+
+class GroupSnapshot(NamedTuple):
+    id: int
+    name: str
+
+
+@dataclass(frozen=True, eq=False)
+class UserSnapshot(UserMixin):
+    """Read-only stand-in for User as current_user (equality/hash from UserMixin)"""
+
+    id: int
+    username: str
+    email: str
+    is_admin: bool
+    groups: tuple = ()
+
+    @property
+    def group_ids(self):
+        return frozenset(group.id for group in self.groups)
+
+
+def load_snapshot(user_id):
+    """Build a snapshot with one SELECT (user joined to their groups); None if missing"""
+    rows = db.session.execute(
+        select(User.id, User.username, User.email, User.is_admin, UserGroup.id, UserGroup.name)
+        .outerjoin(user_group_members, user_group_members.c.user_id == User.id)
+        .outerjoin(UserGroup, UserGroup.id == user_group_members.c.user_group_id)
+        .where(User.id == user_id)
+        .order_by(UserGroup.id)
+    ).all()
+    if not rows:
+        return None
+    user_id, username, email, is_admin = rows[0][:4]
+    groups = tuple(GroupSnapshot(row[4], row[5]) for row in rows if row[4] is not None)
+    return UserSnapshot(user_id, username, email, is_admin, groups)
+
+
+class UserCache:
+    """Per-process TTL cache of UserSnapshots with a size cap (oldest evicted first)"""
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(user_id, None)
+            self.misses += 1
+            return None
+
+    def put(self, snapshot):
+        with self._lock:
+            self._entries.pop(snapshot.id, None)
+            self._entries[snapshot.id] = (time.monotonic(), snapshot)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def load(self, user_id):
+        """Cached snapshot, or load and cache it (unknown ids are not cached)"""
+        if self.ttl <= 0:
+            return load_snapshot(user_id)
+        snapshot = self.get(user_id)
+        if snapshot is None:
+            snapshot = load_snapshot(user_id)
+            if snapshot is not None:
+                self.put(snapshot)
+        return snapshot
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+def init_app(app):
+    app.extensions["user_cache"] = UserCache(
+        ttl=app.config.get("USER_CACHE_TTL", DEFAULT_TTL),
+        max_entries=app.config.get("USER_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+    )
+
+
+def get_cache():
+    return current_app.extensions.get("user_cache") if has_app_context() else None
+
+
+def load_user(user_id):
+    """Flask-Login user_loader: a UserSnapshot, or None for unknown/invalid ids"""
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+    cache = get_cache()
+    return cache.load(user_id) if cache is not None else load_snapshot(user_id)
+
+
+def invalidate(*user_ids):
+    cache = get_cache()
+    if cache is not None:
+        cache.invalidate(*user_ids)
+
+
+# ---- Invalidation on commit ----
+
+
+def _changed(obj, fields):
+    state = inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_stale(session, flush_context):
+    """Remember which snapshots a flush made stale (invalidated after commit)"""
+    stale = None
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            if obj in session.deleted or _changed(obj, SNAPSHOT_FIELDS):
+                stale = stale or session.info.setdefault(STALE_KEY, set())
+                stale.add(obj.id)
+        elif isinstance(obj, UserGroup):
+            stale = stale or session.info.setdefault(STALE_KEY, set())
+            if obj in session.deleted or _changed(obj, ("name",)):
+                stale.add(ALL)
+            else:
+                added, _, removed = inspect(obj).attrs.members.history
+                stale.update(user.id for user in list(added or ()) + list(removed or ()))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_stale(session):
+    stale = session.info.pop(STALE_KEY, None)
+    if not stale:
+        return
+    cache = get_cache()
+    if cache is None:
+        return
+    if ALL in stale:
+        cache.clear()
+    else:
+        cache.invalidate(*stale)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stale(session):
+    session.info.pop(STALE_KEY, None)
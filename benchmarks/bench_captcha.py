@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# bench_captcha.py - CAPTCHA issue/validate throughput
+#
+# Run from the project root:
+#   python benchmarks/bench_captcha.py
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.captcha import CAPTCHA_CHALLENGES, CaptchaEngine  # noqa: E402
+
+
+def legacy_validate(captcha_id, user_answer):
+    """The previous validator: linear scan, answer re-normalized on every call"""
+    try:
+        captcha_id = int(captcha_id)
+        challenge = next((c for c in CAPTCHA_CHALLENGES if c['id'] == captcha_id), None)
+        if challenge:
+            user_answer_lower = user_answer.lower().strip()
+            expected_lower = challenge['answer'].lower()
+            return user_answer_lower == expected_lower or user_answer_lower in expected_lower.split()
+        return False
+    except (ValueError, TypeError):
+        return False
+
+
+def bench(label, func, number):
+    per_call = timeit.timeit(func, number=number) / number
+    print(f"  {label:<32} {per_call * 1_000_000:8.2f} µs/call  {1 / per_call:>12,.0f}/s")
+
+
+def main():
+    number = int(os.getenv("BENCH_ITERATIONS", "100000"))
+    engine = CaptchaEngine("bench-secret")
+    rng = random.Random(1)
+    table_token = engine.signer.sign("table:5").decode()
+    generated_token = engine.signer.sign("sum:123456").decode()
+    generated_answer = next(iter(engine.challenge(generated_token).answers))
+    forged_token = table_token[:-2] + "xx"
+
+    print(f"validation ({number} iterations)")
+    bench("legacy id scan (last entry)", lambda: legacy_validate("5", "turtle"), number)
+    bench("table token", lambda: engine.validate(table_token, "turtle"), number)
+    bench("generated token", lambda: engine.validate(generated_token, generated_answer), number)
+    bench("forged token", lambda: engine.validate(forged_token, "turtle"), number)
+    bench("wrong answer", lambda: engine.validate(table_token, "lizard"), number)
+
+    print(f"\nissuing ({number} iterations)")
+    bench("issue (random source)", lambda: engine.issue(rng), number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# bench_import.py - throughput of app.importer on a generated CSV file
+#
+# Run from the project root (SQLite file database, quotas disabled):
+#   python benchmarks/bench_import.py
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app import create_app, db, importer  # noqa: E402
+from app.models import User, UserGroup  # noqa: E402
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["task", "done", "date_from", "date_to", "assigned_user", "assigned_group"])
+        for i in range(rows):
+            dated = i % 2 == 0
+            writer.writerow(
+                [
+                    f"Imported task number {i % 5000}",
+                    "yes" if i % 3 == 0 else "",
+                    "2025-01-01T09:00" if dated else "",
+                    "2025-01-05T17:00" if dated else "",
+                    f"user{i % 50}" if i % 4 == 0 else "",
+                    f"group{i % 5}" if i % 4 == 1 else "",
+                ]
+            )
+
+
+def main():
+    rows = int(os.getenv("BENCH_ROWS", "100000"))
+    workdir = tempfile.mkdtemp()
+    csv_path = os.path.join(workdir, "todos.csv")
+    write_csv(csv_path, rows)
+
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            "RATELIMIT_STORAGE_URI": "memory://",
+            "EVENTS_BROKER_URI": "memory://",
+            "TODO_QUOTA_TOTAL": None,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(UserGroup(name=f"group{i}") for i in range(5))
+        db.session.add_all(
+            User(username=f"user{i}", email=f"user{i}@example.com", password="x") for i in range(50)
+        )
+        db.session.commit()
+
+        started = time.perf_counter()
+        with open(csv_path, newline="") as stream:
+            report = importer.import_stream(stream, "csv")
+        elapsed = time.perf_counter() - started
+
+    print(f"import-todos: {report.imported} rows in {elapsed:.2f}s ({report.imported / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# bench_ratelimit.py - per-check overhead of the rate limit storages
+#
+# Run from the project root:
+#   python benchmarks/bench_ratelimit.py
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from limits import parse  # noqa: E402
+from limits.storage import storage_from_string  # noqa: E402
+from limits.strategies import STRATEGIES  # noqa: E402
+
+from app.security import rate_limit_storage  # noqa: E402,F401 - registers sqlite://
+
+
+def bench(label, uri, strategy, number):
+    limiter = STRATEGIES[strategy](storage_from_string(uri))
+    item = parse(f"{number * 10} per hour")  # never exhausted during the run
+    keys = [f"user:{i}" for i in range(100)]
+    counter = iter(range(number * 2))
+    per_call = timeit.timeit(
+        lambda: limiter.hit(item, keys[next(counter) % 100]), number=number
+    ) / number
+    print(f"  {label:<42} {per_call * 1_000_000:8.1f} µs/check")
+
+
+def main():
+    number = int(os.getenv("BENCH_ITERATIONS", "5000"))
+    path = os.path.join(tempfile.mkdtemp(), "bench_ratelimit.db")
+    print(f"limiter.hit() ({number} iterations, 100 keys)")
+    bench("memory:// fixed-window (per worker)", "memory://", "fixed-window", number)
+    bench("memory:// sliding-window-counter", "memory://", "sliding-window-counter", number)
+    bench("sqlite:// fixed-window (node-wide)", f"sqlite:///{path}", "fixed-window", number)
+    bench("sqlite:// sliding-window-counter", f"sqlite:///{path}", "sliding-window-counter", number)
+
+
+if __name__ == "__main__":
+    main()
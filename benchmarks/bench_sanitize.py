@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# bench_sanitize.py - per-call latency of the input sanitizer
+#
+# Run from the project root:
+#   python benchmarks/bench_sanitize.py
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.security.sanitize_module import (  # noqa: E402
+    VERDICT_CACHE,
+    calculate_total_score,
+    sanitize_input,
+)
+
+INPUTS = {
+    "username": "alice_qa",
+    "email": "alice@qa.com",
+    "todo text": "Review the deployment checklist before Friday's release",
+    "sql injection": "' OR 1=1; DROP TABLE users--",
+    "xss": '<img src="x" onerror="alert(1)"><script>alert(1)</script>',
+    "5000 chars clean": ("Lorem ipsum dolor sit amet consectetur " * 130)[:5000],
+    "5000 chars hostile": ("<script>alert(1)</script> ' OR 1=1 -- ../ " * 120)[:5000],
+}
+
+
+def bench(label, func, text, number):
+    per_call = timeit.timeit(lambda: func(text), number=number) / number
+    print(f"  {label:<20} {per_call * 1_000_000:10.1f} µs/call")
+
+
+def main():
+    number = int(os.getenv("BENCH_ITERATIONS", "2000"))
+    print(f"calculate_total_score ({number} iterations)")
+    for label, text in INPUTS.items():
+        bench(label, calculate_total_score, text, number)
+
+    print(f"\nsanitize_input, logging off, cache off ({number} iterations)")
+    VERDICT_CACHE.configure(max_entries=0)
+    for label, text in INPUTS.items():
+        bench(label, lambda t: sanitize_input(t, log_suspicious=False), text, number)
+
+    print(f"\nsanitize_input, logging off, repeated input from cache ({number} iterations)")
+    VERDICT_CACHE.configure(max_entries=4096, max_bytes=8 * 1024 * 1024)
+    for label, text in INPUTS.items():
+        bench(label, lambda t: sanitize_input(t, log_suspicious=False), text, number)
+    print(f"\nverdict cache: {VERDICT_CACHE.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+// Live online/offline badges on the admin users page (events from utils/events.js)
+document.addEventListener('app:presence', function (event) {
+    const presence = event.detail;
+    const cell = document.querySelector(`tr[data-user-id="${presence.user_id}"] .user-status`);
+    if (!cell) {
+        return;
+    }
+    if (presence.status === 'online') {
+        cell.innerHTML = '<span class="status-badge online">● Online</span>';
+    } else {
+        cell.innerHTML = '<span class="status-badge offline">○ Offline</span>';
+    }
+});
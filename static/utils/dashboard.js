@@ -28,6 +28,78 @@ function closeDeadlineModal() {
     document.body.style.overflow = 'auto';
 }
 
+// ---- In-place todo mutations (JSON variants of toggle/delete) ----
+
+function csrfToken() {
+    const meta = document.querySelector('meta[name="csrf-token"]');
+    return meta ? meta.getAttribute('content') : '';
+}
+
+// POST JSON and resolve with the response body; rejects with {status, data}
+function postJson(url, payload) {
+    return fetch(url, {
+        method: 'POST',
+        headers: {
+            'Accept': 'application/json',
+            'Content-Type': 'application/json',
+            'X-Requested-With': 'XMLHttpRequest',
+            'X-CSRFToken': csrfToken()
+        },
+        body: JSON.stringify(payload)
+    }).then(response => response.json()
+        .catch(() => ({}))
+        .then(data => {
+            if (!response.ok) {
+                throw { status: response.status, data: data };
+            }
+            return data;
+        }));
+}
+
+function renderTodoState(item, todo) {
+    if (!item || !todo) {
+        return;
+    }
+    const checkbox = item.querySelector('input[name="done"]');
+    if (checkbox) {
+        checkbox.checked = todo.done;
+    }
+    const label = item.querySelector('.todo-item span');
+    if (label) {
+        label.textContent = todo.task;
+        label.className = todo.done ? 'completed' : 'incomplete';
+    }
+}
+
+function showFlash(message, category) {
+    if (!message) {
+        return;
+    }
+    let container = document.querySelector('.flash-container');
+    if (!container) {
+        container = document.createElement('div');
+        container.className = 'flash-container';
+        document.body.appendChild(container);
+    }
+    const flash = document.createElement('div');
+    flash.className = `flash-message flash-${category}`;
+    const text = document.createElement('div');
+    text.className = 'message-text';
+    text.textContent = message;
+    flash.appendChild(text);
+    container.appendChild(flash);
+    setTimeout(() => flash.remove(), 4000);
+}
+
+function handleMutationError(error, form) {
+    if (error && error.status) {
+        showFlash((error.data && error.data.error) || 'Request failed', 'error');
+    } else {
+        // Network/parse problem: fall back to the classic form post
+        form.submit();
+    }
+}
+
 // Initialize event listeners when DOM is loaded
 document.addEventListener('DOMContentLoaded', function() {
     // Modal close button
@@ -54,18 +126,26 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
-    // Delete confirmation links
+    // Delete confirmation links - delete in place, no page reload
     document.querySelectorAll('.delete-confirm').forEach(link => {
         link.addEventListener('click', function(e) {
             if (!confirm('Are you sure?')) {
                 e.preventDefault();
                 return false;
             }
-            // If confirmed, submit the parent form
             const form = this.closest('form');
-            if (form) {
-                form.submit();
+            if (!form) {
+                return;
             }
+            postJson(form.action, {})
+                .then(data => {
+                    const item = form.closest('li');
+                    if (item) {
+                        item.remove();
+                    }
+                    showFlash(data.message, 'success');
+                })
+                .catch(error => handleMutationError(error, form));
         });
     });
 
@@ -75,17 +155,47 @@ document.addEventListener('DOMContentLoaded', function() {
         termCheckbox.addEventListener('change', toggleTermInputs);
     }
 
-    // Todo checkboxes - submit form when changed
+    // Todo checkboxes - update the row in place when changed
     document.querySelectorAll('input[type="checkbox"][name="done"]').forEach(checkbox => {
         checkbox.addEventListener('change', function() {
             const form = this.closest('form');
-            if (form) {
-                form.submit();
+            if (!form) {
+                return;
             }
+            const requested = this.checked;
+            postJson(form.action, { done: requested })
+                .then(data => {
+                    renderTodoState(form.closest('li'), data.todo);
+                    showFlash(data.message, 'success');
+                })
+                .catch(error => {
+                    this.checked = !requested;
+                    handleMutationError(error, form);
+                });
         });
     });
 });
 
+// Live updates from static/utils/events.js
+document.addEventListener('app:todo.updated', function (event) {
+    const todo = event.detail;
+    renderTodoState(document.querySelector(`li[data-todo-id="${todo.id}"]`), todo);
+});
+
+document.addEventListener('app:todo.deleted', function (event) {
+    const item = document.querySelector(`li[data-todo-id="${event.detail.id}"]`);
+    if (item) {
+        item.remove();
+    }
+});
+
+document.addEventListener('app:todo.created', function () {
+    const notice = document.getElementById('todo-updates-notice');
+    if (notice) {
+        notice.hidden = false;
+    }
+});
+
 // Close modal when clicking outside
 window.addEventListener('click', function (event) {
     const modal = document.getElementById('deadlineModal');
@@ -0,0 +1,40 @@
+// Live updates over server-sent events (/api/events).
+// Re-dispatches every server event on `document` as "app:<type>"
+// (e.g. "app:todo.updated", "app:presence") for page scripts to handle.
+window.appEvents = { connected: false };
+
+(function () {
+    if (document.body.dataset.userAuthenticated !== "true" || !window.EventSource) {
+        return;
+    }
+
+    const source = new EventSource('/api/events');
+    const types = ['todo.created', 'todo.updated', 'todo.deleted', 'presence'];
+
+    source.addEventListener('open', function () {
+        window.appEvents.connected = true;
+    });
+
+    source.addEventListener('error', function () {
+        // EventSource reconnects on its own; heartbeats take over meanwhile
+        window.appEvents.connected = false;
+    });
+
+    types.forEach(function (type) {
+        source.addEventListener(type, function (message) {
+            document.dispatchEvent(new CustomEvent('app:' + type, {
+                detail: JSON.parse(message.data)
+            }));
+        });
+    });
+
+    // The server dropped events for this page (it fell behind): reload once
+    source.addEventListener('resync', function () {
+        source.close();
+        window.location.reload();
+    });
+
+    window.addEventListener('beforeunload', function () {
+        source.close();
+    });
+})();
@@ -1,4 +1,8 @@
 function sendHeartbeat() {
+    // An open live-update stream already keeps the session marked as active
+    if (window.appEvents && window.appEvents.connected) {
+        return;
+    }
     // Only run if user is authenticated and page has focus
     if (document.body.dataset.userAuthenticated === "true" && document.hasFocus()) {
         // Get the CSRF token from the meta tag
@@ -1,14 +1,19 @@
 import pytest
 from app import create_app, db
+from app.models import User
 
 @pytest.fixture
-def app():
+def app(tmp_path):
     """Create and configure a new app instance for each test."""
     app = create_app({
         'TESTING': True,
         'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:', # Use an in-memory DB for tests
         'SECRET_KEY': 'test',
         'WTF_CSRF_ENABLED': False, # Disable CSRF forms validation for tests
+        'RATELIMIT_STORAGE_URI': 'memory://', # Per-test counters
+        'LAST_SEEN_BACKGROUND_FLUSH': False, # Tests flush explicitly
+        'EVENTS_BROKER_URI': 'memory://', # In-process live updates
+        'PRESENCE_DB_PATH': str(tmp_path / 'presence.db'), # Per-test presence store
     })
 
     with app.app_context():
@@ -20,4 +25,36 @@ def app():
 @pytest.fixture
 def client(app):
     """A test client for the app."""
-    return app.test_client()
\ No newline at end of file
+    return app.test_client()
+
+@pytest.fixture
+def make_user(app):
+    """
+    Factory for committed users: make_user(name, is_admin=..., group=...), with
+    a username-derived email and the user added to `group` when one is given.
+    """
+    def create(name="bob", is_admin=False, group=None):
+        user = User(username=name, email=f"{name}@example.com", password="x", is_admin=is_admin)
+        if group is not None:
+            user.groups.append(group)
+        db.session.add(user)
+        db.session.commit()
+        return user
+
+    return create
+
+@pytest.fixture
+def login(client, make_user):
+    """
+    Log the test client in: login(name, is_admin=...) creates the user first,
+    login(user_id=...) uses an existing one. Returns the user's id.
+    """
+    def log_in(name="bob", is_admin=False, user_id=None):
+        if user_id is None:
+            user_id = make_user(name, is_admin=is_admin).id
+        with client.session_transaction() as session:
+            session["_user_id"] = str(user_id)
+            session["_fresh"] = True
+        return user_id
+
+    return log_in
@@ -0,0 +1,65 @@
+import logging
+import queue
+
+from app.security.async_logging import (
+    AsyncLogListener,
+    BatchRotatingFileHandler,
+    DroppingQueueHandler,
+    create_async_handler,
+)
+
+
+def _record(msg):
+    return logging.makeLogRecord(
+        {"name": "InputSanitizer", "levelno": logging.WARNING, "levelname": "WARNING", "msg": msg}
+    )
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    for i in range(5):
+        handler.handle(_record(f"r{i}"))
+    assert handler.queue.qsize() == 2
+    assert handler.take_dropped() == 3
+    assert handler.dropped == 0
+
+
+def test_listener_writes_batches_and_reports_drops(tmp_path):
+    path = tmp_path / "suspicious.log"
+    file_handler = BatchRotatingFileHandler(path, maxBytes=0, encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter("%(levelname)s | %(message)s"))
+    queue_handler, listener = create_async_handler([file_handler], queue_size=3)
+
+    # Fill the queue before the listener thread drains it
+    listener.ensure_running = lambda: None
+    for i in range(5):
+        queue_handler.handle(_record(f"r{i}"))
+
+    listener._write(listener._next_batch_nowait())
+    file_handler.close()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines[:3] == ["WARNING | r0", "WARNING | r1", "WARNING | r2"]
+    assert "dropped 2" in lines[3]
+
+
+def test_batch_handler_rotates(tmp_path):
+    path = tmp_path / "suspicious.log"
+    file_handler = BatchRotatingFileHandler(path, maxBytes=50, backupCount=2, encoding="utf-8")
+    for _ in range(3):
+        file_handler.emit_batch([_record("x" * 30)])
+    file_handler.close()
+    assert (tmp_path / "suspicious.log.1").exists()
+
+
+def test_stop_drains_queue(tmp_path):
+    path = tmp_path / "suspicious.log"
+    file_handler = BatchRotatingFileHandler(path, encoding="utf-8")
+    log_queue = queue.Queue()
+    listener = AsyncLogListener(log_queue, [file_handler])
+    queue_handler = DroppingQueueHandler(log_queue, listener)
+    for i in range(10):
+        queue_handler.handle(_record(f"r{i}"))
+    listener.stop()
+    file_handler.close()
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 10
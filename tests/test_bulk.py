@@ -0,0 +1,154 @@
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app import db, events, quota
+from app.models import User, UserGroup, Todo, TodoQuotaCounter
+
+
+def add_todos(count, **assignment):
+    ids = []
+    for i in range(count):
+        reserved, _ = quota.reserve(
+            assignment.get("assigned_user_id"), assignment.get("assigned_group_id")
+        )
+        assert reserved
+        todo = Todo(task=f"task {i}", **assignment)
+        db.session.add(todo)
+        db.session.commit()
+        ids.append(todo.id)
+    return ids
+
+
+def counter(scope, scope_id=0):
+    row = db.session.get(TodoQuotaCounter, (scope, scope_id))
+    return row.count if row else None
+
+
+def bulk(app, client, operation, todo_ids, **params):
+    with app.app_context():
+        return client.post(
+            "/api/todos/bulk",
+            json={"operation": operation, "todo_ids": todo_ids, "params": params},
+        )
+
+
+def test_bulk_mark_done_reports_per_id_with_fixed_statements(app, client, login):
+    login("admin", is_admin=True)
+    ids = add_todos(20)
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        response = bulk(app, client, "mark_done", ids + ["missing"])
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["succeeded"] == 20 and body["failed"] == 1
+    assert body["results"][-1] == {"id": "missing", "status": "not_found"}
+    updates = [sql for sql in statements if sql.startswith("UPDATE todos")]
+    assert len(updates) == 1
+    with app.app_context():
+        assert Todo.query.filter_by(done=True).count() == 20
+
+
+def test_bulk_delete_releases_quota_and_publishes(app, client, login):
+    login("admin", is_admin=True)
+    bob = User(username="bob", email="bob@example.com", password="x")
+    db.session.add(bob)
+    db.session.commit()
+    bob_id = bob.id
+    ids = add_todos(3, assigned_user_id=bob_id) + add_todos(2)
+
+    subscription = events.subscribe(bob_id)
+    try:
+        response = bulk(app, client, "delete", ids)
+        assert response.get_json()["succeeded"] == 5
+        received = []
+        while not subscription.queue.empty():
+            received.append(subscription.queue.get_nowait())
+    finally:
+        events.bus.unsubscribe(subscription)
+
+    assert [e["type"] for e in received] == [events.TODO_DELETED] * 3
+    with app.app_context():
+        assert Todo.query.count() == 0
+        assert counter(quota.TOTAL_SCOPE) == 0
+        assert counter(quota.USER_SCOPE, bob_id) == 0
+
+
+def test_bulk_reassign_moves_quota_and_respects_limits(app, client, login):
+    login("admin", is_admin=True)
+    backend = UserGroup(name="backend")
+    db.session.add(backend)
+    db.session.commit()
+    backend_id = backend.id
+    ids = add_todos(3)
+
+    app.config["TODO_QUOTA_PER_GROUP"] = 2
+    response = bulk(app, client, "reassign", ids, group_id=backend_id)
+    assert response.status_code == 409
+    with app.app_context():
+        assert Todo.query.filter_by(assigned_group_id=backend_id).count() == 0
+
+    app.config["TODO_QUOTA_PER_GROUP"] = None
+    response = bulk(app, client, "reassign", ids, group_id=backend_id)
+    assert response.status_code == 200
+    with app.app_context():
+        assert Todo.query.filter_by(assigned_group_id=backend_id).count() == 3
+        assert counter(quota.GROUP_SCOPE, backend_id) == 3
+        assert counter(quota.TOTAL_SCOPE) == 3
+
+
+def test_bulk_shift_dates(app, client, login):
+    login("admin", is_admin=True)
+    todo = Todo(task="dated", date_from=datetime(2025, 1, 1, 9), date_to=datetime(2025, 1, 2, 9))
+    undated = Todo(task="undated")
+    db.session.add_all([todo, undated])
+    db.session.commit()
+    todo_id, undated_id = todo.id, undated.id
+
+    response = bulk(app, client, "shift_dates", [todo_id, undated_id], days=2, hours=1)
+    assert response.status_code == 200
+    with app.app_context():
+        shifted = db.session.get(Todo, todo_id)
+        assert shifted.date_from == datetime(2025, 1, 3, 10)
+        assert shifted.date_to == datetime(2025, 1, 4, 10)
+        assert db.session.get(Todo, undated_id).date_to is None
+
+
+
+def test_bulk_shift_dates_keeps_microseconds(app, client, login):
+    login("admin", is_admin=True)
+    start = datetime(2025, 1, 1, 9, 0, 0, 123456)
+    todo = Todo(task="precise", date_from=start, date_to=None)
+    db.session.add(todo)
+    db.session.commit()
+    todo_id, updated_at = todo.id, todo.updated_at
+
+    assert bulk(app, client, "shift_dates", [todo_id], minutes=0.5).status_code == 200
+    with app.app_context():
+        shifted = db.session.get(Todo, todo_id)
+        assert shifted.date_from == datetime(2025, 1, 1, 9, 0, 30, 123456)
+        assert shifted.date_to is None
+        assert shifted.updated_at > updated_at
+
+
+def test_bulk_validation(app, client, login):
+    login("admin", is_admin=True)
+    app.config["BULK_MAX_BATCH"] = 2
+
+    assert bulk(app, client, "delete", []).status_code == 400
+    assert bulk(app, client, "delete", ["a", "b", "c"]).status_code == 400
+    assert bulk(app, client, "explode", ["a"]).status_code == 400
+    assert bulk(app, client, "shift_dates", ["a"]).status_code == 400
+    assert bulk(app, client, "reassign", ["a"], user_id=999).status_code == 404
+
+
+def test_bulk_requires_admin(app, client, login):
+    login()
+
+    assert bulk(app, client, "delete", ["a"]).status_code == 403
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from app import captcha
+
+
+@pytest.fixture
+def engine():
+    return captcha.CaptchaEngine("test")
+
+
+def test_table_answers_are_prenormalized(engine):
+    token = engine.signer.sign("table:2").decode()
+    assert captcha.CHALLENGE_TABLE[2].answers == {"blue yellow blue yellow", "blue", "yellow"}
+    for answer in ["blue yellow blue yellow", "  Blue   YELLOW blue yellow ", "yellow"]:
+        assert engine.validate(token, answer)
+    assert not engine.validate(token, "green")
+    assert not engine.validate(token, "")
+
+
+def test_generated_challenges_round_trip(engine):
+    rng = random.Random(7)
+    seen = set()
+    for _ in range(300):
+        issued = engine.issue(rng)
+        challenge = engine.challenge(issued["id"])
+        assert challenge.question == issued["question"]
+        assert engine.validate(issued["id"], next(iter(challenge.answers)))
+        seen.add(challenge.question)
+    assert len(seen) > 200
+
+    assert captcha.generated_challenge("sum", 42) == captcha.generated_challenge("sum", 42)
+
+
+def test_rejects_forged_expired_and_unknown_tokens(engine, monkeypatch):
+    token = engine.signer.sign("table:1").decode()
+    assert engine.validate(token, "4")
+
+    assert not engine.validate("1", "4")  # bare ids are no longer accepted
+    assert not engine.validate(captcha.CaptchaEngine("other").signer.sign("table:1").decode(), "4")
+    assert not engine.validate(engine.signer.sign("table:99").decode(), "4")
+    assert not engine.validate(engine.signer.sign("nope:1").decode(), "4")
+    assert not engine.validate(None, "4")
+
+    later = engine.signer.get_timestamp() + engine.max_age + 1
+    monkeypatch.setattr(engine.signer, "get_timestamp", lambda: later)
+    assert not engine.validate(token, "4")
+
+
+def test_custom_generator(engine, monkeypatch):
+    monkeypatch.setitem(captcha.GENERATORS, "double", None)
+
+    @captcha.challenge_generator("double")
+    def double(rng):
+        n = rng.randint(1, 5)
+        return captcha.Challenge(f"What is 2 x {n}?", captcha.number_answers(2 * n))
+
+    token = engine.signer.sign("double:3").decode()
+    n = random.Random(3).randint(1, 5)
+    assert engine.validate(token, str(2 * n))
+    with pytest.raises(ValueError):
+        captcha.challenge_generator("table")
+
+
+def test_login_form_carries_signed_token(app, client):
+    with app.app_context():
+        html = client.get("/login").get_data(as_text=True)
+        assert 'name="captcha_id"' in html and 'value="1"' not in html
@@ -0,0 +1,134 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import User, Todo, UserGroup
+
+
+def get(app, client, url, etag=None):
+    headers = {"If-None-Match": f'"{etag}"'} if etag else {}
+    with app.app_context():
+        return client.get(url, headers=headers)
+
+
+def test_todos_revalidate_until_changed(app, client, login):
+    login()
+    todo = Todo(task="ship it")
+    db.session.add(todo)
+    db.session.commit()
+    todo_id = todo.id
+
+    first = get(app, client, "/api/todos")
+    etag, _ = first.get_etag()
+    assert first.status_code == 200 and etag
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    again = get(app, client, "/api/todos", etag)
+    assert again.status_code == 304 and again.data == b""
+    assert again.get_etag()[0] == etag
+
+    # Each page is its own representation
+    assert get(app, client, "/api/todos?limit=1", etag).status_code == 200
+
+    with app.app_context():
+        client.post(f"/toggle/{todo_id}", json={"done": True}, headers={"Accept": "application/json"})
+    changed = get(app, client, "/api/todos", etag)
+    assert changed.status_code == 200 and changed.get_etag()[0] != etag
+    assert changed.get_json()["todos"][0]["done"] is True
+
+
+@pytest.fixture
+def local_clock_behind_utc(monkeypatch):
+    monkeypatch.setenv("TZ", "Etc/GMT+12")  # local time = UTC-12
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.mark.parametrize("change", ["toggle", "edit", "bulk"])
+def test_updates_move_etag_when_local_clock_is_behind_utc(
+    app, client, login, local_clock_behind_utc, change
+):
+    login("admin", is_admin=True)
+    now = datetime.utcnow()
+    todo = Todo(task="ship it", updated_at=now - timedelta(hours=1))
+    newest = Todo(task="just touched", updated_at=now)
+    db.session.add_all([todo, newest])
+    db.session.commit()
+    todo_id = todo.id
+    etag = get(app, client, "/api/todos").get_etag()[0]
+
+    json = {"Accept": "application/json"}
+    with app.app_context():
+        if change == "toggle":
+            client.post(f"/toggle/{todo_id}", json={"done": True}, headers=json)
+        elif change == "edit":
+            client.post(f"/edit/{todo_id}", json={"todo": "ship it now"}, headers=json)
+        else:
+            client.post("/api/todos/bulk", json={"operation": "mark_done", "todo_ids": [todo_id]})
+    assert get(app, client, "/api/todos", etag).status_code == 200
+
+
+def test_renamed_assignee_moves_etag(app, client, login):
+    login()
+    backend = UserGroup(name="backend")
+    db.session.add(Todo(task="ship it", assigned_group=backend))
+    db.session.commit()
+    etag = get(app, client, "/api/todos").get_etag()[0]
+
+    backend.name = "platform"
+    db.session.commit()
+    response = get(app, client, "/api/todos", etag)
+    assert response.status_code == 200
+    assert response.get_json()["todos"][0]["assigned_group"] == "platform"
+
+
+def test_stats_and_listings_answer_304(app, client, login):
+    db.session.add(UserGroup(name="backend"))
+    db.session.commit()
+    login("admin", is_admin=True)
+
+    for url in ["/api/stats", "/api/registration/groups", "/admin/api/users", "/admin/api/groups"]:
+        first = get(app, client, url)
+        assert first.status_code == 200, url
+        assert get(app, client, url, first.get_etag()[0]).status_code == 304, url
+
+    public = get(app, client, "/api/registration/groups")
+    assert public.headers["Cache-Control"] == "no-cache"
+
+
+def test_not_modified_does_not_use_up_rate_limit(app, client, login):
+    login()
+    etag = get(app, client, "/api/stats").get_etag()[0]
+    for _ in range(60):
+        assert get(app, client, "/api/stats", etag).status_code == 304
+    assert get(app, client, "/api/stats").status_code == 200
+
+
+def test_admin_listings_revalidate_from_aggregates(app, client, login):
+    login("admin", is_admin=True)
+    bob = User(username="bob", email="bob@example.com", password="x")
+    db.session.add_all([bob, UserGroup(name="backend")])
+    db.session.commit()
+
+    for url in ["/admin/api/users", "/admin/api/groups"]:
+        etag = get(app, client, url).get_etag()[0]
+        statements = []
+        listener = lambda *args: statements.append(args[2])  # noqa: E731
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            assert get(app, client, url, etag).status_code == 304
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+        assert not any("users.email" in sql or "user_groups.name" in sql for sql in statements)
+
+    etag = get(app, client, "/admin/api/users").get_etag()[0]
+    bob.email = "robert@example.com"
+    db.session.commit()
+    response = get(app, client, "/admin/api/users", etag)
+    assert response.status_code == 200
+    assert response.get_json()[0]["email"] == "robert@example.com"
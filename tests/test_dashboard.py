@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import UserGroup, Todo, Deadline
+from app.dashboard import get_user_todos, get_user_deadlines
+
+
+def test_user_todos_include_direct_and_group_tasks(app, make_user):
+    backend = UserGroup(name="backend")
+    frontend = UserGroup(name="frontend")
+    db.session.add_all([backend, frontend])
+    bob = make_user("bob", group=backend)
+    alice = make_user("alice", group=frontend)
+    db.session.flush()
+
+    db.session.add_all(
+        [
+            Todo(task="direct", assigned_user_id=bob.id),
+            Todo(task="group", assigned_group_id=backend.id),
+            Todo(task="other user", assigned_user_id=alice.id),
+            Todo(task="other group", assigned_group_id=frontend.id),
+            Todo(task="unassigned"),
+        ]
+    )
+    db.session.commit()
+
+    tasks = {todo.task for todo in get_user_todos(bob.id)}
+    assert tasks == {"direct", "group"}
+
+
+def test_user_deadlines_filtered_by_assignment_and_limited(app, make_user):
+    backend = UserGroup(name="backend")
+    db.session.add(backend)
+    bob = make_user("bob", group=backend)
+    alice = make_user("alice")
+    db.session.flush()
+
+    now = datetime(2025, 1, 1)
+    deadlines = []
+    for days in range(1, 8):
+        deadline = Deadline(
+            title=f"in {days} days",
+            deadline_date=now + timedelta(days=days),
+            is_active=True,
+        )
+        deadlines.append(deadline)
+    inactive = Deadline(title="inactive", deadline_date=now + timedelta(hours=1), is_active=False)
+    past = Deadline(title="past", deadline_date=now - timedelta(days=1), is_active=True)
+    db.session.add_all(deadlines + [inactive, past])
+
+    # Direct assignments for days 1/5/6, group assignment for day 2, other user on day 3
+    for deadline in (deadlines[0], deadlines[4], deadlines[5], inactive, past):
+        deadline.assigned_users.append(bob)
+    deadlines[1].assigned_groups.append(backend)
+    deadlines[2].assigned_users.append(alice)
+    db.session.commit()
+
+    result = get_user_deadlines(bob.id, now)
+    assert [d.title for d in result] == ["in 1 days", "in 2 days", "in 5 days"]
+    assert result[0].is_urgent and not result[2].is_urgent
@@ -0,0 +1,116 @@
+import json
+
+from app import db, events, last_seen
+from app.models import UserGroup, Todo
+
+
+def drain(subscription):
+    items = []
+    while not subscription.queue.empty():
+        items.append(subscription.queue.get_nowait())
+    return items
+
+
+def test_fan_out_respects_audience():
+    bus = events.EventBus()
+    admin = bus.subscribe(1, is_admin=True)
+    assignee = bus.subscribe(2)
+    member = bus.subscribe(3, group_ids=[7])
+    outsider = bus.subscribe(4, group_ids=[8])
+
+    bus.dispatch({"type": events.TODO_UPDATED, "data": {}, "audience": {"admins": True, "user_ids": [2], "group_ids": [7]}})
+    bus.dispatch({"type": events.PRESENCE, "data": {}, "audience": {"admins": True}})
+
+    assert len(drain(admin)) == 2
+    assert len(drain(assignee)) == 1
+    assert len(drain(member)) == 1
+    assert drain(outsider) == []
+
+
+def test_stream_cap_fails_fast():
+    bus = events.EventBus(max_streams=1)
+    bus.subscribe(1)
+    try:
+        bus.subscribe(2)
+    except events.EventStreamsBusy as exc:
+        assert exc.code == 503
+    else:
+        raise AssertionError("expected EventStreamsBusy")
+
+
+def test_sqlite_broker_relays_between_workers(tmp_path):
+    path = str(tmp_path / "events.db")
+    publisher = events.SQLiteBroker(events.EventBus(), path)
+    receiving_bus = events.EventBus()
+    receiver = events.SQLiteBroker(receiving_bus, path)
+    subscription = receiving_bus.subscribe(1, is_admin=True)
+
+    publisher.publish({"type": events.TODO_CREATED, "data": {"id": 5}, "audience": {"admins": True}})
+    assert receiver.poll() == 1
+    (event,) = drain(subscription)
+    assert event["data"] == {"id": 5}
+    assert event["id"] == 1
+    assert receiver.poll() == 0
+
+
+def test_routes_publish_todo_changes(app, client, login, make_user):
+    backend = UserGroup(name="backend")
+    db.session.add(backend)
+    bob = make_user("bob", group=backend)
+    db.session.flush()
+    todo = Todo(task="ship it", assigned_group_id=backend.id)
+    db.session.add(todo)
+    db.session.commit()
+    bob_id, backend_id, todo_id = bob.id, backend.id, todo.id
+
+    subscription = events.subscribe(bob_id, group_ids=[backend_id])
+    try:
+        login(user_id=bob_id)
+        with app.app_context():
+            client.post(f"/toggle/{todo_id}")
+        with app.app_context():
+            client.post(f"/delete/{todo_id}")
+
+        updated, deleted = drain(subscription)
+        assert updated["type"] == events.TODO_UPDATED
+        assert updated["data"]["done"] is True
+        assert deleted["type"] == events.TODO_DELETED
+        assert deleted["data"] == {"id": todo_id}
+    finally:
+        events.bus.unsubscribe(subscription)
+
+
+def test_event_stream_endpoint(app, client, login, make_user):
+    bob = make_user("bob")
+    bob_id = bob.id
+    app.config["EVENTS_KEEPALIVE"] = 0.05
+
+    login(user_id=bob_id)
+    with app.app_context():
+        response = client.get("/api/events", buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+
+    chunks = iter(response.response)
+    assert next(chunks) == b"retry: 5000\n\n"
+    events.publish(events.TODO_UPDATED, {"id": 1, "done": True}, {"user_ids": [bob_id]})
+    chunk = next(chunks).decode()
+    assert chunk.startswith("event: todo.updated\n")
+    assert json.loads(chunk.split("data: ", 1)[1]) == {"id": 1, "done": True}
+    assert next(chunks) == b": keep-alive\n\n"
+
+    response.close()
+    assert events.bus.subscriber_count() == 0
+    assert last_seen.buffer.flush() == 1  # the open stream counted as activity
+
+
+def test_sqlite_broker_publishes_batches(tmp_path):
+    bus = events.EventBus()
+    broker = events.SQLiteBroker(bus, str(tmp_path / "events.db"))
+    subscription = bus.subscribe(1, is_admin=True)
+
+    broker.publish_many(
+        [{"type": events.TODO_DELETED, "data": {"id": i}, "audience": {"admins": True}} for i in range(3)]
+    )
+    assert broker.poll() == 3
+    assert [event["data"]["id"] for event in drain(subscription)] == [0, 1, 2]
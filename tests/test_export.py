@@ -0,0 +1,70 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+from app import db, export
+from app.models import User, UserGroup, Todo, Deadline
+
+
+def seed():
+    backend = UserGroup(name="backend")
+    admin = User(username="admin", email="admin@example.com", password="x", is_admin=True)
+    bob = User(username="bob", email="bob@example.com", password="x")
+    db.session.add_all([backend, admin, bob])
+    db.session.flush()
+    db.session.add_all(
+        [
+            Todo(task="first", created_at=datetime(2025, 1, 1), assigned_user_id=bob.id, created_by_id=admin.id),
+            Todo(task="second", created_at=datetime(2025, 1, 2), assigned_group_id=backend.id, done=True),
+            Todo(task="third", created_at=datetime(2025, 1, 3)),
+        ]
+    )
+    deadline = Deadline(title="Release", deadline_date=datetime(2025, 2, 1), created_by_id=admin.id)
+    deadline.assigned_users.append(bob)
+    deadline.assigned_groups.append(backend)
+    db.session.add(deadline)
+    db.session.commit()
+    return admin.id
+
+
+def test_rows_match_to_dict(app):
+    seed()
+    expected = [todo.to_dict() for todo in Todo.query.order_by(Todo.created_at)]
+    lines = "".join(export.stream_export("todos", "ndjson", batch_size=2)).splitlines()
+    assert [json.loads(line) for line in lines] == expected
+
+    (deadline,) = Deadline.query.all()
+    (line,) = "".join(export.stream_export("deadlines", "ndjson")).splitlines()
+    assert json.loads(line) == deadline.to_dict()
+
+
+def test_csv_and_columnar(app):
+    seed()
+    rows = list(csv.DictReader(io.StringIO("".join(export.stream_export("todos", "csv", batch_size=2)))))
+    assert [row["task"] for row in rows] == ["first", "second", "third"]
+    assert rows[0]["assigned_user"] == "bob" and rows[1]["assigned_group"] == "backend"
+
+    header, *groups = "".join(export.stream_export("todos", "columnar", batch_size=2)).splitlines()
+    assert json.loads(header)["schema"] == list(Todo().to_dict())
+    groups = [json.loads(group) for group in groups]
+    assert [group["rows"] for group in groups] == [2, 1]
+    assert groups[0]["columns"]["done"] == [False, True]
+
+
+def test_export_endpoint_streams_gzip(app, client, login):
+    admin_id = seed()
+    login(user_id=admin_id)
+
+    with app.app_context():
+        response = client.get("/admin/api/export/todos?format=ndjson&compress=gzip")
+    assert response.status_code == 200
+    assert response.mimetype == "application/gzip"
+    assert response.headers["Content-Disposition"].endswith('.ndjson.gz"')
+    lines = gzip.decompress(response.data).decode().splitlines()
+    assert len(lines) == 3
+
+    with app.app_context():
+        assert client.get("/admin/api/export/todos?format=xml").status_code == 400
+        assert client.get("/admin/api/export/users").status_code == 400
@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from app import db, fragment_cache
+from app.models import Todo
+
+
+def render_admin_dashboard(app, client):
+    with app.app_context():
+        response = client.get("/admin/dashboard")
+    assert response.status_code == 200
+    return response.get_data(as_text=True)
+
+
+def test_lru_with_byte_cap():
+    cache = fragment_cache.FragmentCache(max_entries=10, max_bytes=2000)
+    for i in range(5):
+        cache.put(i, "x" * 400)
+    assert cache.stats()["entries"] < 5 and cache.stats()["bytes"] <= 2000
+    assert cache.get(4) is not None and cache.get(0) is None
+
+    cache.configure(max_entries=0)
+    assert cache.get(4) is None
+
+
+def test_dashboard_rows_rendered_once_until_changed(app, client, login):
+    fragment_cache.CACHE.clear()
+    login("admin", is_admin=True)
+    todos = [Todo(task=f"task {i}", updated_at=datetime(2025, 1, 1)) for i in range(3)]
+    db.session.add_all(todos)
+    db.session.commit()
+    first_id = todos[0].id
+
+    first = render_admin_dashboard(app, client)
+    assert first.count('name="csrf_token"') == 6
+    assert fragment_cache.CSRF_SLOT not in first
+    misses = fragment_cache.CACHE.stats()["misses"]
+
+    # Unchanged list: one lookup for the whole list, nothing re-rendered
+    assert render_admin_dashboard(app, client).count("task ") == 3
+    assert fragment_cache.CACHE.stats()["misses"] == misses
+
+    # One changed todo: the list and only that row miss
+    with app.app_context():
+        todo = db.session.get(Todo, first_id)
+        todo.task = "renamed"
+        todo.updated_at = datetime(2025, 1, 2)
+        db.session.commit()
+    html = render_admin_dashboard(app, client)
+    assert "renamed" in html and "task 0" not in html
+    assert fragment_cache.CACHE.stats()["misses"] == misses + 2
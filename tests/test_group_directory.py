@@ -0,0 +1,87 @@
+from sqlalchemy import event
+
+from app import db, group_directory
+from app.captcha import get_engine
+from app.models import User, UserGroup
+from app.security.validation import validate_group
+
+
+def count_selects(fn):
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        result = fn()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    return result, sum(sql.lstrip().upper().startswith("SELECT") for sql in statements)
+
+
+def test_resolves_active_groups_from_one_load(app):
+    db.session.add_all(
+        [UserGroup(name="Backend"), UserGroup(name="qa"), UserGroup(name="legacy", is_active=False)]
+    )
+    db.session.commit()
+    groups = group_directory.get_directory()
+
+    backend, selects = count_selects(lambda: groups.resolve("backend"))
+    assert selects == 1 and backend.name == "Backend"
+    _, selects = count_selects(
+        lambda: [groups.resolve(name) for name in ["BACKEND", "qa", "QA", "nope"]]
+    )
+    assert selects == 0
+
+    assert groups.resolve("legacy") is None and groups.resolve("") is None
+    assert validate_group("backend", groups) == (True, "Valid")
+    assert validate_group("legacy")[0] is False
+    assert validate_group("")[0] is False
+
+
+def test_reloaded_after_group_changes_commit(app):
+    qa = UserGroup(name="qa")
+    db.session.add(qa)
+    db.session.commit()
+    groups = group_directory.get_directory()
+    version = groups.version
+
+    qa.name = "testers"
+    db.session.commit()
+    assert groups.resolve("qa") is None and groups.resolve("Testers") is not None
+    assert groups.version != version
+
+    qa.is_active = False
+    db.session.commit()
+    assert groups.resolve("testers") is None
+
+    # Membership changes do not touch the directory
+    loads = groups.loads
+    qa.members.append(User(username="bob", email="bob@example.com", password="x"))
+    db.session.commit()
+    groups.entries()
+    assert groups.loads == loads
+
+
+def test_register_joins_group_case_insensitively(app, client):
+    db.session.add(UserGroup(name="Backend"))
+    db.session.commit()
+
+    form = {
+        "username": "bob_1",
+        "email": "bob@example.com",
+        "password": "correct horse",
+        "group": "backend",
+        "captcha_id": get_engine().signer.sign("table:1").decode(),
+        "captcha_answer": "4",
+    }
+    with app.app_context():
+        response = client.post("/register", data=form)
+    assert response.status_code == 302
+
+    with app.app_context():
+        user = User.query.filter_by(username="bob_1").one()
+        assert [group.name for group in user.groups] == ["Backend"]
+
+    with app.app_context():
+        response = client.post("/register", data={**form, "username": "eve", "group": "sales"})
+    assert response.status_code == 200
+    assert User.query.filter_by(username="eve").first() is None
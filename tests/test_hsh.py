@@ -0,0 +1,59 @@
+import threading
+
+import pytest
+
+from app.security.hsh import PasswordHasher, PasswordHasherBusy, get_rounds
+
+
+@pytest.fixture
+def hasher():
+    return PasswordHasher(rounds=4, workers=2, max_pending=2, timeout=5)
+
+
+def test_hash_and_verify_roundtrip(hasher):
+    hashed = hasher.hash("s3cret")
+    assert get_rounds(hashed) == 4
+    assert hasher.verify("s3cret", hashed)
+    assert not hasher.verify("wrong", hashed)
+
+
+def test_needs_rehash_when_cost_is_raised(hasher):
+    hashed = hasher.hash("s3cret")
+    assert not hasher.needs_rehash(hashed)
+    hasher.configure(rounds=5)
+    assert hasher.needs_rehash(hashed)
+    assert not hasher.needs_rehash(hasher.hash("s3cret"))
+
+
+def test_saturated_pool_fails_fast(hasher):
+    release = threading.Event()
+    started = threading.Barrier(3)
+
+    def slow():
+        started.wait()
+        release.wait(5)
+        return "done"
+
+    threads = [threading.Thread(target=hasher._run, args=(slow,)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    started.wait()
+
+    with pytest.raises(PasswordHasherBusy) as excinfo:
+        hasher.verify("s3cret", "$2b$04$" + "a" * 53)
+    assert excinfo.value.code == 503
+    assert hasher.rejected == 1
+
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert hasher.verify("s3cret", hasher.hash("s3cret"))
+
+
+def test_busy_returns_503(app):
+    @app.route("/_busy")
+    def busy():
+        raise PasswordHasherBusy()
+
+    response = app.test_client().get("/_busy")
+    assert response.status_code == 503
@@ -0,0 +1,98 @@
+import io
+import json
+
+from app import db, importer, quota
+from app.models import User, UserGroup, Todo, TodoQuotaCounter
+
+CSV = """task,done,date_from,date_to,assigned_user,assigned_group
+Write docs,yes,,,Bob,
+Ship release,,2025-01-01T09:00,2025-01-02T09:00,,backend
+,,,,,
+Orphan,,,,nobody,
+Bad dates,,2025-01-03T09:00,2025-01-02T09:00,,
+"""
+
+
+def setup_assignees():
+    backend = UserGroup(name="backend")
+    bob = User(username="bob", email="bob@example.com", password="x")
+    db.session.add_all([backend, bob])
+    db.session.commit()
+    return bob.id, backend.id
+
+
+def counter(scope, scope_id=0):
+    row = db.session.get(TodoQuotaCounter, (scope, scope_id))
+    return row.count if row else None
+
+
+def test_csv_import_validates_and_resolves_assignees(app):
+    bob_id, backend_id = setup_assignees()
+
+    report = importer.import_stream(io.StringIO(CSV), "csv", chunk_size=2)
+
+    assert report.imported == 2
+    assert report.rejected == 3
+    assert [error["line"] for error in report.errors] == [4, 5, 6]
+    assert "Unknown user 'nobody'" in report.errors[1]["errors"]
+    docs = Todo.query.filter_by(task="Write docs").one()
+    assert docs.done is True and docs.assigned_user_id == bob_id
+    assert Todo.query.filter_by(assigned_group_id=backend_id).count() == 1
+    assert counter(quota.TOTAL_SCOPE) == 2
+    assert counter(quota.USER_SCOPE, bob_id) == 1
+    assert counter(quota.GROUP_SCOPE, backend_id) == 1
+
+
+
+def test_usernames_differing_only_in_case(app, make_user):
+    bob_id, big_bob_id = make_user("bob").id, make_user("Bob").id
+    lines = [
+        json.dumps({"task": f"for {name}", "assigned_user": name}) for name in ["bob", "Bob", "BOB"]
+    ]
+
+    report = importer.import_stream(io.StringIO("\n".join(lines)), "ndjson")
+
+    assert report.imported == 2
+    assert report.errors == [{"line": 3, "errors": ["Ambiguous user 'BOB'"]}]
+    assert Todo.query.filter_by(task="for bob").one().assigned_user_id == bob_id
+    assert Todo.query.filter_by(task="for Bob").one().assigned_user_id == big_bob_id
+
+
+def test_ndjson_import_and_quota_stop(app):
+    app.config["TODO_QUOTA_TOTAL"] = 3
+    lines = [json.dumps({"task": f"task {i}"}) for i in range(5)] + ["not json"]
+
+    report = importer.import_stream(io.StringIO("\n".join(lines)), "ndjson", chunk_size=2)
+
+    # The second chunk would exceed the total quota: it is rolled back and the import stops
+    assert report.imported == 2
+    assert report.stopped == "Maximum number of todos reached"
+    assert Todo.query.count() == 2
+    assert counter(quota.TOTAL_SCOPE) == 2
+
+
+def test_import_cli(app, tmp_path):
+    setup_assignees()
+    path = tmp_path / "todos.csv"
+    path.write_text(CSV)
+
+    result = app.test_cli_runner().invoke(args=["import-todos", str(path)])
+
+    assert "Imported 2 todos, rejected 3" in result.output
+    assert Todo.query.count() == 2
+
+
+def test_import_endpoint(app, client, login):
+    admin_id = login("admin", is_admin=True)
+
+    body = "\n".join(json.dumps({"task": f"task {i}", "done": i % 2 == 0}) for i in range(3))
+    with app.app_context():
+        response = client.post(
+            "/admin/api/import-todos",
+            data={"file": (io.BytesIO(body.encode()), "todos.ndjson")},
+            content_type="multipart/form-data",
+        )
+    assert response.status_code == 200
+    assert response.get_json()["imported"] == 3
+    with app.app_context():
+        assert Todo.query.filter_by(created_by_id=admin_id, done=True).count() == 2
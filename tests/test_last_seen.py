@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import db, last_seen
+from app.models import User
+
+
+@pytest.fixture
+def users(app):
+    users = [User(username=f"u{i}", email=f"u{i}@example.com", password="x") for i in range(3)]
+    db.session.add_all(users)
+    db.session.commit()
+    yield [user.id for user in users]
+    last_seen.buffer.flush()
+
+
+def test_records_are_coalesced_and_flushed_in_one_statement(app, users):
+    base = datetime(2025, 1, 1, 12, 0, 0)
+    for user_id in users:
+        last_seen.buffer.record(user_id, base)
+        last_seen.buffer.record(user_id, base + timedelta(seconds=30))
+        last_seen.buffer.record(user_id, base + timedelta(seconds=10))  # out of order
+    assert len(last_seen.buffer.pending()) == 3
+
+    updates = []
+
+    def count_updates(conn, cursor, statement, *args):
+        if "UPDATE users" in statement:
+            updates.append(statement)
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", count_updates)
+    try:
+        assert last_seen.buffer.flush() == 3
+    finally:
+        event.remove(engine, "before_cursor_execute", count_updates)
+
+    assert len(updates) == 1
+    assert last_seen.buffer.pending() == {}
+    db.session.expire_all()
+    for user_id in users:
+        assert db.session.get(User, user_id).last_seen == base + timedelta(seconds=30)
+
+
+def test_heartbeat_does_not_write_to_the_database(app, client, login, users):
+    login(user_id=users[0])
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith(("UPDATE", "INSERT")):
+            statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with app.app_context():
+            response = client.post("/api/heartbeat")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 204
+    assert statements == []
+    assert users[0] in last_seen.buffer.pending()
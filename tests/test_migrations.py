@@ -0,0 +1,33 @@
+from sqlalchemy import inspect
+
+from app import db
+from app.migrations import upgrade, pending_revisions
+from app.migrations.explain import check_dashboard_indexes
+
+
+def test_upgrade_applies_each_revision_once(app):
+    applied = upgrade()
+    assert applied == ["0001", "0002", "0003", "0004"]
+    assert pending_revisions() == []
+    assert upgrade() == []
+
+
+def test_dashboard_queries_use_hot_path_indexes(app):
+    upgrade()
+    for name, uses_index, plan in check_dashboard_indexes():
+        assert uses_index, f"{name} does not use an index:\n{plan}"
+
+
+def test_revisions_build_the_model_schema_from_scratch(app):
+    db.drop_all()
+    assert upgrade() == ["0001", "0002", "0003", "0004"]
+
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        assert columns == set(table.columns.keys()), table.name
+        indexes = {
+            index["name"]: index["column_names"] for index in inspector.get_indexes(table.name)
+        }
+        for index in table.indexes:
+            assert indexes.get(index.name) == [column.name for column in index.columns], index.name
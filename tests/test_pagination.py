@@ -0,0 +1,103 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Todo
+from app.pagination import decode_cursor, encode_cursor
+
+
+def add_todos(count, tied=3):
+    """`count` todos; the first `tied` share one created_at to exercise the id tiebreak"""
+    base = datetime(2025, 1, 1, 12, 0)
+    todos = [
+        Todo(task=f"task {i}", created_at=base if i < tied else base + timedelta(minutes=i))
+        for i in range(count)
+    ]
+    db.session.add_all(todos)
+    db.session.commit()
+    return sorted(((todo.created_at, todo.id) for todo in todos), reverse=True)
+
+
+def get(app, client, url):
+    with app.app_context():
+        return client.get(url)
+
+
+def walk(app, client, limit):
+    pages, cursor = [], None
+    while True:
+        url = f"/api/todos?limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+        body = get(app, client, url).get_json()
+        pages.append([todo["id"] for todo in body["todos"]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def raw_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 1, 1, 12, 30, 15, 123456)
+    token = encode_cursor(created_at, "abc-123")
+    assert "=" not in token
+    assert decode_cursor(token) == (created_at, "abc-123")
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "not a cursor!",
+        raw_cursor({"created_at": "2025-01-01T00:00:00", "id": "x"}),
+        raw_cursor(["2025-01-01T00:00:00", 42]),
+        raw_cursor(["2025-01-01T00:00:00", None]),
+        raw_cursor(["yesterday", "x"]),
+        raw_cursor(["2025-01-01T00:00:00"]),
+    ],
+)
+def test_invalid_cursors(app, client, login, token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+    login("admin", is_admin=True)
+    response = get(app, client, f"/api/todos?cursor={token}")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid cursor"}
+
+
+def test_page_walk_covers_every_row_once_across_ties(app, client, login):
+    login("admin", is_admin=True)
+    expected = [row_id for _, row_id in add_todos(8)]
+
+    pages = walk(app, client, limit=3)
+    assert [len(page) for page in pages] == [3, 3, 2]
+    assert [row_id for page in pages for row_id in page] == expected
+
+
+def test_exact_multiple_ends_without_empty_page(app, client, login):
+    login("admin", is_admin=True)
+    add_todos(6)
+
+    pages = walk(app, client, limit=3)
+    assert [len(page) for page in pages] == [3, 3]
+
+    # One row past the limit is what produces a cursor
+    add_todos(1, tied=0)
+    assert [len(page) for page in walk(app, client, limit=6)] == [6, 1]
+    assert [len(page) for page in walk(app, client, limit=7)] == [7]
+
+
+def test_ndjson_streams_every_row_newest_first(app, client, login):
+    login("admin", is_admin=True)
+    expected = [row_id for _, row_id in add_todos(5)]
+
+    response = get(app, client, "/api/todos?format=ndjson")
+    assert response.mimetype == "application/x-ndjson"
+    lines = response.get_data(as_text=True).splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert [row["id"] for row in rows] == expected
+    assert rows[0]["task"] == "task 4"
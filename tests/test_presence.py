@@ -0,0 +1,103 @@
+import multiprocessing
+import time
+
+from app import db, presence
+from app.models import User
+from app.presence import PresenceStore
+
+
+def test_statuses_and_counts_from_range_queries(tmp_path):
+    store = PresenceStore(str(tmp_path / "presence.db"))
+    now = time.time()
+    store.touch(1, now=now - 10)  # online
+    store.touch(2, now=now - 120)  # away
+    store.touch(3, now=now - 900)  # offline
+    store.touch(4, now=now - 7200)  # past retention
+
+    assert set(store.active_since(presence.ONLINE_WINDOW, now=now)) == {1}
+    assert store.counts(now=now) == {presence.ONLINE: 1, presence.AWAY: 1}
+    assert presence.status_for(store.last_activity([2])[2], now) == presence.AWAY
+    assert presence.status_for(None, now) == presence.OFFLINE
+
+    assert store.purge(now=now) == 1
+    assert set(store.last_activity(now=now)) == {1, 2, 3}
+
+    store.remove(1)
+    assert store.counts(now=now) == {presence.ONLINE: 0, presence.AWAY: 1}
+
+
+def _touch_from_worker(path, user_id):
+    PresenceStore(path).touch(user_id)
+
+
+def test_store_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "presence.db")
+    store = PresenceStore(path)
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_touch_from_worker, args=(path, uid)) for uid in (1, 2, 3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(10)
+    assert store.counts()[presence.ONLINE] == 3
+
+
+def test_admin_users_page_uses_shared_presence(app, client, login):
+    admin = User(username="admin", email="admin@example.com", password="x", is_admin=True)
+    bob = User(username="bob", email="bob@example.com", password="x")
+    db.session.add_all([admin, bob])
+    db.session.commit()
+    admin_id, bob_id = admin.id, bob.id
+
+    store = presence.get_store()
+    store.touch(bob_id, now=time.time() - 120)
+
+    login(user_id=admin_id)
+    with app.app_context():
+        response = client.get("/admin/users")
+    assert response.status_code == 200
+    html = response.get_data(as_text=True)
+    assert "● Away" in html
+    assert "Last seen: 2 minutes ago" in html
+
+
+def test_admin_users_page_is_paginated_and_filtered_by_status(app, client, login):
+    admin = User(username="admin", email="admin@example.com", password="x", is_admin=True)
+    users = [User(username=f"user{i:02d}", email=f"user{i}@example.com", password="x") for i in range(30)]
+    db.session.add_all([admin] + users)
+    db.session.commit()
+    admin_id = admin.id
+    online_ids = [user.id for user in users[:3]]
+    away_ids = [user.id for user in users[3:5]]
+
+    store = presence.get_store()
+    now = time.time()
+    for user_id in online_ids:
+        store.touch(user_id, now=now)
+    for user_id in away_ids:
+        store.touch(user_id, now=now - 200)
+
+    login(user_id=admin_id)
+
+    def get(query):
+        with app.app_context():
+            response = client.get("/admin/users" + query)
+        assert response.status_code == 200
+        return response.get_data(as_text=True)
+
+    html = get("?status=online")
+    assert html.count("● Online") == 3
+    assert "● Away" not in html and "○ Offline" not in html
+    assert "Currently Online: <strong>3</strong>" in html
+    assert "Away: <strong>2</strong>" in html
+    assert "Currently Offline: <strong>26</strong>" in html
+
+    assert get("?status=away").count("● Away") == 2
+
+    html = get("?status=offline&per_page=10")
+    assert html.count("○ Offline") == 10
+    assert "Page 1 of 3 (26 users)" in html
+
+    html = get("?per_page=10&page=4")
+    assert "Page 4 of 4 (31 users)" in html
+    assert html.count("<tr class=") == 1
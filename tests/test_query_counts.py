@@ -0,0 +1,88 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import User, UserGroup, Todo
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements sent to the database inside the block"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def seed(rows):
+    """Create an admin, a grouped user and `rows` todos split between user and group"""
+    group = UserGroup(name="backend", description="Back-end", is_active=True)
+    admin = User(username="admin", email="admin@example.com", password="x", is_admin=True)
+    user = User(username="bob", email="bob@example.com", password="x")
+    user.groups.append(group)
+    db.session.add_all([group, admin, user])
+    db.session.flush()
+
+    base = datetime(2025, 1, 1)
+    for i in range(rows):
+        todo = Todo(task=f"task {i}", created_at=base + timedelta(minutes=i), created_by_id=admin.id)
+        if i % 2:
+            todo.assigned_user_id = user.id
+        else:
+            todo.assigned_group_id = group.id
+        db.session.add(todo)
+    db.session.commit()
+    return admin.id, user.id
+
+
+def queries_for(app, client, url):
+    # Fresh app context so the request gets its own session and flask.g
+    with app.app_context(), count_queries() as statements:
+        response = client.get(url)
+        response.get_data()
+    assert response.status_code == 200
+    return len(statements), response.get_data(as_text=True)
+
+
+@pytest.mark.parametrize(
+    "url, as_admin",
+    [
+        ("/api/todos", True),
+        ("/api/todos?format=ndjson", True),
+        ("/admin/dashboard", True),
+        ("/dashboard", False),
+    ],
+)
+def test_listing_query_count_does_not_grow_with_rows(app, client, login, url, as_admin):
+    admin_id, user_id = seed(5)
+    login(user_id=admin_id if as_admin else user_id)
+    queries_for(app, client, url)  # warm the current_user snapshot cache
+    few, _ = queries_for(app, client, url)
+
+    # Add many more rows visible to bob (his own or his group's), each with its own creator
+    group_id = db.session.get(User, user_id).groups[0].id
+    for i in range(40):
+        creator = User(username=f"user{i}", email=f"user{i}@example.com", password="x")
+        db.session.add(creator)
+        db.session.flush()
+        todo = Todo(task=f"extra {i}", created_by_id=creator.id)
+        if i % 2:
+            todo.assigned_user_id = user_id
+        else:
+            todo.assigned_group_id = group_id
+        db.session.add(todo)
+    db.session.commit()
+
+    many, body = queries_for(app, client, url)
+    assert "extra 0" in body and "extra 39" in body  # the listing really grew
+    assert many == few
+    assert many <= 5
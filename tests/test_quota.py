@@ -0,0 +1,60 @@
+from app import db, quota
+from app.models import User, Todo, TodoQuotaCounter
+
+
+def add_todo(**assignment):
+    reserved, message = quota.reserve(
+        assignment.get("assigned_user_id"), assignment.get("assigned_group_id")
+    )
+    if not reserved:
+        db.session.rollback()
+        return message
+    db.session.add(Todo(task="task", **assignment))
+    db.session.commit()
+    return None
+
+
+def counter(scope, scope_id=0):
+    return db.session.get(TodoQuotaCounter, (scope, scope_id)).count
+
+
+def test_total_limit_enforced_from_config(app):
+    app.config["TODO_QUOTA_TOTAL"] = 3
+    for _ in range(3):
+        assert add_todo() is None
+    assert add_todo() == "Maximum number of todos reached"
+    assert Todo.query.count() == 3
+    assert counter(quota.TOTAL_SCOPE) == 3
+
+
+def test_per_user_limit_and_release(app):
+    app.config["TODO_QUOTA_PER_USER"] = 2
+    user = User(username="bob", email="bob@example.com", password="x")
+    db.session.add(user)
+    db.session.commit()
+
+    assert add_todo(assigned_user_id=user.id) is None
+    assert add_todo(assigned_user_id=user.id) is None
+    assert "maximum" in add_todo(assigned_user_id=user.id)
+    # Rejected reservation must not leak into the total counter
+    assert counter(quota.TOTAL_SCOPE) == 2
+
+    todo = Todo.query.first()
+    db.session.delete(todo)
+    quota.release(todo.assigned_user_id, todo.assigned_group_id)
+    db.session.commit()
+    assert counter(quota.USER_SCOPE, user.id) == 1
+    assert add_todo(assigned_user_id=user.id) is None
+
+
+def test_missing_counter_backfilled_and_rebuild(app):
+    db.session.add_all([Todo(task="seeded"), Todo(task="seeded")])
+    db.session.commit()
+
+    assert add_todo() is None
+    assert counter(quota.TOTAL_SCOPE) == 3
+
+    db.session.add(Todo(task="bypassed quota"))
+    db.session.commit()
+    quota.rebuild_counters()
+    assert counter(quota.TOTAL_SCOPE) == 4
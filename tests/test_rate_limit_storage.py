@@ -0,0 +1,53 @@
+import multiprocessing
+
+import pytest
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter, SlidingWindowCounterRateLimiter
+
+from app.security.rate_limit_storage import SQLiteStorage
+
+
+@pytest.fixture
+def uri(tmp_path):
+    return "sqlite:///" + str(tmp_path / "ratelimit.db")
+
+
+def test_scheme_is_registered(uri):
+    assert isinstance(storage_from_string(uri), SQLiteStorage)
+
+
+def test_fixed_window_counts_and_clears(uri):
+    storage = SQLiteStorage(uri)
+    limiter = FixedWindowRateLimiter(storage)
+    item = parse("3 per minute")
+    assert [limiter.hit(item, "k") for _ in range(4)] == [True, True, True, False]
+    limiter.clear(item, "k")
+    assert limiter.hit(item, "k")
+
+
+def test_sliding_window_counter(uri):
+    storage = SQLiteStorage(uri)
+    limiter = SlidingWindowCounterRateLimiter(storage)
+    item = parse("5 per minute")
+    assert sum(limiter.hit(item, "k") for _ in range(8)) == 5
+    assert limiter.get_window_stats(item, "k").remaining == 0
+    assert limiter.hit(item, "other")
+
+
+def _hammer(uri, results):
+    limiter = SlidingWindowCounterRateLimiter(SQLiteStorage(uri))
+    item = parse("50 per minute")
+    results.put(sum(limiter.hit(item, "shared") for _ in range(40)))
+
+
+def test_limit_is_shared_between_processes(uri):
+    SQLiteStorage(uri)  # create the schema before the workers start
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_hammer, args=(uri, results)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+    assert sum(results.get(timeout=5) for _ in workers) == 50
@@ -4,7 +4,17 @@ import tempfile
 import logging
 import pytest
 
-from app.sanitize_module import sanitize_input, calculate_total_score, detect_script_mix
+from app.security.sanitize_module import (
+    sanitize_input,
+    sanitize_fields,
+    calculate_total_score,
+    detect_script_mix,
+    PatternScanner,
+    SCANNER,
+    SUSPICIOUS_PATTERNS,
+    VERDICT_CACHE,
+)
+from app.security.verdict_cache import VerdictCache, make_key
 
 
 @pytest.fixture
@@ -16,7 +26,7 @@ def log_file():
 
 @pytest.fixture(autouse=True)
 def mock_logger(log_file):
-    from app.sanitize_module import logger
+    from app.security.sanitize_module import logger
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
         handler.close()
@@ -91,6 +101,21 @@ class TestScoring:
         assert score >= 7
         assert any(m[2] == "-- + SQL keyword boost" for m in matches)
 
+    def test_guards_do_not_change_matches(self):
+        unguarded = PatternScanner(SUSPICIOUS_PATTERNS)
+        samples = [
+            "<script>alert(1)</script>",
+            "' OR 1=1 --",
+            "; rm -rf /",
+            "../../etc/passwd",
+            "javascript:alert(1)",
+            "ls -la /tmp",
+            "Plain sentence without specials",
+            "x" * 5000,
+        ]
+        for text in samples:
+            assert SCANNER.scan(text) == unguarded.scan(text)
+
     def test_no_false_positives_on_safe_text(self):
         text = "I'm just saying hello, world!"
         score, matches = calculate_total_score(text)
@@ -186,4 +211,103 @@ class TestOutputAndSafety:
         cleaned, score, matches = sanitize_input("   \t\n   ")
         assert cleaned == ""
         assert score == 0
-        assert matches == []
\ No newline at end of file
+        assert matches == []
+
+
+class TestSanitizeFields:
+    def test_per_field_results_and_verdict(self):
+        result = sanitize_fields(
+            {"username": "alice_qa", "email": "' OR 1=1 --", "group": "backend"}
+        )
+        assert result["fields"]["username"] == sanitize_input("alice_qa", log_suspicious=False)
+        assert result["scores"]["group"] == 0
+        assert result["max_score"] == result["scores"]["email"] >= 5
+        assert result["blocked"] is True
+        assert result["flagged"] == ["email"]
+
+    def test_clean_form_not_blocked(self):
+        result = sanitize_fields({"username": "alice_qa", "group": "backend"})
+        assert result["blocked"] is False
+        assert result["flagged"] == []
+
+    def test_single_log_line_with_redacted_password(self, log_file):
+        sanitize_fields(
+            {
+                "username": "<script>x</script>",
+                "password": "secret'; DROP TABLE users--",
+                "email": "a@b.c'",
+            }
+        )
+        with open(log_file, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 1
+        assert "DROP TABLE" not in lines[0]
+        assert "password=<redacted>" in lines[0]
+        assert "username=" in lines[0] and "email=" in lines[0]
+
+
+class TestVerdictCache:
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self):
+        VERDICT_CACHE.clear()
+        VERDICT_CACHE.configure(max_entries=4096, max_bytes=8 * 1024 * 1024)
+        yield
+        VERDICT_CACHE.clear()
+
+    def test_repeated_input_is_a_hit_with_same_verdict(self):
+        before = VERDICT_CACHE.stats()
+        first = sanitize_input("' OR 1=1 --")
+        second = sanitize_input("' OR 1=1 --")
+        after = VERDICT_CACHE.stats()
+        assert first == second
+        assert after["misses"] - before["misses"] == 1
+        assert after["hits"] - before["hits"] == 1
+
+    def test_options_are_part_of_the_key(self):
+        balanced, _, _ = sanitize_input("a <b> c")
+        none, _, _ = sanitize_input("a <b> c", remove_specials="none")
+        assert balanced == "a b c"
+        assert none == "a <b> c"
+
+    def test_cached_matches_cannot_be_mutated(self):
+        _, _, matches = sanitize_input("<script>x</script>")
+        matches.clear()
+        _, _, again = sanitize_input("<script>x</script>")
+        assert again
+
+    def test_hits_are_still_logged(self, log_file):
+        sanitize_input("../../etc/passwd")
+        sanitize_input("../../etc/passwd")
+        with open(log_file, encoding="utf-8") as f:
+            assert len([line for line in f if "Path traversal" in line]) == 2
+
+    def test_lru_eviction_by_entries_and_bytes(self):
+        cache = VerdictCache(max_entries=2, max_bytes=10_000)
+        for i in range(3):
+            cache.put(make_key(str(i), ()), (str(i), 0, []))
+        assert cache.get(make_key("0", ())) is None
+        assert cache.get(make_key("2", ())) == ("2", 0, [])
+        assert cache.stats()["evictions"] == 1
+
+        cache = VerdictCache(max_entries=100, max_bytes=1_000)
+        for i in range(20):
+            cache.put(make_key(str(i), ()), ("x" * 100, 0, []))
+        assert cache.stats()["bytes"] <= 1_000
+        assert cache.get(make_key("19", ())) is not None
+
+    def test_zero_cap_disables_cache(self):
+        VERDICT_CACHE.configure(max_entries=0)
+        sanitize_input("hello")
+        sanitize_input("hello")
+        assert VERDICT_CACHE.stats()["entries"] == 0
+
+    def test_redacted_fields_skip_the_cache(self):
+        password = "hunter2 <secret> pass"
+        stats = VERDICT_CACHE.stats()
+        result = sanitize_fields({"username": "alice_qa", "password": password})
+        sanitize_fields({"username": "alice_qa", "password": password})
+        assert result["fields"]["password"][0] == "hunter2 secret pass"
+        assert VERDICT_CACHE.stats()["entries"] == 1
+        assert VERDICT_CACHE.stats()["hits"] - stats["hits"] == 1  # the username only
+        cached = repr(list(VERDICT_CACHE._entries.values()))
+        assert "hunter2" not in cached
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+from app import db, stats
+from app.models import Todo
+
+
+def add_todos():
+    past = datetime.now() - timedelta(days=1)
+    future = datetime.now() + timedelta(days=1)
+    todos = [
+        Todo(task="done", done=True),
+        Todo(task="open", done=False),
+        Todo(task="overdue", done=False, date_from=past, date_to=past),
+        Todo(task="done late", done=True, date_from=past, date_to=past),
+        Todo(task="upcoming", done=False, date_from=future, date_to=future),
+    ]
+    db.session.add_all(todos)
+    db.session.commit()
+    return todos
+
+
+def test_single_aggregate_counts(app):
+    add_todos()
+    assert stats.compute_todo_stats() == {
+        "total": 5,
+        "completed": 2,
+        "pending": 3,
+        "overdue": 1,
+    }
+
+
+def test_cache_tracks_incremental_changes(app):
+    stats.invalidate()
+    todos = add_todos()
+    assert stats.get_todo_stats()["total"] == 5
+
+    overdue = todos[2]
+    overdue.done = True
+    db.session.commit()
+    stats.todo_toggled(overdue)
+
+    new_todo = Todo(task="new", done=False)
+    db.session.add(new_todo)
+    db.session.commit()
+    stats.todo_added(new_todo)
+
+    done_todo = todos[0]
+    db.session.delete(done_todo)
+    db.session.commit()
+    stats.todo_deleted(True, None)
+
+    assert stats.get_todo_stats() == stats.compute_todo_stats()
+    stats.invalidate()
+
+
+def test_cache_disabled_with_zero_ttl(app):
+    app.config["STATS_CACHE_TTL"] = 0
+    stats.invalidate()
+    add_todos()
+    stats.get_todo_stats()
+    db.session.add(Todo(task="untracked"))
+    db.session.commit()
+    assert stats.get_todo_stats()["total"] == 6
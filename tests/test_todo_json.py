@@ -0,0 +1,92 @@
+from app import db
+from app.models import Todo
+
+JSON = {"Accept": "application/json"}
+
+
+def add_todo(task="ship it", done=False):
+    todo = Todo(task=task, done=done)
+    db.session.add(todo)
+    db.session.commit()
+    return todo.id
+
+
+def test_toggle_json_returns_changed_row(app, client, login):
+    login()
+    todo_id = add_todo()
+
+    with app.app_context():
+        response = client.post(f"/toggle/{todo_id}", json={"done": True}, headers=JSON)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["message"] == "Task completed"
+    assert body["todo"]["id"] == todo_id
+    assert body["todo"]["done"] is True
+
+    # Explicit state is idempotent: a repeated click does not flip it back
+    with app.app_context():
+        response = client.post(f"/toggle/{todo_id}", json={"done": True}, headers=JSON)
+    assert response.get_json()["todo"]["done"] is True
+
+
+def test_repeated_explicit_done_keeps_stats(app, client, login):
+    login()
+    todo_id = add_todo()
+    add_todo("other")
+
+    with app.app_context():
+        client.get("/api/stats")  # warm the stats cache so toggles adjust it
+        for _ in range(2):
+            response = client.post(f"/toggle/{todo_id}", json={"done": True}, headers=JSON)
+            assert response.get_json()["todo"]["done"] is True
+    with app.app_context():
+        body = client.get("/api/stats").get_json()
+    assert body["completed"] == 1 and body["pending"] == 1
+
+
+def test_delete_json(app, client, login):
+    login()
+    todo_id = add_todo()
+
+    with app.app_context():
+        response = client.post(f"/delete/{todo_id}", headers=JSON)
+    assert response.status_code == 200
+    assert response.get_json()["deleted"] == todo_id
+    with app.app_context():
+        assert db.session.get(Todo, todo_id) is None
+
+
+def test_edit_json_validation_and_success(app, client, login):
+    login()
+    todo_id = add_todo()
+
+    with app.app_context():
+        response = client.post(f"/edit/{todo_id}", json={"todo": ""}, headers=JSON)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+    with app.app_context():
+        response = client.post(f"/edit/{todo_id}", json={"todo": "ship it today"}, headers=JSON)
+    assert response.status_code == 200
+    assert response.get_json()["todo"]["task"] == "ship it today"
+
+
+def test_missing_todo_is_404_json(app, client, login):
+    login()
+
+    with app.app_context():
+        response = client.post("/toggle/999", headers=JSON)
+    assert response.status_code == 404
+    assert response.get_json()["error"] == "Error updating task status"
+
+
+def test_html_form_posts_still_redirect(app, client, login):
+    login()
+    todo_id = add_todo()
+
+    with app.app_context():
+        response = client.post(f"/toggle/{todo_id}", data={"done": "on"})
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith("/dashboard")
+    with app.app_context():
+        assert db.session.get(Todo, todo_id).done is True
@@ -0,0 +1,88 @@
+from sqlalchemy import event
+
+from app import db, user_cache
+from app.models import UserGroup
+
+
+def count_user_selects(fn):
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        result = fn()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    return result, sum("FROM users" in sql for sql in statements)
+
+
+def test_snapshot_is_loaded_once_and_immutable(app, make_user):
+    backend = UserGroup(name="backend")
+    bob = make_user(group=backend)
+    bob_id, backend_id = bob.id, backend.id
+
+    snapshot, selects = count_user_selects(lambda: user_cache.load_user(str(bob_id)))
+    assert selects == 1
+    assert snapshot.username == "bob" and not snapshot.is_admin
+    assert snapshot.group_ids == {backend_id}
+    assert [group.name for group in snapshot.groups] == ["backend"]
+    assert snapshot.get_id() == str(bob_id) and snapshot.is_authenticated
+
+    again, selects = count_user_selects(lambda: user_cache.load_user(str(bob_id)))
+    assert selects == 0 and again is snapshot
+    try:
+        snapshot.is_admin = True
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("snapshot must be immutable")
+
+    assert user_cache.load_user("999") is None
+    assert user_cache.load_user("not-a-number") is None
+
+
+def test_changes_invalidate_on_commit(app, make_user):
+    backend = UserGroup(name="backend")
+    frontend = UserGroup(name="frontend")
+    db.session.add_all([backend, frontend])
+    bob = make_user()
+    user_cache.load_user(bob.id)
+
+    bob.is_admin = True
+    db.session.commit()
+    assert user_cache.load_user(bob.id).is_admin
+
+    frontend.members.append(bob)  # membership changed from the group side
+    db.session.commit()
+    assert user_cache.load_user(bob.id).group_ids == {frontend.id}
+
+    frontend.name = "web"
+    db.session.commit()
+    assert [group.name for group in user_cache.load_user(bob.id).groups] == ["web"]
+
+    # Rolled back changes leave the cached snapshot alone
+    bob.username = "robert"
+    db.session.flush()
+    db.session.rollback()
+    assert user_cache.get_cache().get(bob.id).username == "bob"
+
+
+def test_ttl_expiry(app, monkeypatch, make_user):
+    bob = make_user()
+    cache = user_cache.get_cache()
+    user_cache.load_user(bob.id)
+
+    clock = [user_cache.time.monotonic() + cache.ttl + 1]
+    monkeypatch.setattr(user_cache.time, "monotonic", lambda: clock[0])
+    assert cache.get(bob.id) is None
+
+
+def test_requests_use_snapshot_as_current_user(app, client, login, make_user):
+    backend = UserGroup(name="backend")
+    bob = make_user(group=backend)
+    login(user_id=bob.id)
+
+    with app.app_context():
+        response = client.get("/dashboard")
+    assert response.status_code == 200
+    assert b"bob@example.com" in response.data
+    assert user_cache.get_cache().stats()["entries"] == 1